@@ -0,0 +1,173 @@
+"""Measure the throughput of the content encodings of uploads and reads.
+
+Run from the root of the repository, with the package installed:
+	python benchmarks/benchmark_compression.py --local-file data.csv
+	python benchmarks/benchmark_compression.py --size-mb 256 --path /{filesystem}/{folder}
+The credentials are read from the same configuration file used by the tests.
+
+For each codec (none, gzip and, if the zstandard package is installed, zstd)
+and compression level, reports the compression ratio and the throughput of
+the streaming compression and decompression alone, measured on the
+uncompressed size. With `--path`, it also uploads the data with `file_create`
+and reads it back with `file_read`, to show the end-to-end effect of
+transferring fewer bytes.
+Without `--local-file`, the data is a generated CSV, more regular (and so
+more compressible) than real data.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import argparse
+import random
+import time
+import yaml
+
+# Internal Libraries
+from pyadlgen2.azuredatalakegen2 import AzureDataLakeGen2
+from pyadlgen2.helpers.compression import compress_chunks, decompress_chunks
+from pyadlgen2.helpers.uploadsource import iter_chunks, DEFAULT_CHUNK_SIZE
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+CONFIGURATION_FILE = 'test/config.yaml'
+
+CODECS = [(None, None), ('gzip', 1), ('gzip', 6), ('zstd', 1), ('zstd', 3), ('zstd', 9)]
+
+# ---------------------------------------------------------------------
+
+def generate_csv(size_mb):
+	'''
+	CSV rows of random values, up to `size_mb` MiB.
+	'''
+
+	generator = random.Random(0)
+	rows = []
+	size = 0
+
+	while size < size_mb * 1024 * 1024:
+		row = '{},{},{:.4f},{}\n'.format(
+			size
+			, generator.choice(['alpha', 'beta', 'gamma', 'delta'])
+			, generator.random() * 1000
+			, generator.randint(0, 10 ** 6)
+		).encode('utf-8')
+		rows.append(row)
+		size += len(row)
+
+	return b''.join(rows)
+
+def mb_per_second(size, elapsed):
+	return size / (1024 * 1024) / elapsed if elapsed > 0 else float('inf')
+
+def benchmark_codec(data, content_encoding, level, chunk_size):
+	'''
+	Compression ratio, compression and decompression throughput.
+	'''
+
+	start = time.perf_counter()
+	compressed = list(compress_chunks(iter_chunks(data, chunk_size), content_encoding, chunk_size, level = level))
+	compression_time = time.perf_counter() - start
+
+	compressed_size = sum(len(chunk) for chunk in compressed)
+
+	start = time.perf_counter()
+	decompressed_size = sum(len(chunk) for chunk in decompress_chunks(compressed, content_encoding))
+	decompression_time = time.perf_counter() - start
+
+	assert decompressed_size == len(data)
+
+	return len(data) / compressed_size, mb_per_second(len(data), compression_time), mb_per_second(len(data), decompression_time)
+
+def benchmark_transfer(datalake, path, data, content_encoding, level, chunk_size, max_concurrency):
+	'''
+	Upload and read back of the data, in seconds.
+	'''
+
+	remote_file = '{}/benchmark_compression_{}_{}.csv'.format(path.rstrip('/'), content_encoding or 'none', level or 0)
+
+	start = time.perf_counter()
+	datalake.file_create(
+		remote_file
+		, data
+		, overwrite_if_exists = True
+		, chunk_size = chunk_size
+		, max_concurrency = max_concurrency
+		, content_encoding = content_encoding
+		, compression_level = level
+	)
+	upload_time = time.perf_counter() - start
+
+	start = time.perf_counter()
+	size = sum(len(chunk) for chunk in datalake.file_read(remote_file))
+	read_time = time.perf_counter() - start
+
+	datalake.path_delete(remote_file)
+
+	assert size == len(data)
+
+	return upload_time, read_time
+
+def main():
+
+	parser = argparse.ArgumentParser(description = 'Compare the throughput of the content encodings.')
+	parser.add_argument('--local-file', help = 'File to use as data, instead of a generated CSV')
+	parser.add_argument('--size-mb', type = int, default = 64, help = 'Size of the generated CSV')
+	parser.add_argument('--path', help = 'Absolute path of a folder for the transfers, e.g. /{filesystem}/{folder}')
+	parser.add_argument('--chunk-size', type = int, default = DEFAULT_CHUNK_SIZE)
+	parser.add_argument('--concurrency', type = int, default = 1)
+	arguments = parser.parse_args()
+
+	if arguments.local_file is not None:
+		with open(arguments.local_file, 'rb') as file_object:
+			data = file_object.read()
+	else:
+		data = generate_csv(arguments.size_mb)
+
+	datalake = None
+
+	if arguments.path is not None:
+		with open(CONFIGURATION_FILE, 'r') as ymlfile:
+			configuration = yaml.safe_load(ymlfile)
+
+		datalake = AzureDataLakeGen2(
+			storage_account_name = configuration['storage_account_name']
+			, storage_account_key = configuration['storage_account_key']
+		)
+
+	print('data of {:.1f} MiB, chunks of {:.1f} MiB'.format(len(data) / (1024 * 1024), arguments.chunk_size / (1024 * 1024)))
+
+	try:
+		for content_encoding, level in CODECS:
+			name = '{}:{}'.format(content_encoding, level) if content_encoding else 'none'
+
+			if content_encoding is None:
+				line = '{:>7}: ratio  1.00'.format(name)
+			else:
+				try:
+					ratio, compression, decompression = benchmark_codec(data, content_encoding, level, arguments.chunk_size)
+				except ImportError as e:
+					print('{:>7}: skipped ({})'.format(name, e))
+					continue
+
+				line = '{:>7}: ratio {:5.2f}, compression {:7.1f} MiB/s, decompression {:7.1f} MiB/s'.format(
+					name, ratio, compression, decompression)
+
+			if datalake is not None:
+				upload_time, read_time = benchmark_transfer(
+					datalake, arguments.path, data, content_encoding, level, arguments.chunk_size, arguments.concurrency)
+
+				line += ', upload {:.2f}s, read {:.2f}s'.format(upload_time, read_time)
+
+			print(line)
+
+	finally:
+		if datalake is not None:
+			datalake.close()
+
+if __name__ == '__main__':
+	main()
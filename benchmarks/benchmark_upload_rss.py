@@ -0,0 +1,137 @@
+"""Measure the peak memory (RSS) of uploads from different kinds of sources.
+
+Run from the root of the repository, with the package installed:
+	python benchmarks/benchmark_upload_rss.py /{filesystem}/{folder} --size-mb 512
+The credentials are read from the same configuration file used by the tests.
+
+A local file of the given size is created, then uploaded from each kind of
+source, each in its own process (the peak RSS of a process never decreases).
+The growth of the peak RSS during the upload should stay in the order of the
+chunk size, whatever the size of the file, except for the sources that are
+held in memory by construction (bytes), reported as a reference.
+On Linux, mmap pages read for the upload count in the RSS but are shared with
+the page cache, and can be reclaimed at any time.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import argparse
+import mmap
+import os
+import pathlib
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import yaml
+
+# Internal Libraries
+from pyadlgen2.azuredatalakegen2 import AzureDataLakeGen2
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+CONFIGURATION_FILE = 'test/config.yaml'
+
+SOURCES = ['path', 'file', 'mmap', 'bytes']
+
+# ---------------------------------------------------------------------
+
+def peak_rss_mb():
+	'''
+	Peak resident set size of the current process, in MiB.
+	'''
+
+	peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+	# Bytes on macOS, KiB elsewhere
+	return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def upload(datalake, source, local_file, remote_file, chunk_size):
+	'''
+	Upload `local_file` to `remote_file` from a source of the given kind.
+	'''
+
+	if source == 'path':
+		datalake.file_create(remote_file, pathlib.Path(local_file), overwrite_if_exists = True, chunk_size = chunk_size)
+
+	elif source == 'file':
+		with open(local_file, 'rb') as file_object:
+			datalake.file_create(remote_file, file_object, overwrite_if_exists = True, chunk_size = chunk_size)
+
+	elif source == 'mmap':
+		with open(local_file, 'rb') as file_object:
+			with mmap.mmap(file_object.fileno(), 0, access = mmap.ACCESS_READ) as mapped:
+				datalake.file_create(remote_file, mapped, overwrite_if_exists = True, chunk_size = chunk_size)
+
+	elif source == 'bytes':
+		with open(local_file, 'rb') as file_object:
+			data = file_object.read()
+
+		datalake.file_create(remote_file, data, overwrite_if_exists = True, chunk_size = chunk_size)
+
+def run_child(arguments):
+	'''
+	Upload from a single kind of source, and print the peak RSS before and after.
+	'''
+
+	with open(CONFIGURATION_FILE, 'r') as ymlfile:
+		configuration = yaml.safe_load(ymlfile)
+
+	with AzureDataLakeGen2(
+		storage_account_name = configuration['storage_account_name']
+		, storage_account_key = configuration['storage_account_key']
+	) as datalake:
+
+		remote_file = '{}/benchmark_upload_rss_{}.bin'.format(arguments.path.rstrip('/'), arguments.source)
+
+		before = peak_rss_mb()
+		start = time.perf_counter()
+		upload(datalake, arguments.source, arguments.local_file, remote_file, arguments.chunk_size)
+		elapsed = time.perf_counter() - start
+		after = peak_rss_mb()
+
+		datalake.path_delete(remote_file)
+
+	print('{:>6}: peak RSS {:.0f} MiB -> {:.0f} MiB (+{:.0f} MiB) in {:.2f}s'.format(
+		arguments.source, before, after, after - before, elapsed))
+
+def main():
+
+	parser = argparse.ArgumentParser(description = 'Compare the peak memory of uploads from different kinds of sources.')
+	parser.add_argument('path', help = 'Absolute path of the destination folder, e.g. /{filesystem}/{folder}')
+	parser.add_argument('--size-mb', type = int, default = 256)
+	parser.add_argument('--chunk-size', type = int, default = 4 * 1024 * 1024)
+	parser.add_argument('--sources', nargs = '+', choices = SOURCES, default = SOURCES)
+	parser.add_argument('--source', choices = SOURCES, help = argparse.SUPPRESS)
+	parser.add_argument('--local-file', help = argparse.SUPPRESS)
+	arguments = parser.parse_args()
+
+	if arguments.source is not None:
+		run_child(arguments)
+		return
+
+	print('file of {} MiB, chunks of {:.1f} MiB'.format(arguments.size_mb, arguments.chunk_size / (1024 * 1024)))
+
+	with tempfile.TemporaryDirectory() as directory:
+		local_file = os.path.join(directory, 'data.bin')
+
+		with open(local_file, 'wb') as file_object:
+			for _ in range(arguments.size_mb):
+				file_object.write(os.urandom(1024 * 1024))
+
+		for source in arguments.sources:
+			subprocess.run([
+				sys.executable, __file__, arguments.path
+				, '--chunk-size', str(arguments.chunk_size)
+				, '--source', source
+				, '--local-file', local_file
+			], check = True)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,80 @@
+"""Compare the single-stream recursive listing with the concurrent walk.
+
+Run from the root of the repository, with the package installed:
+	python benchmarks/benchmark_walk.py /{filesystem}/{folder}
+The credentials are read from the same configuration file used by the tests.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import argparse
+import time
+import yaml
+
+# Internal Libraries
+from pyadlgen2.azuredatalakegen2 import AzureDataLakeGen2
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+CONFIGURATION_FILE = 'test/config.yaml'
+
+# ---------------------------------------------------------------------
+
+def benchmark_recursive_listing(datalake, path):
+	'''
+	Single stream of pages of a recursive listing.
+	'''
+
+	count = 0
+
+	for _ in datalake.list_paths(path, recursive = True):
+		count += 1
+
+	return count
+
+def benchmark_walk(datalake, path, max_concurrency):
+	'''
+	Concurrent fan-out over the directories.
+	'''
+
+	count = 0
+
+	for _, dirnames, filenames in datalake.walk(path, max_concurrency = max_concurrency):
+		count += len(dirnames) + len(filenames)
+
+	return count
+
+def main():
+
+	parser = argparse.ArgumentParser(description = 'Compare a recursive listing with a concurrent walk of the same tree.')
+	parser.add_argument('path', help = 'Absolute path of the tree to list, e.g. /{filesystem}/{folder}')
+	parser.add_argument('--concurrency', type = int, nargs = '+', default = [1, 4, 8, 16, 32])
+	arguments = parser.parse_args()
+
+	with open(CONFIGURATION_FILE, 'r') as ymlfile:
+		configuration = yaml.safe_load(ymlfile)
+
+	with AzureDataLakeGen2(
+		storage_account_name = configuration['storage_account_name']
+		, storage_account_key = configuration['storage_account_key']
+		, pool_maxsize = max(arguments.concurrency)
+	) as datalake:
+
+		start = time.perf_counter()
+		count = benchmark_recursive_listing(datalake, arguments.path)
+		elapsed = time.perf_counter() - start
+		print('recursive listing: {} paths in {:.2f}s ({:.0f} paths/s)'.format(count, elapsed, count / elapsed))
+
+		for max_concurrency in arguments.concurrency:
+			start = time.perf_counter()
+			count = benchmark_walk(datalake, arguments.path, max_concurrency)
+			elapsed = time.perf_counter() - start
+			print('walk, concurrency {:>3}: {} paths in {:.2f}s ({:.0f} paths/s)'.format(max_concurrency, count, elapsed, count / elapsed))
+
+if __name__ == '__main__':
+	main()
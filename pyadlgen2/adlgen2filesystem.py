@@ -0,0 +1,473 @@
+"""fsspec filesystem backed by AzureDataLakeGen2, so that the datalake can be
+used by the libraries built on fsspec (pandas, pyarrow, dask, ...).
+
+Requires fsspec.
+
+Paths are in the form {filesystem}/{folder1}/.../{filename}, optionally
+prefixed by the protocol: adlgen2://{filesystem}/...
+The root ('') holds the filesystems of the storage account.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+from fsspec.spec import AbstractFileSystem, AbstractBufferedFile
+
+# Internal Libraries
+from pyadlgen2.azuredatalakegen2 import AzureDataLakeGen2
+from pyadlgen2.helpers.adlgen2restapiwrapper import (
+	DEFAULT_POOL_CONNECTIONS
+	, DEFAULT_POOL_MAXSIZE
+)
+from pyadlgen2.helpers.compression import is_supported
+
+# ---------------------------------------------------------------------
+
+class ADLGen2FileSystem(AbstractFileSystem):
+	"""
+	fsspec filesystem over a storage account of the datalake.
+
+	All the operations go through a single AzureDataLakeGen2 client, and so
+	share its pooled connections. Directory listings are kept in the fsspec
+	listings cache (`dircache`), which is also filled by the recursive
+	listings of `find`; the changes made through this filesystem invalidate it.
+
+	Files opened for reading fetch only the byte ranges they need, so e.g.
+	the footer and the selected columns of a Parquet file.
+
+	`mv` of a file, or of a directory with `recursive`, is a single rename
+	server side; a path moved to an existing directory goes inside it.
+
+	Files written with a gzip or zstd Content-Encoding (see
+	`AzureDataLakeGen2.file_create`) are read decompressed: `cat` streams
+	and decompresses them whole, and `open` returns a file object that
+	decompresses them as they are read, but is not seekable. Their `size`
+	is the size of the compressed data. They cannot be opened for appending.
+	"""
+
+	protocol = ('adlgen2',)
+	root_marker = ''
+
+	def __init__(self
+		, storage_account_name
+		, storage_account_key
+		, pool_connections = DEFAULT_POOL_CONNECTIONS
+		, pool_maxsize = DEFAULT_POOL_MAXSIZE
+		, metadata_cache = None
+		, block_cache = None
+		, **storage_options
+		):
+		r"""
+		Parameters
+		----------
+		storage_account_name : str
+			Name of the storage account.
+		storage_account_key : str
+			Access key of the storage account.
+		pool_connections : int, optional
+			See `AzureDataLakeGen2`.
+		pool_maxsize : int, optional
+			See `AzureDataLakeGen2`.
+		metadata_cache : MetadataCache, optional
+			See `AzureDataLakeGen2`.
+		block_cache : BlockCache, optional
+			See `AzureDataLakeGen2`.
+		**storage_options
+			Options of the fsspec listings cache (`use_listings_cache`,
+			`listings_expiry_time`, `max_paths`).
+		"""
+
+		super().__init__(**storage_options)
+
+		self.datalake = AzureDataLakeGen2(
+			storage_account_name
+			, storage_account_key
+			, pool_connections = pool_connections
+			, pool_maxsize = pool_maxsize
+			, metadata_cache = metadata_cache
+			, block_cache = block_cache
+			)
+
+	@classmethod
+	def _strip_protocol(cls, path):
+
+		if isinstance(path, list):
+			return [cls._strip_protocol(p) for p in path]
+
+		return super()._strip_protocol(path).lstrip('/')
+
+	def __datalake_path(self, path):
+		"""Converts a path of this filesystem to an absolute datalake path."""
+
+		return '/' + self._strip_protocol(path)
+
+	@staticmethod
+	def _status_to_info(path_status):
+		"""Converts a PathStatus to the dict of details returned by `info` and `ls`."""
+
+		return {
+			'name' : path_status.path.lstrip('/')
+			, 'size' : path_status.size
+			, 'type' : path_status.type
+			, 'etag' : path_status.etag
+			, 'last_modified' : path_status.last_modified
+			, 'owner' : path_status.owner
+			, 'group' : path_status.group
+			, 'permissions' : path_status.permissions
+			, 'content_encoding' : path_status.content_encoding
+		}
+
+	def ls(self, path, detail = True, refresh = False, **kwargs):
+
+		path = self._strip_protocol(path)
+
+		entries = None if refresh else self.dircache.get(path)
+
+		if entries is None and not path:
+			# The root of the account holds its filesystems
+			entries = [self._status_to_info(path_status) for path_status in self.datalake.list_filesystems()]
+			self.dircache[path] = entries
+
+		elif entries is None:
+			try:
+				entries = [
+					self._status_to_info(path_status)
+					for path_status in self.datalake.list_paths(self.__datalake_path(path))
+				]
+
+			except FileNotFoundError:
+				# The path may be a file, which cannot be listed
+				entries = [self.info(path)]
+
+				if entries[0]['type'] == 'directory':
+					raise
+
+			else:
+				self.dircache[path] = entries
+
+		if detail:
+			return list(entries)
+		else:
+			return [entry['name'] for entry in entries]
+
+	def info(self, path, **kwargs):
+
+		path = self._strip_protocol(path)
+
+		if not path:
+			return {'name' : '', 'size' : 0, 'type' : 'directory'}
+
+		# A listing of the parent, if cached, spares a call
+		parent = self._parent(path)
+
+		if path and parent in self.dircache:
+			for entry in self.dircache[parent]:
+				if entry['name'] == path:
+					return dict(entry)
+
+		return self._status_to_info(self.datalake.stat(self.__datalake_path(path)))
+
+	def find(self, path, maxdepth = None, withdirs = False, detail = False, **kwargs):
+
+		path = self._strip_protocol(path)
+
+		# The filesystems cannot be listed recursively in a single call
+		if maxdepth is not None or not path:
+			return super().find(path, maxdepth = maxdepth, withdirs = withdirs, detail = detail, **kwargs)
+
+		# A single recursive listing, instead of one per directory
+		try:
+			entries = [
+				self._status_to_info(path_status)
+				for path_status in self.datalake.list_paths(self.__datalake_path(path), recursive = True)
+			]
+		except FileNotFoundError:
+			entries = None
+
+		out = {}
+
+		if entries is not None:
+			# The listing holds the complete content of every directory in it
+			listings = {path : []}
+			for entry in entries:
+				if entry['type'] == 'directory':
+					listings.setdefault(entry['name'], [])
+			for entry in entries:
+				listings[self._parent(entry['name'])].append(entry)
+			self.dircache.update(listings)
+
+			if withdirs and path:
+				out[path] = self.info(path)
+
+			for entry in entries:
+				if withdirs or entry['type'] == 'file':
+					out[entry['name']] = entry
+
+		elif self.isfile(path):
+			out[path] = self.info(path)
+
+		names = sorted(out)
+
+		if detail:
+			return {name : out[name] for name in names}
+		else:
+			return names
+
+	def cat_file(self, path, start = None, end = None, **kwargs):
+
+		path = self._strip_protocol(path)
+
+		if start is None and end is None:
+			return bytes(self.datalake.file_read_bytes(self.__datalake_path(path)))
+
+		# Not from the listings, which do not return the Content-Encoding
+		info = self._status_to_info(self.datalake.stat(self.__datalake_path(path)))
+
+		if is_supported(info['content_encoding']):
+			# No random access into compressed data: the range is
+			# taken from the whole decompressed content
+			return bytes(self.datalake.file_read_bytes(self.__datalake_path(path))[start:end])
+
+		size = info['size']
+
+		start = 0 if start is None else (max(0, size + start) if start < 0 else min(start, size))
+		end = size if end is None else (max(0, size + end) if end < 0 else min(end, size))
+
+		buffer = bytearray(max(0, end - start))
+
+		count = self.datalake.file_read_range_into(
+			self.__datalake_path(path)
+			, buffer
+			, offset = start
+			, etag = info.get('etag')
+		)
+		del buffer[count:]
+
+		return bytes(buffer)
+
+	def pipe_file(self, path, value, mode = 'overwrite', **kwargs):
+
+		path = self._strip_protocol(path)
+
+		try:
+			self.datalake.file_create(
+				self.__datalake_path(path)
+				, value
+				, overwrite_if_exists = mode == 'overwrite'
+			)
+
+		finally:
+			self.invalidate_cache(path)
+
+	def rm_file(self, path):
+
+		path = self._strip_protocol(path)
+
+		try:
+			# Also deletes empty directories, as needed by `rm`
+			self.datalake.path_delete(self.__datalake_path(path))
+
+		finally:
+			self.invalidate_cache(path)
+
+	def rmdir(self, path):
+
+		self.rm_file(path)
+
+	def rm(self, path, recursive = False, maxdepth = None):
+
+		if not isinstance(path, str) or not recursive or maxdepth is not None:
+			return super().rm(path, recursive = recursive, maxdepth = maxdepth)
+
+		path = self._strip_protocol(path)
+
+		# A whole tree is deleted server side
+		try:
+			self.datalake.path_delete(self.__datalake_path(path), recursive = True)
+
+		finally:
+			self.invalidate_cache(path)
+
+	def mv(self, path1, path2, recursive = False, maxdepth = None, **kwargs):
+
+		if not isinstance(path1, str) or not isinstance(path2, str):
+			return super().mv(path1, path2, recursive = recursive, maxdepth = maxdepth, **kwargs)
+
+		path1 = self._strip_protocol(path1)
+		path2 = self._strip_protocol(path2)
+
+		if path1 == path2:
+			return
+
+		# A rename moves the whole tree, it cannot stop at a depth
+		if (not recursive or maxdepth is not None) and self.isdir(path1):
+			return super().mv(path1, path2, recursive = recursive, maxdepth = maxdepth, **kwargs)
+
+		# As with a copy, a path moved to an existing directory goes inside it
+		if self.isdir(path2):
+			path2 = '{}/{}'.format(path2, path1.rsplit('/', 1)[-1])
+
+			if path1 == path2:
+				return
+
+		# A rename is a metadata operation, whatever the size of the tree
+		try:
+			self.datalake.rename(self.__datalake_path(path1), self.__datalake_path(path2), overwrite = True)
+
+		finally:
+			self.invalidate_cache(path1)
+			self.invalidate_cache(path2)
+
+	def invalidate_cache(self, path = None):
+
+		if path is None:
+			self.dircache.clear()
+
+		else:
+			path = self._strip_protocol(path)
+
+			for cached_path in list(self.dircache):
+				if cached_path.startswith(path + '/'):
+					self.dircache.pop(cached_path, None)
+
+			while path:
+				self.dircache.pop(path, None)
+				path = self._parent(path)
+
+			self.dircache.pop(path, None)
+
+		super().invalidate_cache(path)
+
+	def modified(self, path):
+
+		return self.info(path)['last_modified']
+
+	def _open(self
+		, path
+		, mode = 'rb'
+		, block_size = None
+		, autocommit = True
+		, cache_options = None
+		, **kwargs
+		):
+
+		if not autocommit:
+			raise NotImplementedError('Transactions are not supported.')
+
+		details = None
+
+		if mode == 'rb':
+			# Not from the listings, which do not return the Content-Encoding
+			path_status = self.datalake.stat(self.__datalake_path(path))
+
+			if path_status.is_directory:
+				raise IsADirectoryError('The specified path is a directory.\n{}'.format(path))
+
+			if is_supported(path_status.content_encoding):
+				return self.datalake.open(self.__datalake_path(path), 'rb')
+
+			details = self._status_to_info(path_status)
+
+		elif mode == 'ab':
+			# Checked before any data is buffered. Not from the listings,
+			# which do not return the Content-Encoding
+			try:
+				path_status = self.datalake.stat(self.__datalake_path(path))
+			except FileNotFoundError:
+				path_status = None
+
+			if path_status is not None and is_supported(path_status.content_encoding):
+				raise ValueError('The specified path is compressed ({}) and cannot be appended to.\n{}'.format(
+					path_status.content_encoding, path))
+
+		file_object = ADLGen2File(
+			self
+			, path
+			, mode
+			, block_size = block_size
+			, autocommit = autocommit
+			, cache_options = cache_options
+			, size = None if details is None else details['size']
+			, **kwargs
+		)
+
+		if details is not None:
+			file_object.details = details
+
+		return file_object
+
+# ---------------------------------------------------------------------
+
+class ADLGen2File(AbstractBufferedFile):
+	"""
+	File of an ADLGen2FileSystem.
+
+	When reading, each block is fetched with a Range request conditioned on
+	the ETag of the file when it was opened, so a file modified meanwhile
+	raises an error instead of returning a mix of versions.
+
+	When writing, each block is appended at its position in the file and
+	the data is committed by a single flush when the file is closed.
+	"""
+
+	def _fetch_range(self, start, end):
+
+		end = min(end, self.size)
+
+		if start >= end:
+			return b''
+
+		buffer = bytearray(end - start)
+
+		count = self.fs.datalake.file_read_range_into(
+			'/' + self.path
+			, buffer
+			, offset = start
+			, etag = self.details.get('etag')
+		)
+		del buffer[count:]
+
+		return bytes(buffer)
+
+	def _initiate_upload(self):
+
+		if self.mode == 'ab':
+			try:
+				info = self.fs.info(self.path)
+			except FileNotFoundError:
+				info = None
+
+			if info is not None and info['type'] == 'file':
+				# Appends continue at the end of the file
+				self.offset = info['size']
+				return
+
+		self.fs.datalake.file_create(
+			'/' + self.path
+			, b''
+			, overwrite_if_exists = self.mode != 'xb'
+		)
+
+	def _upload_chunk(self, final = False):
+
+		with self.buffer.getbuffer() as data:
+			if len(data):
+				self.fs.datalake.file_append('/' + self.path, data, self.offset)
+
+			if final:
+				try:
+					self.fs.datalake.file_flush(
+						'/' + self.path
+						, self.offset + len(data)
+						, close = True
+						# An appended file keeps its content type
+						, content_type = None if self.mode == 'ab' else 'application/octet-stream'
+					)
+
+				finally:
+					self.fs.invalidate_cache(self.path)
+
+		return True
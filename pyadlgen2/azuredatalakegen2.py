@@ -7,11 +7,64 @@
 # LIBRARIES
 
 # External Libraries
+import base64
+import codecs
+import collections
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import datetime
+import errno
+import hashlib
+import io
+import os
 import pathlib
+import posixpath
+import tempfile
+import urllib.parse
 from requests.exceptions import HTTPError
+from requests.structures import CaseInsensitiveDict
 
 # Internal Libraries
-from pyadlgen2.helpers.adlgen2restapiwrapper import ADLGen2RestApiWrapper
+from pyadlgen2.helpers.adlgen2restapiwrapper import (
+	ADLGen2RestApiWrapper
+	, DEFAULT_POOL_CONNECTIONS
+	, DEFAULT_POOL_MAXSIZE
+)
+from pyadlgen2.helpers.pathstatus import PathStatus, PathColumns
+from pyadlgen2.helpers.datalakepath import split_datalake_path
+from pyadlgen2.helpers.filereader import (
+	DataLakeFileReader
+	, DataLakeStreamReader
+	, DEFAULT_MIN_READAHEAD
+	, DEFAULT_MAX_READAHEAD
+)
+from pyadlgen2.helpers.filewriter import (
+	DataLakeFileWriter
+	, DEFAULT_APPEND_SIZE
+	, DEFAULT_FLUSH_SIZE
+)
+from pyadlgen2.helpers.bulkoperations import run_bulk, PathResult, TransferSummary
+from pyadlgen2.helpers.syncstate import (
+	load_sync_state
+	, save_sync_state
+	, set_default_mode
+	, is_state_file
+	, DEFAULT_STATE_FILENAME
+)
+from pyadlgen2.helpers.uploadsource import iter_chunks, DEFAULT_CHUNK_SIZE
+from pyadlgen2.helpers.compression import compress_chunks, decompress_chunks, is_supported
+from pyadlgen2.helpers.paralleltransfer import (
+	upload_chunks_parallel
+	, download_ranges_parallel
+	, DEFAULT_CHUNK_RETRIES
+	, DEFAULT_MAX_CONCURRENCY
+	, DEFAULT_RANGE_SIZE
+)
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Size of the chunks yielded when streaming a file.
+DEFAULT_READ_CHUNK_SIZE = 1024 * 1024
 
 # ---------------------------------------------------------------------
 
@@ -19,13 +72,217 @@ class AzureDataLakeGen2():
 
 	"""TODO Fill in the class description."""
 	
-	def __init__(self, storage_account_name, storage_account_key):
+	def __init__(self
+		, storage_account_name
+		, storage_account_key
+		, pool_connections = DEFAULT_POOL_CONNECTIONS
+		, pool_maxsize = DEFAULT_POOL_MAXSIZE
+		, connect_timeout = None
+		, read_timeout = None
+		, metadata_cache = None
+		, retry_policy = None
+		, concurrency_limiter = None
+		, block_cache = None
+		, content_cache = None
+		):
+		r"""
+		Parameters
+		----------
+		storage_account_name : str
+			Name of the storage account.
+		storage_account_key : str
+			Access key of the storage account.
+		pool_connections : int, optional
+			Number of per-host connection pools cached by the HTTP session.
+		pool_maxsize : int, optional
+			Maximum number of keep-alive connections for each host.
+		connect_timeout : float, optional
+			Seconds to wait for a connection to the service to be established.
+		read_timeout : float, optional
+			Seconds to wait for the service to send a response.
+		metadata_cache : MetadataCache, optional
+			If set, the results of `stat` (and so of `path_exists`,
+			`path_is_file`, `path_is_directory`, `path_get_properties`),
+			including the paths that do not exist, are cached in it.
+			The entries are invalidated by the changes made through
+			this client.
+		retry_policy : RetryPolicy, optional
+			How failed calls are retried. Defaults to exponential
+			backoff with jitter, honouring `Retry-After`.
+		concurrency_limiter : AdaptiveConcurrencyLimiter, optional
+			Limit on the calls in flight, shared by all the parallel
+			operations of the client (and of any other client it is
+			passed to). Defaults to an AIMD limit capped to `pool_maxsize`,
+			which shrinks when the account throttles.
+		block_cache : BlockCache, optional
+			If set, the ranges read by `file_read_range_into` (and so by
+			the files returned by `open`) are served from blocks cached
+			in it, keyed by the ETag of the file. The same cache can be
+			shared by many clients.
+		content_cache : ContentCache, optional
+			Local directory in which `file_read_cached` keeps the content
+			of the files read, revalidated at each read.
+
+		The client owns pooled HTTP connections: use it as a context manager,
+		or call `close()` when done, to release them.
+		"""
 
 		self.__storage_account_name = storage_account_name
 		self.__storage_account_key = storage_account_key
+		self.__metadata_cache = metadata_cache
+		self.__block_cache = block_cache
+		self.__content_cache = content_cache
 		
-		self.__azure_datalake_rest_api_wrapper = ADLGen2RestApiWrapper(storage_account_name, storage_account_key)
+		self.__azure_datalake_rest_api_wrapper = ADLGen2RestApiWrapper(
+			storage_account_name
+			, storage_account_key
+			, pool_connections = pool_connections
+			, pool_maxsize = pool_maxsize
+			, connect_timeout = connect_timeout
+			, read_timeout = read_timeout
+			, retry_policy = retry_policy
+			, concurrency_limiter = concurrency_limiter
+			)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def close(self):
+		"""Close the pooled connections used to talk to the datalake."""
+
+		self.__azure_datalake_rest_api_wrapper.close()
+
+	@property
+	def metadata_cache(self):
+		"""The MetadataCache of the client (with its hit/miss counters), or None."""
+
+		return self.__metadata_cache
+
+	@property
+	def block_cache(self):
+		"""The BlockCache of the client (with its statistics), or None."""
+
+		return self.__block_cache
 	
+	def __split_path(self, path, param_name = 'path'):
+		"""Validates an absolute datalake path and splits it in its
+		filesystem and (optional) path inside the filesystem.
+
+		Returns
+		-------
+		tuple
+			(path as PurePosixPath, filesystem, path inside the filesystem or None)
+
+		Raises
+		------
+		ValueError
+			If `path` is not an absolute path.
+
+		"""
+
+		return split_datalake_path(path, param_name)
+
+	def __get_status_headers(self, path):
+		"""Executes a single Get Status (or Get Filesystem Properties, if `path`
+		is just a filesystem) call and returns the headers of the response.
+
+		Raises
+		------
+		ValueError
+			If the specified `path` is not an absolute path.
+
+		FileNotFoundError
+			If the specified `path` does not exist.
+
+		HTTPError
+			If the call to the REST API fails for some other reasons.
+
+		"""
+
+		path, datalake_filesystem, datalake_path = self.__split_path(path)
+
+		if self.__metadata_cache is not None:
+			found, headers = self.__metadata_cache.get(path)
+
+			if found:
+				if headers is None:
+					raise FileNotFoundError('The specified path does not exist.\n{}'.format(path))
+
+				return dict(headers)
+
+		try:
+			if datalake_path is None:
+				headers = dict(self.__azure_datalake_rest_api_wrapper.filesystem_get_properties(
+					filesystem = datalake_filesystem
+					))
+			else:
+				headers = self.__azure_datalake_rest_api_wrapper.path_get_properties(
+					filesystem = datalake_filesystem
+					, path = datalake_path
+					, upn = True
+					, action = 'getStatus'
+					)
+
+		except HTTPError as e:
+			if e.response is not None and e.response.status_code == 404:
+				if self.__metadata_cache is not None:
+					self.__metadata_cache.put(path, None)
+
+				raise FileNotFoundError('The specified path does not exist.\n{}'.format(path)) from e
+			else:
+				raise e
+
+		if self.__metadata_cache is not None:
+			self.__metadata_cache.put(path, dict(headers))
+
+		return headers
+
+	def __invalidate_metadata(self, path, recursive = False):
+		"""Drops `path` (and its ancestors, and its descendants if `recursive`)
+		from the metadata cache, after it has been modified through this client.
+		"""
+
+		if self.__metadata_cache is not None:
+			self.__metadata_cache.invalidate(path, recursive = recursive)
+
+	def stat(self, path):
+		r"""Get the status of the specified path with a single call to the datalake.
+
+		Parameters
+		----------
+		path : str
+			Absolute path of which we want the status.
+			The first element represents the filesystem (a.k.a container)
+			where files are stored.
+			We can thus see the path as:
+			/{filesystem}/{folder1}/.../{folderN}[/{filename}]
+
+		Returns
+		-------
+		PathStatus
+			Type, size, etag, last modification time, owner, group
+			and permissions of `path`.
+
+		Raises
+		------
+		ValueError
+			If the specified `path` is not an absolute path.
+
+		FileNotFoundError
+			If the specified `path` does not exist.
+
+		HTTPError
+			If the call to the REST API fails for some other reasons.
+
+		"""
+
+		headers = self.__get_status_headers(path)
+
+		return PathStatus.from_headers(pathlib.PurePosixPath(path), headers)
+
 	def path_exists(self, path):
 		"""Checks if a given path exists in the datalake.
 		
@@ -54,30 +311,12 @@ class AzureDataLakeGen2():
 
 		"""
 
-		path = pathlib.PurePosixPath(path)
-
-		if not path.is_absolute():
-			raise ValueError('The param [path] must be an absolute path. Value passed:\n{}'.format(path))
-
-		datalake_filesystem = path.parts[1]
-		datalake_path = path.relative_to(path.parts[0]+path.parts[1]) \
-			if path.relative_to(path.parts[0]+path.parts[1]) != pathlib.PurePosixPath('.') \
-			else None
-
 		try:
-			self.__azure_datalake_rest_api_wrapper.path_list(
-				filesystem = datalake_filesystem
-				, recursive = False
-				, directory = datalake_path
-				)
-		
+			self.stat(path)
 			return True
 
-		except HTTPError as e:
-			if str(e).startswith('404 Client Error: The specified path does not exist.'):
-				return False
-			else:
-				raise e
+		except FileNotFoundError:
+			return False
 
 	def path_get_properties(self, path):
 		r"""Get the properties of the specified path.
@@ -107,27 +346,7 @@ class AzureDataLakeGen2():
 
 		"""
 		
-		path = pathlib.PurePosixPath(path)
-
-		if not path.is_absolute():
-			raise ValueError('The param [path] must be an absolute path. Value passed:\n{}'.format(path))
-
-		datalake_filesystem = path.parts[1]
-		datalake_path = path.relative_to(path.parts[0]+path.parts[1]) \
-			if path.relative_to(path.parts[0]+path.parts[1]) != pathlib.PurePosixPath('.') \
-			else None
-
-		if not self.path_exists(path):
-			raise FileNotFoundError('The specified path does not exist.\n{}'.format(path))
-		
-		response = self.__azure_datalake_rest_api_wrapper.path_get_properties(
-			filesystem = datalake_filesystem
-			, path = datalake_path
-			, upn = True
-			, action = 'getStatus'
-			)
-		
-		return response
+		return self.__get_status_headers(path)
 
 	def path_is_directory(self, path):
 		r"""Checks if `path` exists and is a directory.
@@ -154,22 +373,10 @@ class AzureDataLakeGen2():
 		
 		"""
 		
-		path = pathlib.PurePosixPath(path)
-
-		if not path.is_absolute():
-			raise ValueError('The param [path] must be an absolute path. Value passed:\n{}'.format(path))
-
-		datalake_filesystem = path.parts[1]
-		datalake_path = path.relative_to(path.parts[0]+path.parts[1]) \
-			if path.relative_to(path.parts[0]+path.parts[1]) != pathlib.PurePosixPath('.') \
-			else None
+		try:
+			return self.stat(path).is_directory
 
-		if not self.path_exists(path):
-			return False
-		
-		if self.path_get_properties(path)['x-ms-resource-type'] == 'directory':
-			return True
-		else:
+		except FileNotFoundError:
 			return False
 
 	def path_is_file(self, path):
@@ -196,149 +403,1916 @@ class AzureDataLakeGen2():
 		
 		"""
 		
-		path = pathlib.PurePosixPath(path)
+		try:
+			return self.stat(path).is_file
 
-		if not path.is_absolute():
-			raise ValueError('The param [path] must be an absolute path. Value passed:\n{}'.format(path))
+		except FileNotFoundError:
+			return False
 
-		datalake_filesystem = path.parts[1]
-		datalake_path = path.relative_to(path.parts[0]+path.parts[1]) \
-			if path.relative_to(path.parts[0]+path.parts[1]) != pathlib.PurePosixPath('.') \
-			else None
+	def bulk_stat(self
+		, paths
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, ordered = True
+		):
+		r"""Get the status of many paths, running the calls concurrently.
 
-		if not self.path_exists(path):
-			return False
-		
-		if self.path_get_properties(path)['x-ms-resource-type'] == 'file':
-			return True
-		else:
-			return False
+		Parameters
+		----------
+		paths : iterable of str
+			Absolute paths of which we want the status. The iterable
+			is consumed lazily.
+		max_concurrency : int, optional
+			Number of calls running at the same time. It should not
+			exceed the `pool_maxsize` of the client.
+		ordered : bool, optional
+			If True, the results are yielded in the order of `paths`,
+			otherwise as soon as they are available.
 
-	def file_create(self, file_path, file_data, file_properties, overwrite_if_exists = False):
-		r"""Create a file at the specified path with the specified data.
+		Returns
+		-------
+		generator
+			Yields a PathResult(path, value, error) for each path, where
+			`value` is the PathStatus of the path, or `error` the exception
+			raised by `stat` (FileNotFoundError for missing paths).
+			An error on a path does not stop the others.
+
+		"""
+
+		return run_bulk(self.stat, paths, max_concurrency, ordered)
+
+	def bulk_exists(self
+		, paths
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, ordered = True
+		):
+		r"""Check the existence of many paths, running the calls concurrently.
+		See `bulk_stat` for the parameters.
+
+		Returns
+		-------
+		generator
+			Yields a PathResult(path, value, error) for each path, where
+			`value` is True if the path exists, False otherwise, or `error`
+			the exception raised while checking it.
+
+		"""
+
+		return run_bulk(self.path_exists, paths, max_concurrency, ordered)
+
+	def list_filesystems(self
+		, prefix = None
+		):
+		r"""Lazily list the filesystems of the storage account.
+
+		The pages of the listing are requested one at a time, following
+		the continuation tokens returned by the datalake.
 
 		Parameters
 		----------
-		file_path : str
-			Absolute path where the file has to be created.
-			The first element represents the filesystem (a.k.a container)
-			where the file is stored.
-			The last part of the path represents the name of the file.
-			We can thus see the path as:
-			/{filesystem}/{folder1}/.../{folderN}/{filename}
-		file_data : 
-			The data that will be written inside the file.
-		file_properties : dict, OrderedDict
-			The properties that will be set for the new file.
-		overwrite_if_exists: bool, optional
-			If True and the specified `file_path` already exists,
-			will overwrite the existing data and properties.
+		prefix : str, optional
+			If given, only the filesystems whose name starts
+			with `prefix` are listed.
 
 		Returns
 		-------
-		bool
-			Returns True if execution succeed, raises an exception
-			otherwise.
+		generator
+			Yields a PathStatus (a directory, with path /{filesystem})
+			for each filesystem.
+
+		"""
+
+		continuation = None
+
+		while True:
+			result = self.__azure_datalake_rest_api_wrapper.filesystem_list(
+				prefix = prefix
+				, continuation = continuation
+				)
+
+			for entry in result.get('filesystems', []):
+				yield PathStatus.from_filesystem_entry(entry)
+
+			continuation = result.get('continuation')
+
+			if not continuation:
+				return
+
+	def list_paths(self
+		, path
+		, recursive = False
+		, max_results = None
+		, prefetch = True
+		):
+		r"""Lazily list the content of a directory (or of a whole filesystem).
+
+		The pages of the listing are requested one at a time, following the
+		continuation tokens returned by the datalake, and their entries are
+		yielded one by one, so that memory usage does not depend on the number
+		of paths listed. While the caller processes a page, the next one is
+		fetched in the background.
+
+		Parameters
+		----------
+		path : str
+			Absolute path of the directory to list.
+			We can see the path as:
+			/{filesystem}[/{folder1}/.../{folderN}]
+		recursive : bool, optional
+			If True, lists all the paths under `path`, otherwise
+			only its direct children.
+		max_results : int, optional
+			Maximum number of entries of each page (the datalake
+			caps it to 5000).
+		prefetch : bool, optional
+			If True, fetches the next page while the current one
+			is being consumed.
+
+		Returns
+		-------
+		generator
+			Yields a PathStatus for each path.
 
 		Raises
 		------
-		FileExistsError
-			If the specified `file_path` already exists and
-			`overwrite_if_exists` is False.
+		FileNotFoundError
+			If the specified `path` does not exist.
 
 		"""
-		
-		file_path = pathlib.PurePosixPath(file_path)
 
-		if not file_path.is_absolute():
-			raise ValueError('The param [file_path] must be an absolute path. Value passed:\n{}'.format(file_path))
-		
-		if self.path_exists(file_path):
-			if not overwrite_if_exists:
-				raise FileExistsError('The specified file_path already exists and the param [overwrite_if_exists] is set to False.\n{}'.format(file_path))
-			
-			if not self.path_is_file(file_path):
-				raise ValueError('The specified file_path already exists and is not a file.\n{}'.format(file_path))
-			
-		# The creation of a file with the specified properties requires different
-		# calls of the API. The steps are:
-		# * create an empty file
-		# * update the created with the actual data
-		# * flush the data
-		# * set the properties
+		path, datalake_filesystem, datalake_path = self.__split_path(path)
 
-		datalake_filesystem = file_path.parts[1]
-		datalake_file_path = file_path.relative_to(file_path.parts[0]+file_path.parts[1]) \
-			if file_path.relative_to(file_path.parts[0]+file_path.parts[1]) != pathlib.PurePosixPath('.') \
-			else None
+		entries = self.__list_entries(path, datalake_filesystem, datalake_path, recursive, max_results, prefetch)
 
-		response = self.__azure_datalake_rest_api_wrapper.path_create(
-			filesystem = datalake_filesystem
-			, path = datalake_file_path
-			, resource = 'file'
-			, request_headers={
-				'Content-Encoding' : 'utf-8'
-				, 'x-ms-content-type' : 'text/plain'
-			}
-			)
-		
-		response = self.__azure_datalake_rest_api_wrapper.path_update(
-			filesystem = datalake_filesystem
-			, path = datalake_file_path
-			, action = 'append'
-			, position = str(0)
-			, request_headers = {
-				'Content-Type' : 'text/plain'
-				, 'x-ms-content-type' : 'text/plain'
-				, 'Content-Length' : str(len(file_data.encode('utf-8')))
-			}
-			, data_to_append = file_data
-		)
+		return (PathStatus.from_list_entry(datalake_filesystem, entry) for entry in entries)
 
-		print(response)
+	def list_paths_columnar(self
+		, path
+		, recursive = False
+		, max_results = None
+		):
+		r"""List the content of a directory (or of a whole filesystem) into
+		compact columns, for inventories of very large numbers of paths.
 
-		response = self.__azure_datalake_rest_api_wrapper.path_update(
-			filesystem = datalake_filesystem
-			, path = datalake_file_path
-			, action = 'flush'
-			, close = 'true'
-			, position = str(len(file_data.encode('utf-8')))
-			, request_headers = {
-				'Content-Length' : str(0)
-				, 'x-ms-content-type' : 'text/plain'
-			}
-		)
+		Parameters
+		----------
+		path : str
+			Absolute path of the directory to list.
+			We can see the path as:
+			/{filesystem}[/{folder1}/.../{folderN}]
+		recursive : bool, optional
+			If True, lists all the paths under `path`, otherwise
+			only its direct children.
+		max_results : int, optional
+			Maximum number of entries of each page (the datalake
+			caps it to 5000).
 
-		# TODO Set Properties
+		Returns
+		-------
+		PathColumns
+			Paths, sizes, modification times and directory flags, each
+			stored in one array. Use `PathColumns.to_numpy()` to filter
+			them with vectorised operations.
 
-		return response
+		Raises
+		------
+		FileNotFoundError
+			If the specified `path` does not exist.
 
-		
-	def file_delete(self):
-		"""TODO Fill in the method description"""
-		
-		raise NotImplementedError()
-		
-	def file_read(self):
-		"""TODO Fill in the method description"""
-		
-		raise NotImplementedError()
-		
-	def file_update(self):
-		"""TODO Fill in the method description"""
-		
-		raise NotImplementedError()
-		
-	def file_set_properties(self):
-		"""TODO Fill in the method description"""
-		
-		raise NotImplementedError()
-		
-	def read_file(self, filepath):
+		"""
 
-		response = self.__azure_datalake_rest_api_wrapper.path_read(
-			filesystem = 'raw-temporary'
-			, path = 'test.csv'
-		)
+		path, datalake_filesystem, datalake_path = self.__split_path(path)
 
-		return response
+		columns = PathColumns()
+
+		for entry in self.__list_entries(path, datalake_filesystem, datalake_path, recursive, max_results, True):
+			columns.append_list_entry(datalake_filesystem, entry)
+
+		return columns
+
+	def __list_entries(self, path, datalake_filesystem, datalake_path, recursive, max_results, prefetch):
+		"""Returns a generator of the raw entries of a listing, as returned by the
+		datalake (`name` is relative to the filesystem). The first page is
+		requested right away, so that errors are raised by this call and not
+		when the iteration starts.
+		"""
+
+		def fetch_page(continuation):
+			try:
+				response = self.__azure_datalake_rest_api_wrapper.path_list(
+					filesystem = datalake_filesystem
+					, recursive = recursive
+					, directory = datalake_path
+					, continuation = continuation
+					, maxResults = max_results
+					)
+
+			except HTTPError as e:
+				if e.response is not None and e.response.status_code == 404:
+					raise FileNotFoundError('The specified path does not exist.\n{}'.format(path)) from e
+				else:
+					raise e
+
+			return response.json().get('paths', []), response.headers.get('x-ms-continuation')
+
+		return self.__iter_list_pages(fetch_page, fetch_page(None), prefetch)
+
+	def __iter_list_pages(self, fetch_page, first_page, prefetch):
+
+		entries, continuation = first_page
+		executor = ThreadPoolExecutor(max_workers = 1) if prefetch else None
+
+		try:
+			while True:
+				next_page = executor.submit(fetch_page, continuation) \
+					if executor is not None and continuation \
+					else None
+
+				yield from entries
+
+				if not continuation:
+					return
+
+				entries, continuation = next_page.result() if next_page is not None else fetch_page(continuation)
+
+		finally:
+			if executor is not None:
+				executor.shutdown(wait = False, cancel_futures = True)
+
+	def walk(self
+		, path
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, onerror = None
+		):
+		r"""Walk the directory tree rooted at `path`, like `os.walk`.
+
+		Instead of a single serial recursive listing, every directory is
+		listed on its own (non recursively) and its subdirectories are
+		queued for a pool of `max_concurrency` workers, so wide trees are
+		listed with many requests in flight at the same time.
+		Directories are yielded as soon as they are listed, so the order
+		is neither top-down nor bottom-up, but a directory always comes
+		before its subdirectories.
+
+		Parameters
+		----------
+		path : str
+			Absolute path of the root directory.
+			We can see the path as:
+			/{filesystem}[/{folder1}/.../{folderN}]
+		max_concurrency : int, optional
+			Number of directories listed at the same time. It should
+			not exceed the `pool_maxsize` of the client.
+		onerror : callable, optional
+			As with `os.walk`, called with the exception raised by the
+			listing of a subdirectory, which is then skipped; it can
+			raise the exception to stop the walk. If None, subdirectories
+			deleted during the walk (FileNotFoundError) are skipped, and
+			the other errors are raised.
+
+		Returns
+		-------
+		generator
+			Yields a tuple (dirpath, dirnames, filenames) for each
+			directory, where `dirpath` is an absolute path and
+			`dirnames`, `filenames` are the names of its children.
+			As with `os.walk`, `dirnames` can be modified in place
+			to prune the walk.
+
+		Raises
+		------
+		FileNotFoundError
+			If the specified `path` does not exist (whatever `onerror`).
+
+		"""
+
+		if max_concurrency < 1:
+			raise ValueError('The param [max_concurrency] must be a positive integer. Value passed:\n{}'.format(max_concurrency))
+
+		path, _, _ = self.__split_path(path)
+
+		def list_directory(dirpath):
+			dirnames = []
+			filenames = []
+
+			for entry in self.list_paths(dirpath, recursive = False, prefetch = False):
+				name = pathlib.PurePosixPath(entry.path).name
+
+				if entry.is_directory:
+					dirnames.append(name)
+				else:
+					filenames.append(name)
+
+			return dirpath, dirnames, filenames
+
+		# The root is listed right away, so that errors are raised
+		# by this call and not when the iteration starts.
+		return self.__walk(list_directory(str(path)), list_directory, max_concurrency, onerror)
+
+	def __walk(self, root, list_directory, max_concurrency, onerror):
+
+		# Directories waiting to be listed: the pool takes at most
+		# max_concurrency of them at a time, so the queue of futures
+		# stays bounded even for very wide trees.
+		to_list = collections.deque()
+		in_flight = set()
+
+		executor = ThreadPoolExecutor(max_workers = max_concurrency)
+
+		try:
+			results = [root]
+
+			while results or to_list or in_flight:
+				for dirpath, dirnames, filenames in results:
+					yield dirpath, dirnames, filenames
+
+					# Read after the yield, so that the caller can prune it
+					to_list.extend(posixpath.join(dirpath, dirname) for dirname in dirnames)
+
+				while to_list and len(in_flight) < max_concurrency:
+					in_flight.add(executor.submit(list_directory, to_list.popleft()))
+
+				if not in_flight:
+					break
+
+				done, in_flight = wait(in_flight, return_when = FIRST_COMPLETED)
+				results = []
+
+				for future in done:
+					try:
+						results.append(future.result())
+
+					except Exception as e:
+						if onerror is not None:
+							onerror(e)
+						elif not isinstance(e, FileNotFoundError):
+							raise
+
+		finally:
+			executor.shutdown(wait = False, cancel_futures = True)
+
+	def rename(self
+		, source_path
+		, destination_path
+		, overwrite = False
+		):
+		r"""Rename (move) a file or a whole directory tree, server side.
+
+		The rename is a metadata operation: no data is copied, whatever the
+		size of the tree. When the service splits the rename of a large
+		directory in several calls, they are chained with the continuation
+		token until the whole tree is moved.
+
+		Parameters
+		----------
+		source_path : str
+			Absolute path of the file or directory to rename.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}[/{filename}]
+		destination_path : str
+			Absolute new path, possibly in another filesystem of the same
+			storage account. Its parent directory must exist.
+		overwrite : bool, optional
+			If False, the rename fails if `destination_path` exists.
+			If True, an existing file (or empty directory) at
+			`destination_path` is replaced.
+
+		Returns
+		-------
+		dict
+			The headers of the response of the last call.
+
+		Raises
+		------
+		ValueError
+			If one of the paths is a whole filesystem.
+		FileNotFoundError
+			If `source_path`, or the parent of `destination_path`, does not exist.
+		FileExistsError
+			If `destination_path` exists and `overwrite` is False.
+
+		"""
+
+		source_path, source_filesystem, datalake_source_path = self.__split_path(source_path, 'source_path')
+		destination_path, destination_filesystem, datalake_destination_path = self.__split_path(destination_path, 'destination_path')
+
+		if datalake_source_path is None or datalake_destination_path is None:
+			raise ValueError('A filesystem cannot be renamed, nor replaced by a rename.')
+
+		request_headers = {
+			'x-ms-rename-source' : urllib.parse.quote('/{}/{}'.format(source_filesystem, datalake_source_path))
+		}
+		if not overwrite:
+			request_headers['If-None-Match'] = '*'
+
+		continuation = None
+
+		try:
+			while True:
+				headers = self.__azure_datalake_rest_api_wrapper.path_create(
+					filesystem = destination_filesystem
+					, path = datalake_destination_path
+					, continuation = continuation
+					, request_headers = request_headers
+					)
+
+				continuation = CaseInsensitiveDict(headers).get('x-ms-continuation')
+
+				if not continuation:
+					return headers
+
+				# The destination now exists: the condition only
+				# applies to the call that starts the rename
+				request_headers.pop('If-None-Match', None)
+
+		except HTTPError as e:
+			status_code = e.response.status_code if e.response is not None else None
+
+			if status_code == 404:
+				raise FileNotFoundError('The source path, or the parent of the destination path, does not exist.\n{} -> {}'.format(source_path, destination_path)) from e
+			elif _error_code(e) in ('PathAlreadyExists', 'ConditionNotMet') and not overwrite:
+				raise FileExistsError('The destination path already exists and the param [overwrite] is set to False.\n{}'.format(destination_path)) from e
+			else:
+				raise e
+
+		finally:
+			# Even a failed rename may have moved part of a large tree
+			self.__invalidate_metadata(source_path, recursive = True)
+			self.__invalidate_metadata(destination_path, recursive = True)
+
+	def path_delete(self
+		, path
+		, recursive = False
+		):
+		r"""Delete a file or a directory.
+
+		A large directory deleted with `recursive` may take several calls:
+		they are chained with the continuation token returned by the service
+		until the whole tree is deleted.
+
+		Parameters
+		----------
+		path : str
+			Absolute path of the file or directory to delete.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}[/{filename}]
+		recursive : bool, optional
+			If True, a directory is deleted with all its content.
+			If False, only an empty directory can be deleted.
+
+		Raises
+		------
+		ValueError
+			If `path` is a whole filesystem.
+		FileNotFoundError
+			If the specified `path` does not exist.
+		OSError
+			With errno ENOTEMPTY, if `path` is a directory that is not
+			empty and `recursive` is False.
+
+		"""
+
+		path, datalake_filesystem, datalake_path = self.__split_path(path)
+
+		if datalake_path is None:
+			raise ValueError('A filesystem cannot be deleted as a path.\n{}'.format(path))
+
+		continuation = None
+
+		try:
+			while True:
+				headers = self.__azure_datalake_rest_api_wrapper.path_delete(
+					filesystem = datalake_filesystem
+					, path = datalake_path
+					, recursive = recursive
+					, continuation = continuation
+					)
+
+				continuation = CaseInsensitiveDict(headers).get('x-ms-continuation')
+
+				if not continuation:
+					return
+
+		except HTTPError as e:
+			status_code = e.response.status_code if e.response is not None else None
+
+			if status_code == 404:
+				raise FileNotFoundError('The specified path does not exist.\n{}'.format(path)) from e
+			elif status_code == 409 and not recursive:
+				raise OSError(errno.ENOTEMPTY, 'The specified directory is not empty and the param [recursive] is set to False.', str(path)) from e
+			else:
+				raise e
+
+		finally:
+			# Even a failed delete may have removed part of a large tree
+			self.__invalidate_metadata(path, recursive = True)
+
+	def bulk_delete(self
+		, paths
+		, recursive = False
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, ordered = False
+		):
+		r"""Delete many paths, running the calls concurrently.
+
+		Parameters
+		----------
+		paths : iterable of str
+			Absolute paths to delete. The iterable is consumed lazily,
+			so it can be e.g. a generator over an inventory of millions
+			of expired files.
+		recursive : bool, optional
+			If True, directories are deleted with all their content.
+		max_concurrency : int, optional
+			Number of calls running at the same time. It should not
+			exceed the `pool_maxsize` of the client.
+		ordered : bool, optional
+			If True, the results are yielded in the order of `paths`,
+			otherwise as soon as they are available.
+
+		Returns
+		-------
+		generator
+			Yields a PathResult(path, value, error) for each path, where
+			`error` is the exception raised by `path_delete`, if any
+			(FileNotFoundError for paths already missing).
+			An error on a path does not stop the others.
+			Nothing is deleted until the generator is consumed.
+
+		"""
+
+		def delete(path):
+			self.path_delete(path, recursive = recursive)
+
+		return run_bulk(delete, paths, max_concurrency, ordered)
+
+	def file_create(self
+		, file_path
+		, file_data
+		, file_properties = None
+		, overwrite_if_exists = False
+		, chunk_size = DEFAULT_CHUNK_SIZE
+		, content_type = None
+		, max_concurrency = 1
+		, content_encoding = None
+		, compression_level = None
+		):
+		r"""Create a file at the specified path with the specified data.
+
+		The data is streamed to the datalake in appends of `chunk_size` bytes
+		at increasing positions, followed by a single flush, so the memory
+		used does not depend on the size of the file.
+		With `max_concurrency` greater than 1 the appends are executed in
+		parallel, and the flush is issued only once all of them succeeded.
+
+		Parameters
+		----------
+		file_path : str
+			Absolute path where the file has to be created.
+			The first element represents the filesystem (a.k.a container)
+			where the file is stored.
+			The last part of the path represents the name of the file.
+			We can thus see the path as:
+			/{filesystem}/{folder1}/.../{folderN}/{filename}
+		file_data : str, bytes-like, mmap, os.PathLike, file object, iterable
+			The data that will be written inside the file.
+			A str is encoded in UTF-8; bytes-like objects (bytes,
+			bytearray, memoryview, mmap, ...) are sent slice by slice,
+			without copies; a path-like object is read from the local
+			disk and a file object from its current position, straight
+			into the chunks sent (a single reused chunk if `max_concurrency`
+			is 1); an iterable must yield str or bytes-like objects.
+		file_properties : dict, OrderedDict, optional
+			The properties that will be set for the new file.
+		overwrite_if_exists: bool, optional
+			If True and the specified `file_path` already exists,
+			will overwrite the existing data and properties.
+		chunk_size : int, optional
+			Size in bytes of the data sent with each append call.
+		content_type : str, optional
+			Content type of the file. Defaults to 'text/plain' if
+			`file_data` is a str, 'application/octet-stream' otherwise.
+		max_concurrency : int, optional
+			Number of chunks uploaded at the same time. At most
+			`max_concurrency` chunks are held in memory. It should not
+			exceed the `pool_maxsize` of the client.
+		content_encoding : str, optional
+			If 'gzip' or 'zstd' (which requires the zstandard package),
+			the data is compressed on the fly, chunk by chunk, and the
+			Content-Encoding property of the file is set accordingly,
+			so that `file_read` returns the original data.
+			The size of the file is the size of the compressed data.
+		compression_level : int, optional
+			Compression level of `content_encoding`, defaults to
+			6 for gzip and 3 for zstd.
+
+		Returns
+		-------
+		dict
+			The headers of the response of the flush call.
+
+		Raises
+		------
+		FileExistsError
+			If the specified `file_path` already exists and
+			`overwrite_if_exists` is False.
+		ValueError
+			If `content_encoding` is not supported.
+
+		"""
+		
+		file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+		try:
+			file_status = self.stat(file_path)
+		except FileNotFoundError:
+			file_status = None
+
+		if file_status is not None:
+			if not overwrite_if_exists:
+				raise FileExistsError('The specified file_path already exists and the param [overwrite_if_exists] is set to False.\n{}'.format(file_path))
+			
+			if not file_status.is_file:
+				raise ValueError('The specified file_path already exists and is not a file.\n{}'.format(file_path))
+
+		response = self.__create_file(
+			file_path
+			, datalake_filesystem
+			, datalake_file_path
+			, file_data
+			, chunk_size = chunk_size
+			, content_type = content_type
+			, max_concurrency = max_concurrency
+			, content_encoding = content_encoding
+			, compression_level = compression_level
+		)
+
+		# TODO Set Properties
+
+		return response
+
+	def __create_file(self
+		, file_path
+		, datalake_filesystem
+		, datalake_file_path
+		, file_data
+		, chunk_size = DEFAULT_CHUNK_SIZE
+		, content_type = None
+		, max_concurrency = 1
+		, compute_md5 = False
+		, content_encoding = None
+		, compression_level = None
+		):
+		"""Creates (or overwrites) a file with the given data, without any check
+		on what is at `file_path`. With `content_encoding` the data is compressed
+		before the appends. Returns the headers of the response of the flush call.
+		"""
+
+		if content_type is None:
+			content_type = 'text/plain' if isinstance(file_data, str) else 'application/octet-stream'
+			
+		# The creation of a file with the specified properties requires different
+		# calls of the API. The steps are:
+		# * create an empty file
+		# * append the actual data, chunk by chunk
+		# * flush the data
+		# * set the properties
+
+		# Sequential appends are done with a chunk before reading the
+		# next one, so they can all be read into the same buffer
+		chunks = iter_chunks(file_data, chunk_size, reuse_buffer = max_concurrency <= 1)
+
+		create_headers = {'x-ms-content-type' : content_type}
+
+		if content_encoding is not None:
+			# Compressed before the file is created, so that an unsupported
+			# encoding does not leave an empty file behind
+			chunks = compress_chunks(chunks, content_encoding, chunk_size, level = compression_level)
+			create_headers['x-ms-content-encoding'] = content_encoding
+		elif isinstance(file_data, str):
+			create_headers['Content-Encoding'] = 'utf-8'
+
+		try:
+			self.__azure_datalake_rest_api_wrapper.path_create(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				, resource = 'file'
+				, request_headers = create_headers
+				)
+
+			return self.__upload_chunks(
+				datalake_filesystem
+				, datalake_file_path
+				, chunks
+				, content_type
+				, max_concurrency = max_concurrency
+				, compute_md5 = compute_md5
+				, content_encoding = content_encoding
+			)
+
+		finally:
+			self.__invalidate_metadata(file_path)
+
+	def __upload_chunks(self
+		, datalake_filesystem
+		, datalake_file_path
+		, chunks
+		, content_type
+		, max_concurrency = 1
+		, compute_md5 = False
+		, content_encoding = None
+		):
+		"""Appends the `chunks` to an existing empty file, one after the other
+		or `max_concurrency` at a time, and commits them with a single flush.
+		With `compute_md5` the MD5 of the data is computed on the fly and stored
+		as the Content-MD5 property of the file by the flush.
+		The flush sets the properties of the file, `content_encoding` included.
+		Returns the headers of the response of the flush call.
+		"""
+
+		md5 = hashlib.md5() if compute_md5 else None
+
+		if md5 is not None:
+			chunks = _hash_chunks(chunks, md5)
+
+		def append_chunk(chunk, position):
+			self.__azure_datalake_rest_api_wrapper.path_update(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				, action = 'append'
+				, position = str(position)
+				, request_headers = {
+					'Content-Type' : content_type
+					, 'Content-Length' : str(len(chunk))
+				}
+				, data_to_append = chunk
+			)
+
+		if max_concurrency > 1:
+			position = upload_chunks_parallel(
+				append_chunk
+				, chunks
+				, max_concurrency = max_concurrency
+			)
+		else:
+			position = 0
+
+			for chunk in chunks:
+				append_chunk(chunk, position)
+				position += len(chunk)
+
+		flush_headers = {
+			'Content-Length' : str(0)
+			, 'x-ms-content-type' : content_type
+		}
+		if content_encoding is not None:
+			flush_headers['x-ms-content-encoding'] = content_encoding
+		if md5 is not None:
+			flush_headers['x-ms-content-md5'] = base64.b64encode(md5.digest()).decode('ascii')
+
+		return self.__azure_datalake_rest_api_wrapper.path_update(
+			filesystem = datalake_filesystem
+			, path = datalake_file_path
+			, action = 'flush'
+			, close = 'true'
+			, position = str(position)
+			, request_headers = flush_headers
+		)
+
+	def file_append(self
+		, file_path
+		, data
+		, position
+		):
+		r"""Append data to an existing file, at the specified position.
+		The data is not visible to readers until it is committed by `file_flush`.
+
+		Parameters
+		----------
+		file_path : str
+			Absolute path of the file.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}/{filename}
+		data : bytes, bytearray, memoryview
+			The data to append.
+		position : int
+			Offset of the data in the file: the size of the file plus
+			the size of the data appended since the last flush.
+
+		"""
+
+		file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+		self.__azure_datalake_rest_api_wrapper.path_update(
+			filesystem = datalake_filesystem
+			, path = datalake_file_path
+			, action = 'append'
+			, position = str(position)
+			, request_headers = {
+				'Content-Type' : 'application/octet-stream'
+				, 'Content-Length' : str(len(memoryview(data).cast('B')))
+			}
+			, data_to_append = data
+		)
+
+	def file_flush(self
+		, file_path
+		, position
+		, close = False
+		, retain_uncommitted_data = False
+		, content_type = None
+		):
+		r"""Commit the data appended to a file up to `position`, its new size.
+
+		Parameters
+		----------
+		file_path : str
+			Absolute path of the file.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}/{filename}
+		position : int
+			Size of the file once the data is committed.
+		close : bool, optional
+			True for the last flush of a stream of appends: the service
+			then notifies the change to the event subscribers, if any.
+		retain_uncommitted_data : bool, optional
+			If True, data appended beyond `position` is kept, to be
+			committed by a following flush; otherwise it is discarded.
+		content_type : str, optional
+			Content type of the file, set by the flush.
+
+		Returns
+		-------
+		dict
+			The headers of the response.
+
+		"""
+
+		file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+		request_headers = {'Content-Length' : str(0)}
+		if content_type is not None:
+			request_headers['x-ms-content-type'] = content_type
+
+		try:
+			return self.__azure_datalake_rest_api_wrapper.path_update(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				, action = 'flush'
+				, position = str(position)
+				, retainUncommittedData = str(retain_uncommitted_data).lower()
+				, close = str(close).lower()
+				, request_headers = request_headers
+			)
+
+		finally:
+			self.__invalidate_metadata(file_path)
+
+	def upload_directory(self
+		, local_path
+		, remote_path
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, checksum = False
+		, chunk_size = DEFAULT_CHUNK_SIZE
+		):
+		r"""Incrementally upload a local directory tree to the datalake.
+
+		The remote tree is listed once, and a local file is uploaded only
+		if the remote copy is missing, has a different size, or is older
+		than the local file. Up to `max_concurrency` files are uploaded
+		at the same time. Missing directories are created once (empty
+		directories explicitly, the others together with their content).
+		State files of `download_directory` with the default name are
+		not uploaded.
+
+		Parameters
+		----------
+		local_path : str, os.PathLike
+			Local directory to upload.
+		remote_path : str
+			Absolute path of the destination directory.
+			We can see the path as:
+			/{filesystem}[/{folder1}/.../{folderN}]
+		max_concurrency : int, optional
+			Number of files uploaded at the same time. It should not
+			exceed the `pool_maxsize` of the client.
+		checksum : bool, optional
+			If True, the MD5 of the uploaded files is stored in the
+			datalake, and a file with the same size as its remote copy
+			but a newer modification time is compared by MD5 (one more
+			call) instead of being uploaded again.
+		chunk_size : int, optional
+			Size in bytes of the data sent with each append call.
+
+		Returns
+		-------
+		TransferSummary
+			The remote paths transferred and skipped, and the files
+			that failed, each with its error. A failed file does not
+			stop the others.
+
+		Raises
+		------
+		NotADirectoryError
+			If `local_path` is not a directory.
+
+		"""
+
+		remote_path, datalake_filesystem, datalake_path = self.__split_path(remote_path, 'remote_path')
+		local_path = pathlib.Path(local_path)
+
+		if not local_path.is_dir():
+			raise NotADirectoryError('The param [local_path] is not a directory.\n{}'.format(local_path))
+
+		# One listing of what is already in the datalake
+		try:
+			remote_index = {
+				posixpath.relpath(entry.path, str(remote_path)) : entry
+				for entry in self.list_paths(remote_path, recursive = True)
+			}
+		except FileNotFoundError:
+			remote_index = {}
+
+		local_files = []
+		missing_directories = []
+
+		for dirpath, dirnames, filenames in os.walk(local_path):
+			relative_directory = pathlib.Path(dirpath).relative_to(local_path).as_posix()
+
+			# The state files of download_directory are not user data
+			relative_paths = [
+				posixpath.normpath(posixpath.join(relative_directory, filename))
+				for filename in filenames
+				if not is_state_file(filename)
+			]
+
+			# Directories with some content are created together with it
+			if not dirnames and not relative_paths and relative_directory not in remote_index:
+				if relative_directory != '.' or datalake_path is not None:
+					missing_directories.append(relative_directory)
+
+			local_files.extend(relative_paths)
+
+		for relative_directory in missing_directories:
+			directory_path = posixpath.normpath(posixpath.join(str(remote_path), relative_directory))
+			_, _, datalake_directory_path = self.__split_path(directory_path)
+
+			self.__azure_datalake_rest_api_wrapper.path_create(
+				filesystem = datalake_filesystem
+				, path = datalake_directory_path
+				, resource = 'directory'
+				)
+			self.__invalidate_metadata(directory_path)
+
+		def upload_file(relative_path):
+			source = local_path.joinpath(*relative_path.split('/'))
+			destination = posixpath.join(str(remote_path), relative_path)
+			_, _, datalake_file_path = self.__split_path(destination)
+
+			if self.__is_remote_copy_current(
+				source
+				, remote_index.get(relative_path)
+				, datalake_filesystem
+				, datalake_file_path
+				, checksum
+				):
+				return False
+
+			self.__create_file(
+				destination
+				, datalake_filesystem
+				, datalake_file_path
+				, source
+				, chunk_size = chunk_size
+				, compute_md5 = checksum
+			)
+
+			return True
+
+		transferred = []
+		skipped = []
+		failed = []
+
+		for result in run_bulk(upload_file, local_files, max_concurrency, ordered = False):
+			destination = posixpath.join(str(remote_path), result.path)
+
+			if result.error is not None:
+				failed.append(PathResult(destination, None, result.error))
+			elif result.value:
+				transferred.append(destination)
+			else:
+				skipped.append(destination)
+
+		return TransferSummary(transferred, skipped, failed)
+
+	def __is_remote_copy_current(self, local_file, remote_status, datalake_filesystem, datalake_file_path, checksum):
+		"""Checks if the remote copy of `local_file`, as listed in `remote_status`,
+		is up to date: same size and not older than the local file or, with
+		`checksum`, same MD5.
+		"""
+
+		if remote_status is None or remote_status.is_directory:
+			return False
+
+		local_stat = local_file.stat()
+
+		if remote_status.size != local_stat.st_size:
+			return False
+
+		local_last_modified = datetime.datetime.fromtimestamp(local_stat.st_mtime, datetime.timezone.utc)
+
+		if remote_status.last_modified is not None and remote_status.last_modified >= local_last_modified:
+			return True
+
+		if not checksum:
+			return False
+
+		remote_headers = CaseInsensitiveDict(self.__azure_datalake_rest_api_wrapper.path_get_properties(
+			filesystem = datalake_filesystem
+			, path = datalake_file_path
+			))
+
+		if not remote_headers.get('Content-MD5'):
+			return False
+
+		local_md5 = hashlib.md5()
+		with open(local_file, 'rb') as file_object:
+			for chunk in iter(lambda: file_object.read(DEFAULT_CHUNK_SIZE), b''):
+				local_md5.update(chunk)
+
+		return base64.b64encode(local_md5.digest()).decode('ascii') == remote_headers['Content-MD5']
+
+	def file_read_into(self
+		, file_path
+		, buffer
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, range_size = DEFAULT_RANGE_SIZE
+		, chunk_retries = DEFAULT_CHUNK_RETRIES
+		):
+		r"""Download a whole file into a preallocated buffer, fetching byte
+		ranges of the file in parallel and writing each of them in place.
+
+		A file whose Content-Encoding is gzip or zstd (see `file_create`)
+		is instead streamed with a single request and decompressed into
+		`buffer`, which must then hold the decompressed content.
+
+		Parameters
+		----------
+		file_path : str
+			Absolute path of the file to read.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}/{filename}
+		buffer : bytearray, memoryview
+			Writable bytes-like object, at least as large as the file.
+		max_concurrency : int, optional
+			Number of ranges downloaded at the same time. It should not
+			exceed the `pool_maxsize` of the client.
+		range_size : int, optional
+			Size in bytes of each range.
+		chunk_retries : int, optional
+			Number of times a range is requested again after an error
+			while reading its body (e.g. a connection broken in the
+			middle of it). Failed requests are retried according to
+			the `retry_policy` of the client, not by `chunk_retries`.
+
+		Returns
+		-------
+		int
+			The size of the file (decompressed, if compressed), i.e.
+			the number of bytes written at the beginning of `buffer`.
+
+		Raises
+		------
+		FileNotFoundError
+			If the specified `file_path` does not exist.
+		IsADirectoryError
+			If the specified `file_path` is a directory.
+		ValueError
+			If `buffer` is smaller than the file, or than the
+			decompressed content of a compressed file, or if the
+			compressed content is corrupted.
+		HTTPError
+			If the file is modified while it is being downloaded
+			(all the ranges are requested with the ETag of the file).
+
+		"""
+
+		file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+		file_status = self.stat(file_path)
+
+		if file_status.is_directory:
+			raise IsADirectoryError('The specified file_path is a directory.\n{}'.format(file_path))
+
+		view = memoryview(buffer).cast('B')
+
+		if is_supported(file_status.content_encoding):
+			return _write_chunks_into(
+				self.__stream_content(file_path, datalake_filesystem, datalake_file_path, file_status)
+				, view
+			)
+
+		if len(view) < file_status.size:
+			raise ValueError('The param [buffer] is smaller than the file: {} < {} bytes.'.format(len(view), file_status.size))
+
+		return self.__download_into(
+			datalake_filesystem
+			, datalake_file_path
+			, file_status
+			, view
+			, max_concurrency = max_concurrency
+			, range_size = range_size
+			, chunk_retries = chunk_retries
+		)
+
+	def __download_into(self
+		, datalake_filesystem
+		, datalake_file_path
+		, file_status
+		, view
+		, max_concurrency
+		, range_size
+		, chunk_retries
+		):
+		"""Downloads the file described by `file_status` into `view` with
+		parallel range requests, all conditioned on the ETag of the file.
+		"""
+
+		request_headers = {'If-Match' : file_status.etag} if file_status.etag else None
+
+		def read_range(range_view, offset):
+			return self.__azure_datalake_rest_api_wrapper.path_read_into(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				, buffer = range_view
+				, offset = offset
+				, request_headers = request_headers
+			)
+
+		return download_ranges_parallel(
+			read_range
+			, view[:file_status.size]
+			, range_size = range_size
+			, max_concurrency = max_concurrency
+			, chunk_retries = chunk_retries
+		)
+
+	def file_read_bytes(self
+		, file_path
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, range_size = DEFAULT_RANGE_SIZE
+		, chunk_retries = DEFAULT_CHUNK_RETRIES
+		):
+		r"""Download a whole file as binary data, fetching byte ranges
+		of the file in parallel. See `file_read_into` for the parameters.
+		A compressed file is streamed and decompressed instead.
+
+		Returns
+		-------
+		bytearray
+			The content of the file, decompressed if compressed.
+
+		"""
+
+		file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+		file_status = self.stat(file_path)
+
+		if file_status.is_directory:
+			raise IsADirectoryError('The specified file_path is a directory.\n{}'.format(file_path))
+
+		if is_supported(file_status.content_encoding):
+			buffer = bytearray()
+
+			for chunk in self.__stream_content(file_path, datalake_filesystem, datalake_file_path, file_status):
+				buffer += chunk
+
+			return buffer
+
+		buffer = bytearray(file_status.size)
+
+		self.__download_into(
+			datalake_filesystem
+			, datalake_file_path
+			, file_status
+			, memoryview(buffer)
+			, max_concurrency = max_concurrency
+			, range_size = range_size
+			, chunk_retries = chunk_retries
+		)
+
+		return buffer
+
+	def __stream_content(self, file_path, datalake_filesystem, datalake_file_path, file_status):
+		"""Returns a generator of the (decompressed) content of the file described
+		by `file_status`, streamed with a single request conditioned on its ETag.
+		"""
+
+		request_headers = {'If-Match' : file_status.etag} if file_status.etag else None
+
+		try:
+			response = self.__azure_datalake_rest_api_wrapper.path_read(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				, request_headers = request_headers
+				, stream = True
+			)
+
+		except HTTPError as e:
+			if e.response is not None and e.response.status_code == 404:
+				raise FileNotFoundError('The specified path does not exist.\n{}'.format(file_path)) from e
+			else:
+				raise e
+
+		return self.__iter_response_chunks(response, DEFAULT_READ_CHUNK_SIZE)
+
+	def file_read_range_into(self
+		, file_path
+		, buffer
+		, offset = 0
+		, etag = None
+		):
+		r"""Read a byte range of a file directly into `buffer`, with a single
+		call to the datalake. The bytes are read as they are stored, so
+		compressed for a file with a Content-Encoding (see `stat`).
+
+		Parameters
+		----------
+		file_path : str
+			Absolute path of the file to read.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}/{filename}
+		buffer : bytearray, memoryview
+			Writable bytes-like object: the length of the range
+			is the length of `buffer`.
+		offset : int, optional
+			Offset of the range in the file.
+		etag : str, optional
+			If given, the read fails unless the file still has this ETag,
+			so that ranges read at different times are consistent.
+			With a `block_cache`, only the reads with an ETag are cached.
+
+		Returns
+		-------
+		int
+			The number of bytes read, smaller than the length of
+			`buffer` only if the file ends before.
+
+		Raises
+		------
+		FileNotFoundError
+			If the specified `file_path` does not exist.
+		HTTPError
+			If the file no longer has the ETag `etag`.
+
+		"""
+
+		file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+		request_headers = None
+		if etag:
+			etag = etag.strip('"')
+			request_headers = {'If-Match' : '"{}"'.format(etag)}
+
+		def read_range(range_buffer, range_offset):
+			return self.__azure_datalake_rest_api_wrapper.path_read_into(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				, buffer = range_buffer
+				, offset = range_offset
+				, request_headers = request_headers
+			)
+
+		try:
+			# Blocks can be cached only for a known version of the file
+			if self.__block_cache is not None and etag:
+				return self.__block_cache.read_into(file_path, etag, buffer, offset, read_range)
+
+			return read_range(buffer, offset)
+
+		except HTTPError as e:
+			if e.response is not None and e.response.status_code == 404:
+				raise FileNotFoundError('The specified path does not exist.\n{}'.format(file_path)) from e
+			else:
+				raise e
+
+	def open(self
+		, file_path
+		, mode = 'rb'
+		, buffering = -1
+		, min_readahead = DEFAULT_MIN_READAHEAD
+		, max_readahead = DEFAULT_MAX_READAHEAD
+		, append_size = DEFAULT_APPEND_SIZE
+		, flush_size = DEFAULT_FLUSH_SIZE
+		, flush_interval = None
+		, decompress = True
+		):
+		r"""Open a file of the datalake as a binary file object, either
+		seekable for reading ('rb') or appending to its end ('ab').
+
+		For reading, every read is served with HTTP Range requests, so only
+		the parts of the file actually read are downloaded. Sequential reads
+		fetch growing ranges ahead (from `min_readahead` up to `max_readahead`
+		bytes), random reads only what they need; large reads, e.g. with
+		`readinto`, are copied into the buffer of the caller as they arrive.
+		All the ranges are requested with the ETag the file had when opened:
+		if the file is modified meanwhile, the following reads fail instead
+		of mixing two versions of it.
+		A file whose Content-Encoding is gzip or zstd (see `file_create`)
+		has no random access: it is streamed with a single request and
+		decompressed as it is read, by a file object that is not seekable.
+
+		For appending, the file is created if missing; a compressed file
+		cannot be appended to. The data written is
+		buffered and sent with few, large append calls, and committed (made
+		visible to readers) every `flush_size` bytes, every `flush_interval`
+		seconds, on `flush` and on `close`. See `DataLakeFileWriter`.
+		Only one writer at a time should append to a file.
+
+		Parameters
+		----------
+		file_path : str
+			Absolute path of the file to open.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}/{filename}
+		mode : str, optional
+			'rb' to read the file, 'ab' to append to it.
+		buffering : int, optional
+			('rb' only) As for the built-in `open`: 0 to get the raw,
+			unbuffered, file object, -1 for a buffer of the default size,
+			any other positive value for a buffer of that size.
+		min_readahead : int, optional
+			('rb' only) Size in bytes of the smallest range requested
+			by small reads.
+		max_readahead : int, optional
+			('rb' only) Size in bytes of the largest range requested
+			ahead during sequential reads.
+		append_size : int, optional
+			('ab' only) Maximum size in bytes of the data sent with each append call.
+		flush_size : int, optional
+			('ab' only) Number of bytes appended after which they are
+			committed. None to commit only on `flush` and `close`.
+		flush_interval : float, optional
+			('ab' only) If set, the data written is appended and committed
+			every `flush_interval` seconds by a background thread.
+		decompress : bool, optional
+			('rb' only) If False, a compressed file is read as it is
+			stored, seekable, like any other file.
+
+		Returns
+		-------
+		io.BufferedReader, DataLakeFileReader, DataLakeStreamReader, DataLakeFileWriter
+			The file object: a DataLakeFileReader (DataLakeStreamReader
+			for a file decompressed) if `buffering` is 0, a
+			DataLakeFileWriter for mode 'ab'.
+
+		Raises
+		------
+		ValueError
+			If `mode` is not supported, or if a compressed file
+			is opened for appending.
+		FileNotFoundError
+			If the specified `file_path` does not exist (mode 'rb').
+		IsADirectoryError
+			If the specified `file_path` is a directory.
+
+		"""
+
+		if mode == 'ab':
+			return self.__open_append(file_path, append_size, flush_size, flush_interval)
+
+		if mode != 'rb':
+			raise ValueError('The param [mode] must be \'rb\' or \'ab\'. Value passed:\n{}'.format(mode))
+
+		file_status = self.stat(file_path)
+
+		if file_status.is_directory:
+			raise IsADirectoryError('The specified file_path is a directory.\n{}'.format(file_path))
+
+		if decompress and is_supported(file_status.content_encoding):
+			file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+			raw = DataLakeStreamReader(
+				self.__stream_content(file_path, datalake_filesystem, datalake_file_path, file_status)
+				, name = str(file_status.path)
+			)
+
+		else:
+			def read_range(buffer, offset):
+				return self.file_read_range_into(file_path, buffer, offset, etag = file_status.etag)
+
+			raw = DataLakeFileReader(
+				read_range
+				, file_status.size
+				, name = str(file_status.path)
+				, min_readahead = min_readahead
+				, max_readahead = max_readahead
+			)
+
+		if buffering == 0:
+			return raw
+
+		return io.BufferedReader(raw, buffer_size = io.DEFAULT_BUFFER_SIZE if buffering < 0 else buffering)
+
+	def __open_append(self, file_path, append_size, flush_size, flush_interval):
+		"""Returns a DataLakeFileWriter appending to the end of `file_path`,
+		created if missing."""
+
+		file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+		try:
+			file_status = self.stat(file_path)
+		except FileNotFoundError:
+			file_status = None
+
+		content_type = None
+
+		if file_status is None:
+			content_type = 'application/octet-stream'
+
+			try:
+				self.__azure_datalake_rest_api_wrapper.path_create(
+					filesystem = datalake_filesystem
+					, path = datalake_file_path
+					, resource = 'file'
+					, request_headers = {'x-ms-content-type' : content_type}
+					)
+
+			finally:
+				self.__invalidate_metadata(file_path)
+
+		elif file_status.is_directory:
+			raise IsADirectoryError('The specified file_path is a directory.\n{}'.format(file_path))
+
+		elif is_supported(file_status.content_encoding):
+			# Plain data after the compressed stream would make the whole file unreadable
+			raise ValueError('The specified file_path is compressed ({}) and cannot be appended to.\n{}'.format(
+				file_status.content_encoding, file_path))
+
+		def append(data, position):
+			self.file_append(file_path, data, position)
+
+		def commit(position, close):
+			# A new file keeps the content type it was created with
+			self.file_flush(file_path, position, close = close, content_type = content_type)
+
+		return DataLakeFileWriter(
+			append
+			, commit
+			, position = file_status.size if file_status is not None else 0
+			, name = str(file_path)
+			, append_size = append_size
+			, flush_size = flush_size
+			, flush_interval = flush_interval
+		)
+
+	def download_directory(self
+		, remote_path
+		, local_path
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, state_file = None
+		, chunk_size = DEFAULT_READ_CHUNK_SIZE
+		):
+		r"""Incrementally mirror a directory of the datalake to a local directory.
+
+		The remote tree is listed once, and a file is downloaded only if its
+		ETag or last modification time changed since the previous run (as
+		recorded in a local state file), or if the local copy is missing or
+		has a different size. Up to `max_concurrency` files are downloaded
+		at the same time, each into a temporary file renamed over the
+		destination once complete, so readers never see a partial file.
+		The modification time of the local files is set to the one in
+		the datalake.
+
+		Local files without a remote counterpart are left untouched.
+		Remote files named like the default state file, or that would
+		be downloaded over `state_file`, are skipped.
+
+		Parameters
+		----------
+		remote_path : str
+			Absolute path of the directory to mirror.
+			We can see the path as:
+			/{filesystem}[/{folder1}/.../{folderN}]
+		local_path : str, os.PathLike
+			Local destination directory, created if missing.
+		max_concurrency : int, optional
+			Number of files downloaded at the same time. It should not
+			exceed the `pool_maxsize` of the client.
+		state_file : str, os.PathLike, optional
+			File recording the ETag of the files downloaded. Defaults
+			to a hidden file in the root of `local_path`.
+		chunk_size : int, optional
+			Size in bytes of the chunks written to the local files.
+
+		Returns
+		-------
+		TransferSummary
+			The local paths transferred and skipped, and the files
+			that failed, each with its error. A failed file does not
+			stop the others, and is downloaded again by the next run.
+
+		Raises
+		------
+		FileNotFoundError
+			If the specified `remote_path` does not exist.
+
+		"""
+
+		remote_path, datalake_filesystem, datalake_path = self.__split_path(remote_path, 'remote_path')
+		local_path = pathlib.Path(local_path)
+
+		if state_file is None:
+			state_file = local_path / DEFAULT_STATE_FILENAME
+
+		local_path.mkdir(parents = True, exist_ok = True)
+		state_file_path = os.path.abspath(state_file)
+
+		previous_state = load_sync_state(state_file, remote_path)
+		state = {}
+		remote_files = []
+
+		# One listing of the whole remote tree
+		for entry in self.list_paths(remote_path, recursive = True):
+			relative_path = posixpath.relpath(entry.path, str(remote_path))
+			destination = local_path.joinpath(*relative_path.split('/'))
+
+			if entry.is_directory:
+				destination.mkdir(parents = True, exist_ok = True)
+				continue
+
+			# Never overwrite the state file with a remote copy of one
+			if is_state_file(relative_path) or os.path.abspath(destination) == state_file_path:
+				continue
+
+			entry_state = {
+				'etag' : entry.etag
+				, 'last_modified' : entry.last_modified.isoformat() if entry.last_modified else None
+			}
+
+			if previous_state.get(relative_path) == entry_state and _local_size(destination) == entry.size:
+				state[relative_path] = entry_state
+
+			remote_files.append((relative_path, destination, entry, entry_state))
+
+		def download_file(remote_file):
+			relative_path, destination, entry, entry_state = remote_file
+
+			if relative_path in state:
+				return False
+
+			_, _, datalake_file_path = self.__split_path(entry.path)
+
+			self.__download_to_file(
+				entry
+				, datalake_filesystem
+				, datalake_file_path
+				, destination
+				, chunk_size
+			)
+
+			return True
+
+		transferred = []
+		skipped = []
+		failed = []
+
+		try:
+			for result in run_bulk(download_file, remote_files, max_concurrency, ordered = False):
+				relative_path, destination, _, entry_state = result.path
+
+				if result.error is not None:
+					failed.append(PathResult(str(destination), None, result.error))
+				elif result.value:
+					state[relative_path] = entry_state
+					transferred.append(str(destination))
+				else:
+					skipped.append(str(destination))
+
+		finally:
+			# Record what was mirrored so far, even if interrupted
+			save_sync_state(state_file, remote_path, state)
+
+		return TransferSummary(transferred, skipped, failed)
+
+	def __download_to_file(self, file_status, datalake_filesystem, datalake_file_path, destination, chunk_size):
+		"""Streams the file described by `file_status` into a temporary file next
+		to `destination`, then renames it over `destination`.
+		"""
+
+		request_headers = None
+		if file_status.etag:
+			# The listing returns the ETag without the quotes
+			request_headers = {'If-Match' : '"{}"'.format(file_status.etag.strip('"'))}
+
+		destination.parent.mkdir(parents = True, exist_ok = True)
+		descriptor, temp_path = tempfile.mkstemp(dir = destination.parent, prefix = '.' + destination.name + '.', suffix = '.part')
+
+		try:
+			with os.fdopen(descriptor, 'wb') as file_object:
+				response = self.__azure_datalake_rest_api_wrapper.path_read(
+					filesystem = datalake_filesystem
+					, path = datalake_file_path
+					, request_headers = request_headers
+					, stream = True
+				)
+
+				# Stored as in the datalake, compressed or not, so that
+				# the local size can be compared with the listed one
+				for chunk in self.__iter_response_chunks(response, chunk_size, decompress = False):
+					file_object.write(chunk)
+
+			if file_status.last_modified is not None:
+				timestamp = file_status.last_modified.timestamp()
+				os.utime(temp_path, (timestamp, timestamp))
+
+			set_default_mode(temp_path)
+			os.replace(temp_path, destination)
+
+		except BaseException:
+			os.unlink(temp_path)
+			raise
+
+	def file_delete(self, file_path):
+		r"""Delete a file.
+
+		Parameters
+		----------
+		file_path : str
+			Absolute path of the file to delete.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}/{filename}
+
+		Raises
+		------
+		FileNotFoundError
+			If the specified `file_path` does not exist.
+		IsADirectoryError
+			If the specified `file_path` is a directory.
+
+		"""
+
+		if self.stat(file_path).is_directory:
+			raise IsADirectoryError('The specified file_path is a directory.\n{}'.format(file_path))
+
+		self.path_delete(file_path)
+
+	def file_read_cached(self
+		, file_path
+		, chunk_size = DEFAULT_READ_CHUNK_SIZE
+		):
+		r"""Read the whole content of a file through the local `content_cache`
+		of the client.
+
+		If a version of the file is cached, it is revalidated with a single
+		conditional request (If-None-Match): if the file did not change the
+		service answers 304 Not Modified, without body, and the cached content
+		is returned. Otherwise the content is downloaded and cached.
+
+		Parameters
+		----------
+		file_path : str
+			Absolute path of the file to read.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}/{filename}
+		chunk_size : int, optional
+			Size in bytes of the chunks read from the connection.
+
+		Returns
+		-------
+		bytes
+			The content of the file.
+
+		Raises
+		------
+		ValueError
+			If the client has no `content_cache`.
+		FileNotFoundError
+			If the specified `file_path` does not exist.
+
+		"""
+
+		if self.__content_cache is None:
+			raise ValueError('The client has no content_cache.')
+
+		file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+		key = '{}{}'.format(self.__storage_account_name, file_path)
+		cached = self.__content_cache.get(key)
+
+		request_headers = None
+		if cached is not None and cached.get('etag'):
+			request_headers = {'If-None-Match' : cached['etag']}
+
+		try:
+			response = self.__azure_datalake_rest_api_wrapper.path_read(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				, request_headers = request_headers
+				, stream = True
+			)
+
+			if response.status_code == 304:
+				response.close()
+
+				content = self.__content_cache.read(key, cached['etag'])
+
+				if content is not None:
+					return content
+
+				# The entry was replaced or evicted meanwhile
+				response = self.__azure_datalake_rest_api_wrapper.path_read(
+					filesystem = datalake_filesystem
+					, path = datalake_file_path
+					, stream = True
+				)
+
+		except HTTPError as e:
+			if e.response is not None and e.response.status_code == 404:
+				self.__content_cache.invalidate(key)
+				raise FileNotFoundError('The specified path does not exist.\n{}'.format(file_path)) from e
+			else:
+				raise e
+
+		return self.__content_cache.put(
+			key
+			, response.headers.get('ETag')
+			, response.headers.get('Content-Type')
+			, self.__iter_response_chunks(response, chunk_size)
+		)
+
+	def file_read(self
+		, file_path
+		, chunk_size = DEFAULT_READ_CHUNK_SIZE
+		, lines = False
+		, encoding = 'utf-8'
+		, decompress = True
+		):
+		r"""Stream the content of a file, as it arrives from the datalake.
+
+		Memory usage is bounded by `chunk_size` (plus the longest line,
+		when reading lines), whatever the size of the file.
+		A file whose Content-Encoding is gzip or zstd (see `file_create`)
+		is transferred compressed and decompressed on the fly; each chunk
+		read from the connection then yields its decompressed data at once.
+
+		Parameters
+		----------
+		file_path : str
+			Absolute path of the file to read.
+			We can see the path as:
+			/{filesystem}/{folder1}/.../{folderN}/{filename}
+		chunk_size : int, optional
+			Size in bytes of the chunks read from the connection.
+		lines : bool, optional
+			If False, yields the content as bytes chunks of at most
+			`chunk_size` bytes.
+			If True, decodes the content with `encoding` and yields
+			it line by line, line terminators included.
+		encoding : str, optional
+			Encoding used to decode the content when `lines` is True.
+		decompress : bool, optional
+			If False, the content of a compressed file is returned as
+			it is stored, without decompressing it.
+
+		Returns
+		-------
+		generator
+			Yields bytes, or str if `lines` is True. Closing the generator
+			before the end releases the connection.
+
+		Raises
+		------
+		FileNotFoundError
+			If the specified `file_path` does not exist.
+		EOFError
+			During the iteration, if the compressed content is truncated.
+		ValueError
+			During the iteration, if the compressed content is corrupted.
+
+		"""
+
+		file_path, datalake_filesystem, datalake_file_path = self.__split_path(file_path, 'file_path')
+
+		# The request is sent right away, so that errors are raised
+		# by this call and not when the iteration starts.
+		try:
+			response = self.__azure_datalake_rest_api_wrapper.path_read(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				, stream = True
+			)
+
+		except HTTPError as e:
+			if e.response is not None and e.response.status_code == 404:
+				raise FileNotFoundError('The specified path does not exist.\n{}'.format(file_path)) from e
+			else:
+				raise e
+
+		if lines:
+			return self.__iter_response_lines(response, chunk_size, encoding, decompress)
+		else:
+			return self.__iter_response_chunks(response, chunk_size, decompress)
+
+	def __iter_response_chunks(self, response, chunk_size, decompress = True):
+
+		content_encoding = response.headers.get('Content-Encoding')
+
+		with response:
+			if not is_supported(content_encoding):
+				yield from response.iter_content(chunk_size = chunk_size)
+				return
+
+			# Read as it is stored, since requests would only decode
+			# some of the encodings, and without checking for truncation
+			chunks = response.raw.stream(chunk_size, decode_content = False)
+
+			if decompress:
+				yield from decompress_chunks(chunks, content_encoding)
+			else:
+				yield from chunks
+
+	def __iter_response_lines(self, response, chunk_size, encoding, decompress = True):
+
+		decoder = codecs.getincrementaldecoder(encoding)()
+		pending = ''
+
+		for chunk in self.__iter_response_chunks(response, chunk_size, decompress):
+			pending += decoder.decode(chunk)
+
+			lines = pending.split('\n')
+			pending = lines.pop()
+
+			for line in lines:
+				yield line + '\n'
+
+		pending += decoder.decode(b'', final = True)
+
+		if pending:
+			yield pending
+		
+	def file_update(self):
+		"""TODO Fill in the method description"""
+		
+		raise NotImplementedError()
+		
+	def file_set_properties(self):
+		"""TODO Fill in the method description"""
+		
+		raise NotImplementedError()
+		
+	def read_file(self, filepath):
+
+		response = self.__azure_datalake_rest_api_wrapper.path_read(
+			filesystem = 'raw-temporary'
+			, path = 'test.csv'
+		)
+
+		return response
+
+# ---------------------------------------------------------------------
+
+def _error_code(error):
+	"""Returns the x-ms-error-code of the response of an HTTPError, None if missing."""
+
+	if error.response is None:
+		return None
+
+	return error.response.headers.get('x-ms-error-code')
+
+def _write_chunks_into(chunks, view):
+	"""Writes the bytes `chunks` one after the other at the beginning of `view`,
+	and returns the number of bytes written. Raises ValueError if they do not fit.
+	"""
+
+	position = 0
+
+	try:
+		for chunk in chunks:
+			if position + len(chunk) > len(view):
+				raise ValueError('The param [buffer] is smaller than the decompressed content: more than {} bytes.'.format(len(view)))
+
+			view[position:position + len(chunk)] = chunk
+			position += len(chunk)
+
+	finally:
+		# Releases the connection if the content does not fit
+		close = getattr(chunks, 'close', None)
+		if close is not None:
+			close()
+
+	return position
+
+def _local_size(path):
+	"""Returns the size of the local file `path`, None if it does not exist."""
+
+	try:
+		return os.stat(path).st_size
+	except FileNotFoundError:
+		return None
+
+def _hash_chunks(chunks, md5):
+	"""Yields `chunks` unchanged, updating `md5` with each of them."""
+
+	for chunk in chunks:
+		md5.update(chunk)
+		yield chunk
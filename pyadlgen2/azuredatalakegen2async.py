@@ -0,0 +1,340 @@
+"""Asynchronous (asyncio) counterpart of AzureDataLakeGen2.
+
+Requires aiohttp.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import aiohttp
+import asyncio
+import pathlib
+
+# Internal Libraries
+from pyadlgen2.helpers.adlgen2restapiwrapperasync import (
+	ADLGen2RestApiWrapperAsync
+	, DEFAULT_MAX_CONNECTIONS
+	, DEFAULT_MAX_CONCURRENCY
+)
+from pyadlgen2.helpers.datalakepath import split_datalake_path
+from pyadlgen2.helpers.pathstatus import PathStatus
+from pyadlgen2.helpers.uploadsource import iter_chunks, DEFAULT_CHUNK_SIZE
+
+# ---------------------------------------------------------------------
+
+class AzureDataLakeGen2Async():
+
+	"""
+	Asynchronous client for the datalake: every operation is a coroutine (or an
+	async generator), with the same parameters and results as AzureDataLakeGen2.
+	"""
+
+	def __init__(self
+		, storage_account_name
+		, storage_account_key
+		, max_connections = DEFAULT_MAX_CONNECTIONS
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, connect_timeout = None
+		, read_timeout = None
+		, retry_policy = None
+		):
+		r"""
+		Parameters
+		----------
+		storage_account_name : str
+			Name of the storage account.
+		storage_account_key : str
+			Access key of the storage account.
+		max_connections : int, optional
+			Maximum number of connections of the shared connection pool.
+		max_concurrency : int, optional
+			Maximum number of requests in flight at the same time,
+			across all the operations of the client.
+		connect_timeout : float, optional
+			Seconds to wait for a connection to the service to be established.
+		read_timeout : float, optional
+			Seconds to wait for the service to send data.
+		retry_policy : RetryPolicy, optional
+			How failed calls are retried, see `AzureDataLakeGen2`.
+
+		The client owns pooled HTTP connections: use it as an async context
+		manager, or await `close()` when done, to release them.
+		"""
+
+		self.__azure_datalake_rest_api_wrapper = ADLGen2RestApiWrapperAsync(
+			storage_account_name
+			, storage_account_key
+			, max_connections = max_connections
+			, max_concurrency = max_concurrency
+			, connect_timeout = connect_timeout
+			, read_timeout = read_timeout
+			, retry_policy = retry_policy
+			)
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		await self.close()
+
+	async def close(self):
+		"""Close the pooled connections used to talk to the datalake."""
+
+		await self.__azure_datalake_rest_api_wrapper.close()
+
+	async def __get_status_headers(self, path):
+
+		path, datalake_filesystem, datalake_path = split_datalake_path(path)
+
+		try:
+			if datalake_path is None:
+				return await self.__azure_datalake_rest_api_wrapper.filesystem_get_properties(
+					filesystem = datalake_filesystem
+					)
+
+			return await self.__azure_datalake_rest_api_wrapper.path_get_properties(
+				filesystem = datalake_filesystem
+				, path = datalake_path
+				, upn = True
+				, action = 'getStatus'
+				)
+
+		except aiohttp.ClientResponseError as e:
+			if e.status == 404:
+				raise FileNotFoundError('The specified path does not exist.\n{}'.format(path)) from e
+			else:
+				raise e
+
+	async def stat(self, path):
+		r"""Get the status of the specified path with a single call to the datalake.
+		See `AzureDataLakeGen2.stat`.
+
+		Returns
+		-------
+		PathStatus
+
+		Raises
+		------
+		FileNotFoundError
+			If the specified `path` does not exist.
+
+		"""
+
+		headers = await self.__get_status_headers(path)
+
+		return PathStatus.from_headers(pathlib.PurePosixPath(path), headers)
+
+	async def path_exists(self, path):
+		"""Checks if a given path exists in the datalake."""
+
+		try:
+			await self.stat(path)
+			return True
+
+		except FileNotFoundError:
+			return False
+
+	async def path_get_properties(self, path):
+		"""Get the properties of the specified path, as a dict of headers."""
+
+		return await self.__get_status_headers(path)
+
+	async def path_is_directory(self, path):
+		"""Checks if `path` exists and is a directory."""
+
+		try:
+			return (await self.stat(path)).is_directory
+
+		except FileNotFoundError:
+			return False
+
+	async def path_is_file(self, path):
+		"""Checks if `path` exists and is a file."""
+
+		try:
+			return (await self.stat(path)).is_file
+
+		except FileNotFoundError:
+			return False
+
+	async def list_paths(self
+		, path
+		, recursive = False
+		, max_results = None
+		):
+		r"""Lazily list the content of a directory (or of a whole filesystem),
+		following the continuation tokens. See `AzureDataLakeGen2.list_paths`.
+
+		Returns
+		-------
+		async generator
+			Yields a PathStatus for each path.
+
+		Raises
+		------
+		FileNotFoundError
+			If the specified `path` does not exist.
+
+		"""
+
+		path, datalake_filesystem, datalake_path = split_datalake_path(path)
+
+		continuation = None
+
+		while True:
+			try:
+				body, headers = await self.__azure_datalake_rest_api_wrapper.path_list(
+					filesystem = datalake_filesystem
+					, recursive = recursive
+					, directory = datalake_path
+					, continuation = continuation
+					, maxResults = max_results
+					)
+
+			except aiohttp.ClientResponseError as e:
+				if e.status == 404:
+					raise FileNotFoundError('The specified path does not exist.\n{}'.format(path)) from e
+				else:
+					raise e
+
+			for entry in body.get('paths', []):
+				yield PathStatus.from_list_entry(datalake_filesystem, entry)
+
+			continuation = headers.get('x-ms-continuation')
+
+			if not continuation:
+				return
+
+	async def file_create(self
+		, file_path
+		, file_data
+		, overwrite_if_exists = False
+		, chunk_size = DEFAULT_CHUNK_SIZE
+		, content_type = None
+		, max_concurrency = 1
+		):
+		r"""Create a file at the specified path with the specified data.
+		See `AzureDataLakeGen2.file_create`.
+
+		With `max_concurrency` greater than 1 up to `max_concurrency` appends
+		run at the same time (and at most as many chunks are held in memory);
+		the flush is issued only once all of them succeeded.
+
+		Returns
+		-------
+		dict
+			The headers of the response of the flush call.
+
+		Raises
+		------
+		FileExistsError
+			If the specified `file_path` already exists and
+			`overwrite_if_exists` is False.
+
+		"""
+
+		file_path, datalake_filesystem, datalake_file_path = split_datalake_path(file_path, 'file_path')
+
+		try:
+			file_status = await self.stat(file_path)
+		except FileNotFoundError:
+			file_status = None
+
+		if file_status is not None:
+			if not overwrite_if_exists:
+				raise FileExistsError('The specified file_path already exists and the param [overwrite_if_exists] is set to False.\n{}'.format(file_path))
+
+			if not file_status.is_file:
+				raise ValueError('The specified file_path already exists and is not a file.\n{}'.format(file_path))
+
+		if content_type is None:
+			content_type = 'text/plain' if isinstance(file_data, str) else 'application/octet-stream'
+
+		await self.__azure_datalake_rest_api_wrapper.path_create(
+			filesystem = datalake_filesystem
+			, path = datalake_file_path
+			, resource = 'file'
+			, request_headers = {'x-ms-content-type' : content_type}
+			)
+
+		async def append_chunk(chunk, position):
+			await self.__azure_datalake_rest_api_wrapper.path_update(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				, action = 'append'
+				, position = str(position)
+				, request_headers = {
+					'Content-Type' : content_type
+					, 'Content-Length' : str(len(chunk))
+				}
+				, data_to_append = chunk
+			)
+
+		position = 0
+		pending = set()
+
+		try:
+			# The chunks are read from the source synchronously, like in
+			# AzureDataLakeGen2: sources backed by local disk are fast enough.
+			for chunk in iter_chunks(file_data, chunk_size):
+				while len(pending) >= max_concurrency:
+					done, pending = await asyncio.wait(pending, return_when = asyncio.FIRST_COMPLETED)
+					for task in done:
+						task.result()
+
+				pending.add(asyncio.ensure_future(append_chunk(chunk, position)))
+				position += len(chunk)
+
+			if pending:
+				done, pending = await asyncio.wait(pending)
+				for task in done:
+					task.result()
+
+		finally:
+			for task in pending:
+				task.cancel()
+
+		return await self.__azure_datalake_rest_api_wrapper.path_update(
+			filesystem = datalake_filesystem
+			, path = datalake_file_path
+			, action = 'flush'
+			, close = 'true'
+			, position = str(position)
+			, request_headers = {
+				'Content-Length' : str(0)
+				, 'x-ms-content-type' : content_type
+			}
+		)
+
+	async def file_read(self, file_path):
+		r"""Read the whole content of a file.
+
+		Returns
+		-------
+		str, dict, bytes
+			The content of the file: decoded text for 'text/plain' files,
+			parsed JSON for 'application/json' files, bytes otherwise.
+
+		Raises
+		------
+		FileNotFoundError
+			If the specified `file_path` does not exist.
+
+		"""
+
+		file_path, datalake_filesystem, datalake_file_path = split_datalake_path(file_path, 'file_path')
+
+		try:
+			return await self.__azure_datalake_rest_api_wrapper.path_read(
+				filesystem = datalake_filesystem
+				, path = datalake_file_path
+				)
+
+		except aiohttp.ClientResponseError as e:
+			if e.status == 404:
+				raise FileNotFoundError('The specified path does not exist.\n{}'.format(file_path)) from e
+			else:
+				raise e
@@ -16,17 +16,39 @@ from azure.storage.blob.models import (
 )
 from azure.storage.common.models import (
 	AccountPermissions
-	, Protocol
 	, Services
 	, ResourceTypes
 )
 
-import datetime
 import requests
-from urllib.parse import urlparse, parse_qs
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+import time
+from urllib.parse import urlparse
 import json
+import weakref
 
 # Internal Libraries
+from pyadlgen2.helpers.sastokencache import (
+	SasTokenCache
+	, DEFAULT_TOKEN_LIFETIME
+	, DEFAULT_REFRESH_MARGIN
+)
+from pyadlgen2.helpers.retrypolicy import (
+	RetryPolicy
+	, AdaptiveConcurrencyLimiter
+	, THROTTLING_STATUS_CODES
+)
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Number of per-host connection pools kept by the HTTP session.
+DEFAULT_POOL_CONNECTIONS = 10
+# Maximum number of connections kept alive for each host.
+DEFAULT_POOL_MAXSIZE = 10
+# Size of the pieces in which `path_read_into` copies a body into the buffer.
+READ_INTO_PIECE_SIZE = 256 * 1024
 
 # ---------------------------------------------------------------------
 
@@ -111,7 +133,41 @@ class ADLGen2RestApiWrapper():
 	This operation supports conditional HTTP requests.
 	"""
 	
-	def __init__(self, storage_account_name, storage_account_key):
+	def __init__(self
+		, storage_account_name
+		, storage_account_key
+		, pool_connections = DEFAULT_POOL_CONNECTIONS
+		, pool_maxsize = DEFAULT_POOL_MAXSIZE
+		, connect_timeout = None
+		, read_timeout = None
+		, sas_token_lifetime = DEFAULT_TOKEN_LIFETIME
+		, sas_refresh_margin = DEFAULT_REFRESH_MARGIN
+		, retry_policy = None
+		, concurrency_limiter = None
+		):
+		"""
+		All the REST calls go through a single `requests.Session`, so TCP and TLS
+		connections to the storage account are kept alive and reused across operations.
+
+		`pool_connections` is the number of per-host connection pools cached by the session,
+		`pool_maxsize` the maximum number of connections kept alive for each host
+		(it should be at least as large as the number of threads sharing the wrapper).
+		`connect_timeout` and `read_timeout` are the client-side timeouts, in seconds,
+		applied to every request (None means wait forever). They are not to be confused
+		with the `timeout` parameter of the single operations, which is sent to the service.
+
+		SAS tokens are signed once per combination of services, resource types and permissions,
+		and reused for `sas_token_lifetime`. They are renewed in the background when they are
+		less than `sas_refresh_margin` away from their expiry (see `SasTokenCache`).
+
+		Failed calls are retried according to `retry_policy` (a `RetryPolicy`, by default
+		exponential backoff with jitter honouring `Retry-After`), taking into account
+		whether each operation is idempotent. The number of calls in flight, across all
+		the threads using the wrapper, is bounded by `concurrency_limiter` (by default an
+		`AdaptiveConcurrencyLimiter` starting at, and capped to, `pool_maxsize`), which
+		shrinks when the service throttles and grows back when it does not. A streamed
+		response counts as in flight until it is closed.
+		"""
 
 		# Create the blob client, for use in obtaining references to
 		# blob storage containers and uploading files to containers.
@@ -122,7 +178,138 @@ class ADLGen2RestApiWrapper():
 
 		self.__account_sas_generator = AccountSharedAccessSignature(storage_account_name, storage_account_key, self.__x_ms_version)
 		self.__blob_sas_generator = BlobSharedAccessSignature(storage_account_name, storage_account_key)
-	
+		self.__sas_token_cache = SasTokenCache(
+			self.__account_sas_generator
+			, token_lifetime = sas_token_lifetime
+			, refresh_margin = sas_refresh_margin
+		)
+
+		# Pooled keep-alive session shared by all the operations
+		self.__session = requests.Session()
+		self.__session.mount(
+			'https://'
+			, HTTPAdapter(pool_connections = pool_connections, pool_maxsize = pool_maxsize)
+		)
+
+		if connect_timeout is None and read_timeout is None:
+			self.__request_timeout = None
+		else:
+			self.__request_timeout = (connect_timeout, read_timeout)
+
+		self.__retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+		self.__concurrency_limiter = AdaptiveConcurrencyLimiter(initial_limit = pool_maxsize) \
+			if concurrency_limiter is None \
+			else concurrency_limiter
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+	def close(self):
+		"""
+		Close the HTTP session and all the pooled connections.
+		"""
+		self.__session.close()
+
+	@property
+	def concurrency_limiter(self):
+		"""
+		The limiter of the calls in flight, shared by all the threads using the wrapper.
+		"""
+		return self.__concurrency_limiter
+
+	def __execute_request(self, method, url, params = None, headers = None, data = None, stream = False, idempotent = True):
+		"""
+		Execute a REST call through the pooled session and raise an
+		`HTTPError` if the response code is not a positive one.
+		With `stream` set to True the body of the response is not downloaded
+		up front, and the caller is responsible for consuming or closing it.
+
+		The call waits for a slot of the concurrency limiter, held until the
+		response is received or, for a streamed response, until it is closed
+		(so that the limit also bounds the bodies being downloaded). It is retried
+		according to the retry policy; `idempotent` tells whether it is safe
+		to repeat a call that may have been processed by the service.
+		A body that cannot be sent twice (e.g. a file object) is never retried.
+		"""
+
+		replayable = data is None or isinstance(data, (bytes, bytearray, memoryview, str))
+		attempt = 0
+
+		while True:
+			response = None
+			error = None
+
+			self.__concurrency_limiter.acquire()
+			holds_slot = False
+			try:
+				response = self.__session.request(
+					method
+					, url
+					, params = params
+					, headers = headers
+					, data = data
+					, timeout = self.__request_timeout
+					, stream = stream
+				)
+				holds_slot = stream and response.status_code < 400
+			except (ConnectionError, Timeout) as e:
+				error = e
+			finally:
+				if holds_slot:
+					self.__release_on_close(response)
+				else:
+					self.__concurrency_limiter.release(
+						throttled = response is not None and response.status_code in THROTTLING_STATUS_CODES
+					)
+
+			if response is not None and response.status_code < 400:
+				return response
+
+			status_code = response.status_code if response is not None else None
+
+			if not replayable or not self.__retry_policy.should_retry(attempt, status_code, idempotent):
+				if error is not None:
+					raise error
+
+				if stream:
+					# Keeps the (small) error body on the response, and
+					# gives the connection back to the pool
+					response.content
+					response.close()
+
+				# Raise an error if the response code is not a positive one
+				response.raise_for_status()
+
+			backoff = self.__retry_policy.get_backoff(
+				attempt
+				, response.headers.get('Retry-After') if response is not None else None
+			)
+
+			if response is not None:
+				response.close()
+
+			time.sleep(backoff)
+			attempt += 1
+
+
+	def __release_on_close(self, response):
+		"""Gives back the slot of the concurrency limiter held by the streamed
+		`response` when it is closed, or garbage collected if it never is.
+		"""
+
+		release = weakref.finalize(response, self.__concurrency_limiter.release)
+		close = response.close
+
+		def close_and_release():
+			try:
+				close()
+			finally:
+				release()
+
+		response.close = close_and_release
 
 	def filesystem_create(self
 		, filesystem
@@ -146,18 +333,12 @@ class ADLGen2RestApiWrapper():
 			, filesystem=filesystem
 		)
 
-		sas_token = self.__account_sas_generator.generate_account(
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
 			services = Services.BLOB
 			, resource_types = ResourceTypes.CONTAINER
 			, permission=AccountPermissions(create=True)
-			, expiry=datetime.datetime.now(datetime.timezone.utc)+datetime.timedelta(minutes=2)
-			, start=None
-			, ip=None
-			, protocol=Protocol.HTTPS
 		)
-
-		# Create the params of the query from the sas_token
-		params = parse_qs(sas_token)
 		# Add specific params for this operation
 		params['resource']='filesystem'
 		
@@ -165,10 +346,8 @@ class ADLGen2RestApiWrapper():
 			params['timeout']=timeout
 
 		# Execute the request
-		response = requests.put(url, params=params)
-
-		# Raise an error if the response code is not a positive one
-		response.raise_for_status()
+		# Repeating a successful creation would fail with 409 (Conflict)
+		response = self.__execute_request('PUT', url, params=params, idempotent=False)
 
 		return True
 		
@@ -216,18 +395,12 @@ class ADLGen2RestApiWrapper():
 			, filesystem=filesystem
 		)
 
-		sas_token = self.__account_sas_generator.generate_account(
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
 			services = Services.BLOB
 			, resource_types = ResourceTypes.CONTAINER
 			, permission=AccountPermissions(read=True)
-			, expiry=datetime.datetime.now(datetime.timezone.utc)+datetime.timedelta(minutes=2)
-			, start=None
-			, ip=None
-			, protocol=Protocol.HTTPS
 		)
-
-		# Create the params of the query from the sas_token
-		params = parse_qs(sas_token)
 		# Add specific params for this operation
 		params['resource']='filesystem'
 		
@@ -235,10 +408,7 @@ class ADLGen2RestApiWrapper():
 			params['timeout']=timeout
 
 		# Execute the request
-		response = requests.head(url, params=params)
-
-		# Raise an error if the response code is not a positive one
-		response.raise_for_status()
+		response = self.__execute_request('HEAD', url, params=params)
 
 		return response.headers
 		
@@ -257,6 +427,10 @@ class ADLGen2RestApiWrapper():
 
 		With optional parameters:
 		GET https://{accountName}.{dnsSuffix}/?resource=account&prefix={prefix}&continuation={continuation}&maxResults={maxResults}&timeout={timeout}
+
+		Returns the JSON body of the response. If there are more filesystems
+		to list, the token to pass as `continuation` to get them is returned
+		in its 'continuation' key.
 		"""
 		
 		url = 'https://{storage_account_name}.{azure_datalake_dns_suffix}/'.format(
@@ -264,18 +438,12 @@ class ADLGen2RestApiWrapper():
 			, azure_datalake_dns_suffix = self.__azure_datalake_dns_suffix
 		)
 
-		sas_token = self.__account_sas_generator.generate_account(
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
 			services = Services.BLOB
 			, resource_types = ResourceTypes.SERVICE
 			, permission=AccountPermissions(list=True)
-			, expiry=datetime.datetime.now(datetime.timezone.utc)+datetime.timedelta(minutes=2)
-			, start=None
-			, ip=None
-			, protocol=Protocol.HTTPS
 		)
-
-		# Create the params of the query from the sas_token
-		params = parse_qs(sas_token)
 		# Add specific params for this operation
 		params['resource']='account'
 		
@@ -292,12 +460,14 @@ class ADLGen2RestApiWrapper():
 			params['timeout']=timeout
 
 		# Execute the request
-		response = requests.get(url, params=params)
+		response = self.__execute_request('GET', url, params=params)
 
-		# Raise an error if the response code is not a positive one
-		response.raise_for_status()
+		result = json.loads(response.text)
 
-		return json.loads(response.text)
+		if response.headers.get('x-ms-continuation'):
+			result['continuation'] = response.headers['x-ms-continuation']
+
+		return result
 		
 	def filesystem_set_properties(self):
 		"""
@@ -336,18 +506,12 @@ class ADLGen2RestApiWrapper():
 			, path = path
 		)
 
-		sas_token = self.__account_sas_generator.generate_account(
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
 			services = Services.BLOB
 			, resource_types = ResourceTypes.OBJECT
 			, permission=AccountPermissions(write=True)
-			, expiry=datetime.datetime.now(datetime.timezone.utc)+datetime.timedelta(minutes=2)
-			, start=None
-			, ip=None
-			, protocol=Protocol.HTTPS
 		)
-
-		# Create the params of the query from the sas_token
-		params = parse_qs(sas_token)
 		# Add specific params for this operation
 		if not resource is None:
 			params['resource']=resource
@@ -361,19 +525,71 @@ class ADLGen2RestApiWrapper():
 		if not timeout is None:
 			params['timeout']=timeout
 
-		# Execute the request
-		response = requests.put(url, params=params, headers=request_headers)
+		# Renames, and creations conditioned on the destination not existing,
+		# fail if repeated after being processed
+		request_header_names = set(name.lower() for name in (request_headers or {}))
+		idempotent = 'x-ms-rename-source' not in request_header_names \
+			and 'if-none-match' not in request_header_names
 
-		# Raise an error if the response code is not a positive one
-		response.raise_for_status()
+		# Execute the request
+		response = self.__execute_request('PUT', url, params=params, headers=request_headers, idempotent=idempotent)
 
 		return response.headers
 	
-	def path_delete(self):
+	def path_delete(self
+		, filesystem
+		, path
+		, recursive = None
+		, continuation = None
+		, timeout = None
+		, request_headers = None
+		):
 		"""
-		To Be Implemented
+		Delete the file or directory. This operation supports conditional HTTP requests.
+		When deleting a directory with `recursive` set to true, the service may return
+		an `x-ms-continuation` header: the operation is then not complete, and must be
+		repeated with the `continuation` param until no token is returned.
+		https://docs.microsoft.com/en-us/rest/api/storageservices/datalakestoragegen2/path/delete
+
+		Basic variant:
+		DELETE https://{accountName}.{dnsSuffix}/{filesystem}/{path}
+
+		With optional parameters:
+		DELETE https://{accountName}.{dnsSuffix}/{filesystem}/{path}?recursive={recursive}&continuation={continuation}&timeout={timeout}
 		"""
-		raise NotImplementedError()
+
+		if path is None:
+			raise ValueError('The parameter [path] cannot be None.')
+
+		url = 'https://{storage_account_name}.{azure_datalake_dns_suffix}/{filesystem}/{path}'.format(
+			storage_account_name = self.__storage_account_name
+			, azure_datalake_dns_suffix = self.__azure_datalake_dns_suffix
+			, filesystem = filesystem
+			, path = path
+		)
+
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.OBJECT
+			, permission=AccountPermissions(delete=True)
+		)
+		# Add specific params for this operation
+		# We convert `recursive` to str just in case it's boolean,
+		# and we lower it in case we pass 'True' or 'FALSE'.
+		if not recursive is None:
+			params['recursive']=str(recursive).lower()
+
+		if not continuation is None:
+			params['continuation']=continuation
+
+		if not timeout is None:
+			params['timeout']=timeout
+
+		# A delete repeated after being processed fails with 404
+		response = self.__execute_request('DELETE', url, params=params, headers=request_headers, idempotent=False)
+
+		return dict(response.headers)
 	
 	def path_get_properties(self
 		, filesystem
@@ -408,18 +624,12 @@ class ADLGen2RestApiWrapper():
 			, path = path
 		)
 
-		sas_token = self.__account_sas_generator.generate_account(
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
 			services = Services.BLOB
 			, resource_types = ResourceTypes.OBJECT
 			, permission=AccountPermissions(read=True)
-			, expiry=datetime.datetime.now(datetime.timezone.utc)+datetime.timedelta(minutes=2)
-			, start=None
-			, ip=None
-			, protocol=Protocol.HTTPS
 		)
-
-		# Create the params of the query from the sas_token
-		params = parse_qs(sas_token)
 		# Add specific params for this operation
 		# We convert `recursive` to str just in case it's boolean,
 		# and we lower it in case we pass 'True' or 'FALSE'.
@@ -431,10 +641,7 @@ class ADLGen2RestApiWrapper():
 			params['timeout']=timeout
 		
 		# Execute the request
-		response = requests.head(url, params=params, headers=request_headers)
-
-		# Raise an error if the response code is not a positive one
-		response.raise_for_status()
+		response = self.__execute_request('HEAD', url, params=params, headers=request_headers)
 
 		return dict(response.headers)
 	
@@ -471,18 +678,12 @@ class ADLGen2RestApiWrapper():
 			, filesystem = filesystem
 		)
 
-		sas_token = self.__account_sas_generator.generate_account(
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
 			services = Services.BLOB
 			, resource_types = ResourceTypes.CONTAINER
 			, permission=AccountPermissions(list=True)
-			, expiry=datetime.datetime.now(datetime.timezone.utc)+datetime.timedelta(minutes=2)
-			, start=None
-			, ip=None
-			, protocol=Protocol.HTTPS
 		)
-
-		# Create the params of the query from the sas_token
-		params = parse_qs(sas_token)
 		# Add specific params for this operation
 		# We convert `recursive` to str just in case it's boolean,
 		# and we lower it in case we pass 'True' or 'FALSE'.
@@ -501,10 +702,7 @@ class ADLGen2RestApiWrapper():
 			params['timeout']=timeout
 		
 		# Execute the request
-		response = requests.get(url, params=params, headers=request_headers)
-
-		# Raise an error if the response code is not a positive one
-		response.raise_for_status()
+		response = self.__execute_request('GET', url, params=params, headers=request_headers)
 
 		return response
 	
@@ -513,12 +711,17 @@ class ADLGen2RestApiWrapper():
 		, path
 		, timeout = None
 		, request_headers = None
+		, stream = False
 		):
 		"""
 		Read the contents of a file. For read operations, range requests are supported.
 		This operation supports conditional HTTP requests.
 		https://docs.microsoft.com/en-us/rest/api/storageservices/datalakestoragegen2/path/read
 
+		With `stream` set to True the body is not downloaded up front: the `requests.Response`
+		is returned as is, and the caller has to consume it (e.g. with `iter_content`) and close it,
+		which also gives back its slot of the concurrency limiter.
+
 		Basic variant:
 		GET https://{accountName}.{dnsSuffix}/{filesystem}/{path}
 
@@ -533,37 +736,96 @@ class ADLGen2RestApiWrapper():
 			, path = path
 		)
 
-		sas_token = self.__account_sas_generator.generate_account(
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
 			services = Services.BLOB
 			, resource_types = ResourceTypes.OBJECT
 			, permission=AccountPermissions(read=True)
-			, expiry=datetime.datetime.now(datetime.timezone.utc)+datetime.timedelta(minutes=2)
-			, start=None
-			, ip=None
-			, protocol=Protocol.HTTPS
 		)
-
-		# Create the params of the query from the sas_token
-		params = parse_qs(sas_token)
 		# Add specific params for this operation
 		if not timeout is None:
 			params['timeout']=timeout
 
 		# Execute the request
-		response = requests.get(url, params=params, headers=request_headers)
+		response = self.__execute_request('GET', url, params=params, headers=request_headers, stream=stream)
 
-		# Raise an error if the response code is not a positive one
-		response.raise_for_status()
+		if stream:
+			return response
 
 		if response.headers['Content-Type'] == 'text/plain':
 			return response.text
 		elif response.headers['Content-Type'] == 'application/json':
 			return json.loads(response.text)
 		elif response.headers['Content-Type'] == 'application/octet-stream':
-			raise NotImplementedError()
+			return response.content
 		else:
 			raise TypeError('The returned response has an unknown content type: [{}]'.format(response.headers['Content-Type']))
 
+	def path_read_into(self
+		, filesystem
+		, path
+		, buffer
+		, offset = 0
+		, timeout = None
+		, request_headers = None
+		):
+		"""
+		Read the range of a file starting at `offset` directly into `buffer`
+		(any writable bytes-like object, e.g. a bytearray or a memoryview of it).
+		The length of the range is the length of `buffer`.
+		The body of the response is copied into `buffer` as it arrives, in
+		pieces of at most READ_INTO_PIECE_SIZE bytes: urllib3 reads each piece
+		into a temporary bytes object, so the memory used on top of `buffer`
+		is bounded by the size of a piece, whatever the length of the range.
+		Returns the number of bytes read, which is smaller than the length
+		of `buffer` only if the file ends before.
+		https://docs.microsoft.com/en-us/rest/api/storageservices/datalakestoragegen2/path/read
+
+		GET https://{accountName}.{dnsSuffix}/{filesystem}/{path}?timeout={timeout}
+		Range: bytes={offset}-{offset+len(buffer)-1}
+		"""
+
+		view = memoryview(buffer).cast('B')
+
+		if len(view) == 0:
+			return 0
+		
+		url = 'https://{storage_account_name}.{azure_datalake_dns_suffix}/{filesystem}/{path}'.format(
+			storage_account_name = self.__storage_account_name
+			, azure_datalake_dns_suffix = self.__azure_datalake_dns_suffix
+			, filesystem = filesystem
+			, path = path
+		)
+
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.OBJECT
+			, permission=AccountPermissions(read=True)
+		)
+		# Add specific params for this operation
+		if not timeout is None:
+			params['timeout']=timeout
+
+		headers = dict(request_headers) if request_headers else {}
+		headers['Range'] = 'bytes={}-{}'.format(offset, offset + len(view) - 1)
+
+		# Execute the request
+		response = self.__execute_request('GET', url, params=params, headers=headers, stream=True)
+
+		bytes_read = 0
+
+		with response:
+			while bytes_read < len(view):
+				count = response.raw.readinto(view[bytes_read:bytes_read + READ_INTO_PIECE_SIZE])
+
+				if not count:
+					break
+
+				bytes_read += count
+
+		return bytes_read
+
 	def path_update(self
 		, filesystem
 		, path
@@ -596,18 +858,12 @@ class ADLGen2RestApiWrapper():
 			, path = path
 		)
 
-		sas_token = self.__account_sas_generator.generate_account(
+		# Get the params of the query from a cached sas_token
+		params = self.__sas_token_cache.get_params(
 			services = Services.BLOB
 			, resource_types = ResourceTypes.OBJECT
 			, permission=AccountPermissions(write=True)
-			, expiry=datetime.datetime.now(datetime.timezone.utc)+datetime.timedelta(minutes=2)
-			, start=None
-			, ip=None
-			, protocol=Protocol.HTTPS
 		)
-
-		# Create the params of the query from the sas_token
-		params = parse_qs(sas_token)
 		# Add specific params for this operation
 		params['action']=action
 		
@@ -624,9 +880,6 @@ class ADLGen2RestApiWrapper():
 			params['timeout']=timeout
 
 		# Execute the request
-		response = requests.patch(url, params=params, headers=request_headers, data=data_to_append)
-
-		# Raise an error if the response code is not a positive one
-		response.raise_for_status()
+		response = self.__execute_request('PATCH', url, params=params, headers=request_headers, data=data_to_append)
 
 		return response.headers
@@ -0,0 +1,440 @@
+"""Asynchronous (asyncio) wrapper for the Azure Data Lake Storage Gen2 REST API.
+
+Requires aiohttp.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+from azure.storage.common.sharedaccesssignature import SharedAccessSignature as AccountSharedAccessSignature
+
+from azure.storage.common.models import (
+	AccountPermissions
+	, Services
+	, ResourceTypes
+)
+
+import aiohttp
+import asyncio
+import json
+
+# Internal Libraries
+from pyadlgen2.helpers.sastokencache import (
+	SasTokenCache
+	, DEFAULT_TOKEN_LIFETIME
+	, DEFAULT_REFRESH_MARGIN
+)
+from pyadlgen2.helpers.retrypolicy import RetryPolicy
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Maximum number of connections kept by the connection pool.
+DEFAULT_MAX_CONNECTIONS = 100
+# Maximum number of requests in flight at the same time.
+DEFAULT_MAX_CONCURRENCY = 100
+
+# ---------------------------------------------------------------------
+
+class ADLGen2RestApiWrapperAsync():
+	"""
+	Asynchronous counterpart of ADLGen2RestApiWrapper, with the same operations
+	and parameters. Every operation is a coroutine.
+
+	All the requests share one aiohttp connection pool of `max_connections`
+	connections, and at most `max_concurrency` of them are in flight at the same
+	time (the others wait on a semaphore), so a single event loop can schedule
+	thousands of operations without opening thousands of connections.
+
+	The session is created on first use, inside the running event loop.
+	Use the wrapper as an async context manager, or await `close()`, to release it.
+
+	Failed calls are retried according to `retry_policy`, like in the synchronous
+	wrapper: throttled calls (429, 503) always, honouring `Retry-After`, the other
+	failures only for idempotent operations. The backoff is awaited without holding
+	a slot of the semaphore. Unlike the synchronous wrapper, the number of requests
+	in flight does not adapt to the throttling.
+
+	Errors are raised as `aiohttp.ClientResponseError`, whose `status` attribute
+	holds the HTTP status code of the response.
+	"""
+
+	def __init__(self
+		, storage_account_name
+		, storage_account_key
+		, max_connections = DEFAULT_MAX_CONNECTIONS
+		, max_concurrency = DEFAULT_MAX_CONCURRENCY
+		, connect_timeout = None
+		, read_timeout = None
+		, sas_token_lifetime = DEFAULT_TOKEN_LIFETIME
+		, sas_refresh_margin = DEFAULT_REFRESH_MARGIN
+		, retry_policy = None
+		):
+
+		self.__storage_account_name = storage_account_name
+		self.__storage_account_key = storage_account_key
+		self.__azure_datalake_dns_suffix = 'dfs.core.windows.net'
+		self.__x_ms_version = '2018-11-09'
+
+		self.__account_sas_generator = AccountSharedAccessSignature(storage_account_name, storage_account_key, self.__x_ms_version)
+		self.__sas_token_cache = SasTokenCache(
+			self.__account_sas_generator
+			, token_lifetime = sas_token_lifetime
+			, refresh_margin = sas_refresh_margin
+		)
+
+		self.__max_connections = max_connections
+		self.__max_concurrency = max_concurrency
+		self.__timeout = aiohttp.ClientTimeout(total = None, connect = connect_timeout, sock_read = read_timeout)
+		self.__retry_policy = RetryPolicy() if retry_policy is None else retry_policy
+
+		self.__session = None
+		self.__semaphore = None
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		await self.close()
+
+	async def close(self):
+		"""
+		Close the HTTP session and all the pooled connections.
+		"""
+		if self.__session is not None:
+			await self.__session.close()
+			self.__session = None
+
+	def __get_session(self):
+
+		if self.__session is None:
+			self.__session = aiohttp.ClientSession(
+				connector = aiohttp.TCPConnector(limit = self.__max_connections)
+				, timeout = self.__timeout
+			)
+			self.__semaphore = asyncio.Semaphore(self.__max_concurrency)
+
+		return self.__session
+
+	def __url(self, filesystem = '', path = None):
+
+		url = 'https://{storage_account_name}.{azure_datalake_dns_suffix}/{filesystem}'.format(
+			storage_account_name = self.__storage_account_name
+			, azure_datalake_dns_suffix = self.__azure_datalake_dns_suffix
+			, filesystem = filesystem
+		)
+
+		if path is not None:
+			url += '/{}'.format(path)
+
+		return url
+
+	async def __execute_request(self, method, url, params = None, headers = None, data = None, idempotent = True):
+		"""
+		Execute a REST call through the shared session, limited by the semaphore,
+		and raise a `ClientResponseError` if the response code is not a positive one.
+		The call is retried according to the retry policy; `idempotent` tells whether
+		it is safe to repeat a call that may have been processed by the service.
+		Returns a tuple (status, headers, body).
+		"""
+
+		session = self.__get_session()
+
+		# aiohttp wants the query as a flat list of str pairs
+		query = []
+		for key, values in (params or {}).items():
+			for value in (values if isinstance(values, list) else [values]):
+				query.append((key, str(value)))
+
+		replayable = data is None or isinstance(data, (bytes, bytearray, memoryview, str))
+		attempt = 0
+
+		while True:
+			async with self.__semaphore:
+				try:
+					async with session.request(method, url, params = query, headers = headers, data = data) as response:
+						if response.status < 400:
+							body = await response.read()
+
+							return response.status, response.headers, body
+
+						retry_after = response.headers.get('Retry-After')
+
+						if not replayable or not self.__retry_policy.should_retry(attempt, response.status, idempotent):
+							# Raise an error if the response code is not a positive one
+							response.raise_for_status()
+
+				except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+					if not replayable or not self.__retry_policy.should_retry(attempt, None, idempotent):
+						raise
+
+					retry_after = None
+
+			await asyncio.sleep(self.__retry_policy.get_backoff(attempt, retry_after))
+			attempt += 1
+
+	async def filesystem_create(self
+		, filesystem
+		, timeout = None
+	):
+		"""
+		Create a filesystem rooted at the specified location. If the filesystem already exists, the operation fails.
+		See `ADLGen2RestApiWrapper.filesystem_create`.
+		"""
+
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.CONTAINER
+			, permission=AccountPermissions(create=True)
+		)
+		params['resource']='filesystem'
+
+		if not timeout is None:
+			params['timeout']=timeout
+
+		await self.__execute_request('PUT', self.__url(filesystem), params=params, idempotent=False)
+
+		return True
+
+	async def filesystem_get_properties(self
+		, filesystem
+		, timeout = None
+	):
+		"""
+		All system and user-defined filesystem properties are specified in the response headers.
+		See `ADLGen2RestApiWrapper.filesystem_get_properties`.
+		"""
+
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.CONTAINER
+			, permission=AccountPermissions(read=True)
+		)
+		params['resource']='filesystem'
+
+		if not timeout is None:
+			params['timeout']=timeout
+
+		_, headers, _ = await self.__execute_request('HEAD', self.__url(filesystem), params=params)
+
+		return dict(headers)
+
+	async def filesystem_list(self
+		, prefix = None
+		, continuation = None
+		, maxResults = None
+		, timeout = None
+	):
+		"""
+		List filesystems and their properties in given account.
+		See `ADLGen2RestApiWrapper.filesystem_list`.
+		"""
+
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.SERVICE
+			, permission=AccountPermissions(list=True)
+		)
+		params['resource']='account'
+
+		if not prefix is None:
+			params['prefix']=prefix
+		if not continuation is None:
+			params['continuation']=continuation
+		if not maxResults is None:
+			params['maxResults']=maxResults
+		if not timeout is None:
+			params['timeout']=timeout
+
+		_, headers, body = await self.__execute_request('GET', self.__url(), params=params)
+
+		result = json.loads(body)
+
+		if headers.get('x-ms-continuation'):
+			result['continuation'] = headers['x-ms-continuation']
+
+		return result
+
+	async def path_create(self
+		, filesystem
+		, path
+		, resource = None
+		, continuation = None
+		, mode = None
+		, timeout = None
+		, request_headers = None
+		):
+		"""
+		Use for: Create File | Create Directory | Rename File | Rename Directory
+		See `ADLGen2RestApiWrapper.path_create`.
+		"""
+
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.OBJECT
+			, permission=AccountPermissions(write=True)
+		)
+
+		if not resource is None:
+			params['resource']=resource
+		if not continuation is None:
+			params['continuation']=continuation
+		if not mode is None:
+			params['mode']=mode
+		if not timeout is None:
+			params['timeout']=timeout
+
+		# Renames, and creations conditioned on the destination not existing,
+		# fail if repeated after being processed
+		request_header_names = set(name.lower() for name in (request_headers or {}))
+		idempotent = 'x-ms-rename-source' not in request_header_names \
+			and 'if-none-match' not in request_header_names
+
+		_, headers, _ = await self.__execute_request('PUT', self.__url(filesystem, path), params=params, headers=request_headers, idempotent=idempotent)
+
+		return dict(headers)
+
+	async def path_get_properties(self
+		, filesystem
+		, path
+		, action = None
+		, upn = None
+		, timeout = None
+		, request_headers = None
+		):
+		"""
+		Get Properties | Get Status | Get Access Control List
+		See `ADLGen2RestApiWrapper.path_get_properties`.
+		"""
+
+		if path is None:
+			raise ValueError('The parameter [path] cannot be None.')
+
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.OBJECT
+			, permission=AccountPermissions(read=True)
+		)
+
+		if not action is None:
+			params['action']=action
+		if not upn is None:
+			params['upn']=str(upn).lower()
+		if not timeout is None:
+			params['timeout']=timeout
+
+		_, headers, _ = await self.__execute_request('HEAD', self.__url(filesystem, path), params=params, headers=request_headers)
+
+		return dict(headers)
+
+	async def path_list(self
+		, filesystem
+		, recursive
+		, directory = None
+		, continuation = None
+		, maxResults = None
+		, upn = None
+		, timeout = None
+		, request_headers = None
+		):
+		"""
+		List filesystem paths and their properties.
+		See `ADLGen2RestApiWrapper.path_list`.
+
+		Unlike the synchronous wrapper, returns a tuple (body, headers), with the
+		body already parsed from JSON; the continuation token, if any, is in the
+		`x-ms-continuation` header.
+		"""
+
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.CONTAINER
+			, permission=AccountPermissions(list=True)
+		)
+		params['resource']='filesystem'
+		params['recursive']=str(recursive).lower()
+
+		if not directory is None:
+			params['directory']=directory
+		if not continuation is None:
+			params['continuation']=continuation
+		if not maxResults is None:
+			params['maxResults']=maxResults
+		if not upn is None:
+			params['upn']=upn
+		if not timeout is None:
+			params['timeout']=timeout
+
+		_, headers, body = await self.__execute_request('GET', self.__url(filesystem), params=params, headers=request_headers)
+
+		return json.loads(body), dict(headers)
+
+	async def path_read(self
+		, filesystem
+		, path
+		, timeout = None
+		, request_headers = None
+		):
+		"""
+		Read the contents of a file. For read operations, range requests are supported.
+		See `ADLGen2RestApiWrapper.path_read`.
+		"""
+
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.OBJECT
+			, permission=AccountPermissions(read=True)
+		)
+
+		if not timeout is None:
+			params['timeout']=timeout
+
+		_, headers, body = await self.__execute_request('GET', self.__url(filesystem, path), params=params, headers=request_headers)
+
+		if headers['Content-Type'] == 'text/plain':
+			return body.decode('utf-8')
+		elif headers['Content-Type'] == 'application/json':
+			return json.loads(body)
+		elif headers['Content-Type'] == 'application/octet-stream':
+			return body
+		else:
+			raise TypeError('The returned response has an unknown content type: [{}]'.format(headers['Content-Type']))
+
+	async def path_update(self
+		, filesystem
+		, path
+		, action
+		, position = None
+		, retainUncommittedData = None
+		, close = None
+		, timeout = None
+		, request_headers = None
+		, data_to_append = None
+		):
+		"""
+		Append Data | Flush Data | Set Properties | Set Access Control
+		See `ADLGen2RestApiWrapper.path_update`.
+		"""
+
+		params = self.__sas_token_cache.get_params(
+			services = Services.BLOB
+			, resource_types = ResourceTypes.OBJECT
+			, permission=AccountPermissions(write=True)
+		)
+		params['action']=action
+
+		if not position is None:
+			params['position']=position
+		if not retainUncommittedData is None:
+			params['retainUncommittedData']=retainUncommittedData
+		if not close is None:
+			params['close']=close
+		if not timeout is None:
+			params['timeout']=timeout
+
+		_, headers, _ = await self.__execute_request('PATCH', self.__url(filesystem, path), params=params, headers=request_headers, data=data_to_append)
+
+		return dict(headers)
@@ -0,0 +1,225 @@
+"""Cache of fixed-size blocks of the files read from the datalake.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import collections
+import mmap
+import tempfile
+import threading
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Size of the blocks in which files are cached.
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024
+# Maximum number of bytes of blocks kept in memory.
+DEFAULT_MAX_MEMORY_BYTES = 256 * 1024 * 1024
+
+# ---------------------------------------------------------------------
+
+class BlockCache():
+	"""
+	Process-wide cache of blocks of files, to be shared by all the readers.
+
+	Files are split in blocks of `block_size` bytes, identified by
+	(path, etag, block index): a modified file has a new ETag, so its old
+	blocks are never served again and just age out.
+
+	The blocks are kept in memory, least recently used first out, within
+	`max_memory_bytes`. If `spill_bytes` is set, the blocks evicted from
+	memory are moved to a second tier: a temporary file of that size (in
+	`spill_directory`), memory-mapped and managed as an LRU of block slots,
+	from which they are promoted back to memory when read again.
+
+	All the methods are thread safe. Two readers missing the same block
+	at the same time may both fetch it.
+	"""
+
+	def __init__(self
+		, block_size = DEFAULT_BLOCK_SIZE
+		, max_memory_bytes = DEFAULT_MAX_MEMORY_BYTES
+		, spill_bytes = 0
+		, spill_directory = None
+		):
+
+		if block_size < 1:
+			raise ValueError('The param [block_size] must be a positive integer. Value passed:\n{}'.format(block_size))
+
+		self.block_size = block_size
+		self.max_memory_bytes = max_memory_bytes
+
+		self.__lock = threading.Lock()
+		self.__memory = collections.OrderedDict()
+		self.__memory_bytes = 0
+
+		self.__spill_file = None
+		self.__spill_map = None
+		self.__spill_slots = 0
+		self.__spilled = collections.OrderedDict()
+		self.__free_slots = []
+
+		spill_slots = spill_bytes // block_size
+
+		if spill_slots > 0:
+			self.__spill_file = tempfile.TemporaryFile(dir = spill_directory)
+			self.__spill_file.truncate(spill_slots * block_size)
+			self.__spill_map = mmap.mmap(self.__spill_file.fileno(), spill_slots * block_size)
+			self.__spill_slots = spill_slots
+			self.__free_slots = list(range(spill_slots))
+
+		self.hits = 0
+		self.disk_hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def close(self):
+		"""Drop all the blocks and release the spill file."""
+
+		with self.__lock:
+			self.__memory.clear()
+			self.__memory_bytes = 0
+			self.__spilled.clear()
+			self.__free_slots = list(range(self.__spill_slots))
+
+			if self.__spill_map is not None:
+				self.__spill_map.close()
+				self.__spill_file.close()
+				self.__spill_map = None
+				self.__spill_file = None
+				self.__spill_slots = 0
+				self.__free_slots = []
+
+	def get_block(self, path, etag, index, fetch):
+		"""
+		Returns the block `index` of the file `path` with ETag `etag`.
+		On a miss, `fetch(buffer, offset)` is called to fill a new block of
+		`block_size` bytes at `offset` in the file, and must return the
+		number of bytes read (fewer for the last block of the file).
+		"""
+
+		key = (str(path), etag, index)
+
+		with self.__lock:
+			block = self.__memory.get(key)
+
+			if block is not None:
+				self.__memory.move_to_end(key)
+				self.hits += 1
+				return block
+
+			spilled = self.__spilled.pop(key, None)
+
+			if spilled is not None:
+				slot, length = spilled
+				start = slot * self.block_size
+				block = bytes(self.__spill_map[start:start + length])
+				self.__free_slots.append(slot)
+				self.disk_hits += 1
+				self.__put(key, block)
+				return block
+
+			self.misses += 1
+
+		buffer = bytearray(self.block_size)
+		count = fetch(memoryview(buffer), index * self.block_size)
+		del buffer[count:]
+
+		block = bytes(buffer)
+
+		with self.__lock:
+			self.__put(key, block)
+
+		return block
+
+	def read_into(self, path, etag, buffer, offset, fetch):
+		"""
+		Fills `buffer` with the bytes of the file `path` with ETag `etag` starting
+		at `offset`, from the cached blocks or fetching the missing ones with `fetch`
+		(see `get_block`). Returns the number of bytes read, smaller than the
+		length of `buffer` only if the file ends before.
+		"""
+
+		view = memoryview(buffer).cast('B')
+		bytes_read = 0
+
+		while bytes_read < len(view):
+			position = offset + bytes_read
+			index, block_offset = divmod(position, self.block_size)
+
+			block = self.get_block(path, etag, index, fetch)
+			count = min(len(block) - block_offset, len(view) - bytes_read)
+
+			if count <= 0:
+				break
+
+			view[bytes_read:bytes_read + count] = block[block_offset:block_offset + count]
+			bytes_read += count
+
+			if len(block) < self.block_size:
+				# Last block of the file
+				break
+
+		return bytes_read
+
+	def stats(self):
+		"""
+		Returns a dict with the number of hits (in memory and on disk), misses
+		and evictions, the hit rate, and the bytes and blocks currently cached.
+		"""
+
+		with self.__lock:
+			requests = self.hits + self.disk_hits + self.misses
+
+			return {
+				'hits' : self.hits
+				, 'disk_hits' : self.disk_hits
+				, 'misses' : self.misses
+				, 'evictions' : self.evictions
+				, 'hit_rate' : (self.hits + self.disk_hits) / requests if requests else 0.0
+				, 'memory_bytes' : self.__memory_bytes
+				, 'memory_blocks' : len(self.__memory)
+				, 'disk_blocks' : len(self.__spilled)
+			}
+
+	def __put(self, key, block):
+		"""Adds a block to the memory tier, evicting (or spilling) the least
+		recently used ones beyond the budget. Called with the lock held."""
+
+		previous = self.__memory.pop(key, None)
+		if previous is not None:
+			self.__memory_bytes -= len(previous)
+
+		self.__memory[key] = block
+		self.__memory_bytes += len(block)
+
+		while self.__memory_bytes > self.max_memory_bytes and len(self.__memory) > 1:
+			evicted_key, evicted_block = self.__memory.popitem(last = False)
+			self.__memory_bytes -= len(evicted_block)
+			self.__spill(evicted_key, evicted_block)
+
+	def __spill(self, key, block):
+		"""Moves a block evicted from memory to the disk tier, if any,
+		evicting the least recently used block of the disk tier if full.
+		Called with the lock held."""
+
+		if self.__spill_map is None:
+			self.evictions += 1
+			return
+
+		if not self.__free_slots:
+			_, (slot, _) = self.__spilled.popitem(last = False)
+			self.__free_slots.append(slot)
+			self.evictions += 1
+
+		slot = self.__free_slots.pop()
+		start = slot * self.block_size
+
+		self.__spill_map[start:start + len(block)] = block
+		self.__spilled[key] = (slot, len(block))
@@ -0,0 +1,86 @@
+"""Concurrent execution of the same operation over many paths.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import collections
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+
+PathResult = collections.namedtuple('PathResult', ['path', 'value', 'error'])
+PathResult.__doc__ = """
+Result of an operation over one of the paths of a bulk operation.
+`value` is the result of the operation, `error` the exception it raised
+(in which case `value` is None).
+"""
+
+TransferSummary = collections.namedtuple('TransferSummary', ['transferred', 'skipped', 'failed'])
+TransferSummary.__doc__ = """
+Outcome of the synchronization of a directory: the lists of the paths
+`transferred` and `skipped` (because unchanged), and a PathResult for
+each path that `failed`, with the exception raised.
+"""
+
+# ---------------------------------------------------------------------
+
+def run_bulk(function, paths, max_concurrency, ordered = True):
+	"""
+	Calls `function(path)` for each path of `paths`, with up to `max_concurrency`
+	calls running at the same time, and yields a PathResult for each of them.
+	An exception raised by a call is reported in its PathResult and does not
+	stop the other calls.
+
+	`paths` is consumed lazily. If `ordered` is True the results are yielded in
+	the order of `paths`, otherwise as soon as they are available.
+	"""
+
+	if max_concurrency < 1:
+		raise ValueError('The param [max_concurrency] must be a positive integer. Value passed:\n{}'.format(max_concurrency))
+
+	def call(path):
+		try:
+			return PathResult(path, function(path), None)
+		except Exception as e:
+			return PathResult(path, None, e)
+
+	paths = iter(paths)
+	executor = ThreadPoolExecutor(max_workers = max_concurrency)
+
+	try:
+		if ordered:
+			# Calls are submitted up to a window ahead of the first pending
+			# result, so a slow call does not stall the whole pool.
+			window = collections.deque()
+
+			for path in paths:
+				window.append(executor.submit(call, path))
+
+				if len(window) >= 2 * max_concurrency:
+					yield window.popleft().result()
+
+			while window:
+				yield window.popleft().result()
+
+		else:
+			pending = set()
+
+			for path in paths:
+				pending.add(executor.submit(call, path))
+
+				if len(pending) >= max_concurrency:
+					done, pending = wait(pending, return_when = FIRST_COMPLETED)
+					for future in done:
+						yield future.result()
+
+			for future in as_completed(pending):
+				yield future.result()
+
+	finally:
+		executor.shutdown(wait = False, cancel_futures = True)
@@ -0,0 +1,143 @@
+"""Streaming compression of the content of files of the datalake.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import zlib
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Content encodings that can be compressed and decompressed.
+CONTENT_ENCODINGS = ('gzip', 'zstd')
+
+# Compression levels used when none is given.
+DEFAULT_LEVELS = {'gzip' : 6, 'zstd' : 3}
+
+# zlib window bits selecting the gzip container.
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+# ---------------------------------------------------------------------
+
+def _import_zstandard():
+
+	try:
+		import zstandard
+	except ImportError as e:
+		raise ImportError('The zstandard package is required to use the zstd content encoding.') from e
+
+	return zstandard
+
+def check_content_encoding(content_encoding):
+	"""Raises ValueError if `content_encoding` is not one of CONTENT_ENCODINGS."""
+
+	if content_encoding not in CONTENT_ENCODINGS:
+		raise ValueError('The param [content_encoding] must be one of {}. Value passed:\n{}'.format(
+			', '.join(CONTENT_ENCODINGS), content_encoding))
+
+def is_supported(content_encoding):
+	"""Returns True if `content_encoding` (a Content-Encoding header) can be decompressed."""
+
+	return content_encoding is not None and content_encoding.strip().lower() in CONTENT_ENCODINGS
+
+def compress_chunks(chunks, content_encoding, chunk_size, level = None):
+	"""
+	Compresses the bytes-like `chunks` with `content_encoding` as a single
+	stream, and yields the compressed data in bytes chunks of `chunk_size`
+	bytes (the last one can be smaller).
+
+	Each chunk is consumed before the next one is requested, so the
+	chunks can share the same buffer. Memory usage is bounded by
+	`chunk_size` plus the state of the compressor.
+	An unknown encoding, or a missing codec, is reported by this call.
+	"""
+
+	check_content_encoding(content_encoding)
+
+	if level is None:
+		level = DEFAULT_LEVELS[content_encoding]
+
+	if content_encoding == 'gzip':
+		compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+	else:
+		compressor = _import_zstandard().ZstdCompressor(level = level).compressobj()
+
+	return _iter_compressed(chunks, compressor, chunk_size)
+
+def _iter_compressed(chunks, compressor, chunk_size):
+
+	pending = bytearray()
+
+	for chunk in chunks:
+		pending += compressor.compress(chunk)
+
+		while len(pending) >= chunk_size:
+			yield bytes(pending[:chunk_size])
+			del pending[:chunk_size]
+
+	pending += compressor.flush()
+
+	for start in range(0, len(pending), chunk_size):
+		yield bytes(pending[start:start + chunk_size])
+
+def decompress_chunks(chunks, content_encoding):
+	"""
+	Decompresses the bytes `chunks` of a stream compressed with
+	`content_encoding` (a Content-Encoding header), and yields the
+	decompressed data as it is produced.
+
+	A stream made of several concatenated frames (e.g. gzip members
+	appended one after the other) is decompressed as a whole.
+	An unknown encoding, or a missing codec, is reported by this call.
+	During the iteration, ValueError is raised if the data is not valid
+	for `content_encoding`, and EOFError at the end if the stream stops
+	in the middle of a frame.
+	"""
+
+	content_encoding = (content_encoding or '').strip().lower()
+	check_content_encoding(content_encoding)
+
+	if content_encoding == 'gzip':
+		new_decompressor = lambda: zlib.decompressobj(GZIP_WBITS)
+		codec_error = zlib.error
+	else:
+		zstandard = _import_zstandard()
+		new_decompressor = lambda: zstandard.ZstdDecompressor().decompressobj()
+		codec_error = zstandard.ZstdError
+
+	return _iter_decompressed(chunks, content_encoding, new_decompressor, codec_error)
+
+def _iter_decompressed(chunks, content_encoding, new_decompressor, codec_error):
+
+	decompressor = new_decompressor()
+	# True while the current frame has started and not ended
+	in_frame = False
+
+	for chunk in chunks:
+		while chunk:
+			in_frame = True
+
+			try:
+				data = decompressor.decompress(chunk)
+			except codec_error as e:
+				raise ValueError('The content is not valid {} data: {}'.format(content_encoding, e)) from e
+
+			if data:
+				yield data
+
+			if not decompressor.eof:
+				break
+
+			# End of a frame: the rest of the chunk starts the next one
+			chunk = decompressor.unused_data
+			decompressor = new_decompressor()
+			in_frame = False
+
+	if in_frame:
+		raise EOFError('The compressed stream ended before the end of a frame.')
@@ -0,0 +1,225 @@
+"""Persistent local cache of the content of files of the datalake.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Maximum number of bytes of content kept in the cache directory.
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# Suffix of the files of the entries of the cache.
+ENTRY_SUFFIX = '.entry'
+
+# Fraction of `max_bytes` the cache is brought back to by an eviction,
+# so that the following puts do not trigger an eviction each.
+EVICTION_TARGET = 0.9
+
+# ---------------------------------------------------------------------
+
+class ContentCache():
+	"""
+	Cache of the content of files on local disk, with the ETag of the
+	version cached, to be revalidated with conditional requests.
+
+	Each entry is a single file, named by the hash of its key, holding a
+	header line of JSON metadata (key, ETag, content type) followed by the
+	content. Entries are written to a temporary file and renamed into place,
+	so the same directory can be shared by many processes: a reader sees
+	either the previous or the new version of an entry, never a mix.
+
+	The total size of the entries is kept as a running count, from a scan
+	of the directory when the cache is created. When it exceeds `max_bytes`,
+	the directory is scanned again (which also accounts for the entries
+	written by other processes) and the least recently used entries (by
+	modification time, refreshed on each hit) are deleted, down to
+	EVICTION_TARGET of `max_bytes`.
+	"""
+
+	def __init__(self, directory, max_bytes = DEFAULT_MAX_BYTES):
+
+		self.directory = os.fspath(directory)
+		self.max_bytes = max_bytes
+
+		os.makedirs(self.directory, exist_ok = True)
+
+		self.__lock = threading.Lock()
+		self.__total_size = sum(size for _, size, _ in self.__scan())
+
+	def __entry_path(self, key):
+
+		digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+		return os.path.join(self.directory, digest[:2], digest + ENTRY_SUFFIX)
+
+	def get(self, key):
+		"""
+		Returns a dict with the `etag` and the `content_type` of the version
+		of `key` in the cache, None if `key` is not cached.
+		"""
+
+		try:
+			with open(self.__entry_path(key), 'rb') as file_object:
+				metadata = json.loads(file_object.readline())
+
+		except (OSError, ValueError):
+			return None
+
+		if metadata.get('key') != key:
+			return None
+
+		return metadata
+
+	def read(self, key, etag):
+		"""
+		Returns the content cached for `key`, None if it is not cached
+		or if the version cached does not have the ETag `etag`.
+		"""
+
+		entry_path = self.__entry_path(key)
+
+		try:
+			with open(entry_path, 'rb') as file_object:
+				metadata = json.loads(file_object.readline())
+
+				if metadata.get('key') != key or metadata.get('etag') != etag:
+					return None
+
+				content = file_object.read()
+
+			# Marks the entry as recently used
+			os.utime(entry_path)
+
+		except (OSError, ValueError):
+			return None
+
+		return content
+
+	def put(self, key, etag, content_type, chunks):
+		"""
+		Stores the content of `key`, given as an iterable of bytes chunks, as
+		the version with ETag `etag`, and returns it. A content larger than
+		`max_bytes` is returned but not stored.
+
+		The chunks are written to disk as they arrive, and the content is then
+		read back in a single piece, so it is held in memory only once.
+		"""
+
+		entry_path = self.__entry_path(key)
+		os.makedirs(os.path.dirname(entry_path), exist_ok = True)
+
+		header = json.dumps({'key' : key, 'etag' : etag, 'content_type' : content_type}).encode('utf-8') + b'\n'
+
+		descriptor, temp_path = tempfile.mkstemp(dir = os.path.dirname(entry_path), prefix = '.', suffix = '.tmp')
+
+		try:
+			with os.fdopen(descriptor, 'w+b') as file_object:
+				file_object.write(header)
+
+				for chunk in chunks:
+					file_object.write(chunk)
+
+				entry_size = file_object.tell()
+
+				file_object.seek(len(header))
+				content = file_object.read()
+
+			if entry_size - len(header) <= self.max_bytes:
+				replaced_size = self.__entry_size(entry_path)
+				os.replace(temp_path, entry_path)
+				self.__add_size(entry_size - replaced_size)
+			else:
+				os.unlink(temp_path)
+
+		except BaseException:
+			os.unlink(temp_path)
+			raise
+
+		if self.__total_size > self.max_bytes:
+			self.evict()
+
+		return content
+
+	def invalidate(self, key):
+		"""Removes `key` from the cache."""
+
+		entry_path = self.__entry_path(key)
+		entry_size = self.__entry_size(entry_path)
+
+		try:
+			os.unlink(entry_path)
+		except FileNotFoundError:
+			return
+
+		self.__add_size(-entry_size)
+
+	def evict(self):
+		"""
+		Deletes the least recently used entries until the total size
+		of the cache is within EVICTION_TARGET of `max_bytes`.
+		"""
+
+		entries = sorted(self.__scan())
+		total_size = sum(size for _, size, _ in entries)
+		target_size = self.max_bytes * EVICTION_TARGET
+
+		for _, size, entry_path in entries:
+			if total_size <= target_size:
+				break
+
+			try:
+				os.unlink(entry_path)
+			except FileNotFoundError:
+				pass
+
+			total_size -= size
+
+		with self.__lock:
+			self.__total_size = total_size
+
+	def __scan(self):
+		"""Returns a list of (mtime, size, path) of the entries of the cache."""
+
+		entries = []
+
+		for dirpath, _, filenames in os.walk(self.directory):
+			for filename in filenames:
+				if not filename.endswith(ENTRY_SUFFIX):
+					continue
+
+				entry_path = os.path.join(dirpath, filename)
+
+				try:
+					entry_stat = os.stat(entry_path)
+				except FileNotFoundError:
+					continue
+
+				entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+
+		return entries
+
+	@staticmethod
+	def __entry_size(entry_path):
+
+		try:
+			return os.stat(entry_path).st_size
+		except FileNotFoundError:
+			return 0
+
+	def __add_size(self, size):
+
+		with self.__lock:
+			self.__total_size += size
@@ -0,0 +1,37 @@
+"""Handling of the absolute paths used by the high level clients.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import pathlib
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+
+def split_datalake_path(path, param_name = 'path'):
+	"""
+	Validates an absolute datalake path and splits it in its
+	filesystem and (optional) path inside the filesystem.
+	We can see the path as:
+	/{filesystem}[/{folder1}/.../{folderN}[/{filename}]]
+
+	Returns a tuple (path as PurePosixPath, filesystem, path inside the
+	filesystem or None). Raises a ValueError if `path` is not absolute.
+	"""
+
+	path = pathlib.PurePosixPath(path)
+
+	if not path.is_absolute() or len(path.parts) < 2:
+		raise ValueError('The param [{}] must be an absolute path. Value passed:\n{}'.format(param_name, path))
+
+	datalake_filesystem = path.parts[1]
+	datalake_path = path.relative_to(path.parts[0]+path.parts[1]) \
+		if path.relative_to(path.parts[0]+path.parts[1]) != pathlib.PurePosixPath('.') \
+		else None
+
+	return path, datalake_filesystem, datalake_path
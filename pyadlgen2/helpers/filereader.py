@@ -0,0 +1,242 @@
+"""Seekable file object over the byte ranges of a file in the datalake.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import io
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Size of the first range read ahead, and after each random access.
+DEFAULT_MIN_READAHEAD = 64 * 1024
+# Maximum size of the range read ahead during sequential reads.
+DEFAULT_MAX_READAHEAD = 8 * 1024 * 1024
+
+# ---------------------------------------------------------------------
+
+class DataLakeFileReader(io.RawIOBase):
+	"""
+	Raw binary file reading a remote file of known size with one range
+	request per read, to be wrapped in an `io.BufferedReader`.
+
+	`read_range(buffer, offset)` must fill `buffer` with the bytes of the
+	file starting at `offset`, returning the number of bytes read.
+
+	Small reads are served from a readahead window: it starts at
+	`min_readahead` bytes, doubles at each sequential read up to
+	`max_readahead`, and goes back to `min_readahead` after a seek elsewhere,
+	so that scanning a file takes few, large requests while jumping around
+	(e.g. to the footer and the column chunks of a Parquet file) does not
+	download data that is never read.
+
+	Reads at least as large as the window are copied by the request into
+	the buffer of the caller as the body arrives, without going through
+	the window (see `ADLGen2RestApiWrapper.path_read_into`).
+	"""
+
+	def __init__(self
+		, read_range
+		, size
+		, name = None
+		, min_readahead = DEFAULT_MIN_READAHEAD
+		, max_readahead = DEFAULT_MAX_READAHEAD
+		):
+
+		if not 0 < min_readahead <= max_readahead:
+			raise ValueError('The readahead sizes must satisfy 0 < min_readahead <= max_readahead.')
+
+		self.name = name
+		self.mode = 'rb'
+
+		self.__read_range = read_range
+		self.__size = size
+		self.__position = 0
+
+		self.__min_readahead = min_readahead
+		self.__max_readahead = max_readahead
+		self.__readahead = min_readahead
+
+		# Offset right after the last range requested,
+		# to tell sequential reads from random ones
+		self.__next_sequential = 0
+
+		self.__window = bytearray()
+		self.__window_start = 0
+		self.__window_length = 0
+
+	@property
+	def size(self):
+		"""The size of the file in bytes."""
+		return self.__size
+
+	def readable(self):
+		return True
+
+	def seekable(self):
+		return True
+
+	def tell(self):
+		self._checkClosed()
+		return self.__position
+
+	def seek(self, offset, whence = io.SEEK_SET):
+
+		self._checkClosed()
+
+		if whence == io.SEEK_SET:
+			position = offset
+		elif whence == io.SEEK_CUR:
+			position = self.__position + offset
+		elif whence == io.SEEK_END:
+			position = self.__size + offset
+		else:
+			raise ValueError('Invalid whence ({}, should be 0, 1 or 2).'.format(whence))
+
+		if position < 0:
+			raise ValueError('Negative seek position {}.'.format(position))
+
+		self.__position = position
+
+		return position
+
+	def readinto(self, buffer):
+
+		self._checkClosed()
+
+		view = memoryview(buffer).cast('B')
+		length = min(len(view), self.__size - self.__position)
+
+		if length <= 0:
+			return 0
+
+		# Served from the readahead window, if it holds the position
+		window_offset = self.__position - self.__window_start
+
+		if 0 <= window_offset < self.__window_length:
+			count = min(length, self.__window_length - window_offset)
+			view[:count] = memoryview(self.__window)[window_offset:window_offset + count]
+			self.__position += count
+
+			return count
+
+		if self.__position == self.__next_sequential:
+			self.__readahead = min(self.__readahead * 2, self.__max_readahead)
+		else:
+			self.__readahead = self.__min_readahead
+
+		if length >= self.__readahead:
+			# Large read: into the buffer of the caller, bypassing the window
+			count = self.__read_range(view[:length], self.__position)
+			self.__next_sequential = self.__position + count
+
+		else:
+			window_length = min(self.__readahead, self.__size - self.__position)
+
+			if len(self.__window) < window_length:
+				self.__window = bytearray(window_length)
+
+			self.__window_start = self.__position
+			self.__window_length = 0
+			self.__window_length = self.__read_range(memoryview(self.__window)[:window_length], self.__position)
+			self.__next_sequential = self.__position + self.__window_length
+
+			count = min(length, self.__window_length)
+			view[:count] = memoryview(self.__window)[:count]
+
+		self.__position += count
+
+		return count
+
+	def readall(self):
+
+		self._checkClosed()
+
+		# The rest of the file with a single request
+		buffer = bytearray(max(0, self.__size - self.__position))
+		view = memoryview(buffer)
+		bytes_read = 0
+
+		while bytes_read < len(buffer):
+			count = self.readinto(view[bytes_read:])
+
+			if not count:
+				break
+
+			bytes_read += count
+
+		del view
+		del buffer[bytes_read:]
+
+		return bytes(buffer)
+
+	def close(self):
+
+		self.__window = bytearray()
+		self.__window_length = 0
+
+		super().close()
+
+class DataLakeStreamReader(io.RawIOBase):
+	"""
+	Raw binary file reading an iterable of bytes chunks once, from the
+	beginning to the end, e.g. the decompressed content of a file streamed
+	from the datalake, to be wrapped in an `io.BufferedReader`.
+
+	It is not seekable. Closing it closes the iterable, if it has a
+	`close` method (as generators do), releasing the connection.
+	"""
+
+	def __init__(self, chunks, name = None):
+
+		self.name = name
+		self.mode = 'rb'
+
+		self.__chunks = iter(chunks)
+		self.__pending = memoryview(b'')
+		self.__position = 0
+
+	def readable(self):
+		return True
+
+	def tell(self):
+		self._checkClosed()
+		return self.__position
+
+	def readinto(self, buffer):
+
+		self._checkClosed()
+
+		view = memoryview(buffer).cast('B')
+
+		while not self.__pending:
+			chunk = next(self.__chunks, None)
+
+			if chunk is None:
+				return 0
+
+			self.__pending = memoryview(chunk).cast('B')
+
+		count = min(len(view), len(self.__pending))
+		view[:count] = self.__pending[:count]
+		self.__pending = self.__pending[count:]
+		self.__position += count
+
+		return count
+
+	def close(self):
+
+		if not self.closed:
+			self.__pending = memoryview(b'')
+			close = getattr(self.__chunks, 'close', None)
+
+			if close is not None:
+				close()
+
+		super().close()
@@ -0,0 +1,197 @@
+"""Buffered writer appending to a file of the datalake.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import io
+import threading
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Size of the data sent with each append call.
+DEFAULT_APPEND_SIZE = 4 * 1024 * 1024
+# Number of bytes appended after which they are committed by a flush.
+DEFAULT_FLUSH_SIZE = 64 * 1024 * 1024
+
+# ---------------------------------------------------------------------
+
+class DataLakeFileWriter(io.BufferedIOBase):
+	"""
+	Binary file object appending to the end of a file, for long-lived streams.
+
+	`append(data, position)` must append `data` at `position` in the file,
+	and `commit(position, close)` must flush the file up to `position`.
+
+	The data written is buffered and sent with append calls of at most
+	`append_size` bytes (large writes are sent as slices, without copies),
+	at the position tracked by the writer. Appended data becomes visible to readers when it is
+	committed, which happens:
+	* after `flush_size` bytes have been appended since the last commit;
+	* every `flush_interval` seconds, if set, by a background thread
+	  (the data still buffered is appended first);
+	* when `flush` is called explicitly;
+	* when the writer is closed, with the last commit marked as `close`.
+
+	Every commit covers all the data appended so far, so none is left
+	uncommitted (the service discards it unless told to retain it).
+	An error of the background thread is raised by the next call.
+	"""
+
+	def __init__(self
+		, append
+		, commit
+		, position = 0
+		, name = None
+		, append_size = DEFAULT_APPEND_SIZE
+		, flush_size = DEFAULT_FLUSH_SIZE
+		, flush_interval = None
+		):
+
+		self.name = name
+		self.mode = 'ab'
+
+		self.__append = append
+		self.__commit = commit
+		self.__append_size = append_size
+		self.__flush_size = flush_size
+
+		self.__lock = threading.RLock()
+		self.__buffer = bytearray()
+		# Position after the data appended, and after the data committed
+		self.__position = position
+		self.__committed = position
+		self.__error = None
+
+		self.__stop = threading.Event()
+		self.__timer = None
+		self.__closing = False
+
+		if append_size < 1:
+			self.__closing = True
+			raise ValueError('The param [append_size] must be a positive integer. Value passed:\n{}'.format(append_size))
+
+		if flush_interval is not None:
+			self.__timer = threading.Thread(target = self.__flush_periodically, args = (flush_interval,), daemon = True)
+			self.__timer.start()
+
+	def writable(self):
+		return True
+
+	def tell(self):
+		self._checkClosed()
+		return self.__position + len(self.__buffer)
+
+	def write(self, data):
+
+		self._checkClosed()
+
+		view = memoryview(data).cast('B')
+		length = len(view)
+
+		with self.__lock:
+			self.__check_error()
+
+			if self.__buffer:
+				# Completes the data buffered up to a whole append
+				count = min(len(view), self.__append_size - len(self.__buffer))
+				self.__buffer += view[:count]
+				view = view[count:]
+
+				if len(self.__buffer) >= self.__append_size:
+					self.__append_buffer()
+					self.__commit_if_due()
+
+			# Whole appends sent as slices of the data, without copies
+			while len(view) >= self.__append_size:
+				self.__append_data(view[:self.__append_size])
+				view = view[self.__append_size:]
+				self.__commit_if_due()
+
+			self.__buffer += view
+
+		return length
+
+	def flush(self):
+		"""Append the data buffered and commit all the data appended."""
+
+		if self.closed or self.__closing:
+			return
+
+		with self.__lock:
+			self.__check_error()
+			self.__flush(close = False)
+
+	def close(self):
+		"""Append and commit all the data, with a last flush marked as `close`."""
+
+		if self.closed or self.__closing:
+			return
+
+		self.__closing = True
+		self.__stop.set()
+
+		if self.__timer is not None:
+			self.__timer.join()
+
+		try:
+			with self.__lock:
+				self.__check_error()
+				self.__flush(close = True)
+
+		finally:
+			super().close()
+
+	def __flush(self, close):
+
+		if self.__buffer:
+			self.__append_buffer()
+
+		if close or self.__position > self.__committed:
+			self.__commit_appended(close = close)
+
+	def __append_buffer(self):
+
+		with memoryview(self.__buffer) as view:
+			self.__append_data(view)
+
+		self.__buffer = bytearray()
+
+	def __append_data(self, data):
+
+		self.__append(data, self.__position)
+		self.__position += len(data)
+
+	def __commit_if_due(self):
+
+		if self.__flush_size is not None and self.__position - self.__committed >= self.__flush_size:
+			self.__commit_appended(close = False)
+
+	def __commit_appended(self, close):
+
+		self.__commit(self.__position, close)
+		self.__committed = self.__position
+
+	def __check_error(self):
+
+		if self.__error is not None:
+			error, self.__error = self.__error, None
+			raise error
+
+	def __flush_periodically(self, flush_interval):
+
+		while not self.__stop.wait(flush_interval):
+			with self.__lock:
+				if self.__error is not None:
+					continue
+
+				try:
+					self.__flush(close = False)
+				except Exception as e:
+					self.__error = e
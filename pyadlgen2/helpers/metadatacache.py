@@ -0,0 +1,163 @@
+"""Bounded, thread-safe cache of the metadata of datalake paths.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import collections
+import posixpath
+import threading
+import time
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Maximum number of paths kept in the cache.
+DEFAULT_MAX_ENTRIES = 10000
+# Seconds an entry is considered valid.
+DEFAULT_TTL = 30.0
+
+# ---------------------------------------------------------------------
+
+class MetadataCache():
+	"""
+	LRU cache of the metadata of datalake paths, with a time to live per entry.
+
+	Paths that do not exist are cached too (negative caching), with their own
+	time to live, so that repeated existence checks of missing paths do not
+	hit the datalake either.
+
+	The cache only knows about the changes made through the client using it:
+	changes made by other clients become visible when the entries expire.
+
+	Attributes
+	----------
+	hits : int
+		Number of lookups answered by the cache.
+	misses : int
+		Number of lookups that were not in the cache, or had expired.
+	"""
+
+	def __init__(self
+		, max_entries = DEFAULT_MAX_ENTRIES
+		, ttl = DEFAULT_TTL
+		, negative_ttl = None
+		):
+		"""
+		`max_entries` bounds the number of paths kept, the least recently used
+		being evicted first. `ttl` is the number of seconds an entry stays valid,
+		`negative_ttl` the same for paths that do not exist (defaults to `ttl`).
+		"""
+
+		if max_entries < 1:
+			raise ValueError('The param [max_entries] must be a positive integer. Value passed:\n{}'.format(max_entries))
+
+		self.__max_entries = max_entries
+		self.__ttl = ttl
+		self.__negative_ttl = ttl if negative_ttl is None else negative_ttl
+
+		self.__lock = threading.Lock()
+		# path -> (expiry, metadata), metadata is None for missing paths
+		self.__entries = collections.OrderedDict()
+
+		self.hits = 0
+		self.misses = 0
+
+	def __len__(self):
+		with self.__lock:
+			return len(self.__entries)
+
+	def get(self, path):
+		"""
+		Returns a tuple (found, metadata). If `found` is False the path is not in
+		the cache (or its entry expired); otherwise `metadata` is the cached
+		metadata, or None if the path is known not to exist.
+		"""
+
+		path = _normalize(path)
+		now = time.monotonic()
+
+		with self.__lock:
+			entry = self.__entries.get(path)
+
+			if entry is None or entry[0] <= now:
+				if entry is not None:
+					del self.__entries[path]
+
+				self.misses += 1
+				return False, None
+
+			self.__entries.move_to_end(path)
+			self.hits += 1
+
+			return True, entry[1]
+
+	def put(self, path, metadata):
+		"""
+		Cache the metadata of `path`; None means that `path` does not exist.
+		"""
+
+		path = _normalize(path)
+		ttl = self.__negative_ttl if metadata is None else self.__ttl
+
+		with self.__lock:
+			self.__entries[path] = (time.monotonic() + ttl, metadata)
+			self.__entries.move_to_end(path)
+
+			while len(self.__entries) > self.__max_entries:
+				self.__entries.popitem(last = False)
+
+	def invalidate(self, path, recursive = False):
+		"""
+		Drop `path` and all its ancestors from the cache (their existence, size
+		or modification time may change together with `path`).
+		With `recursive` set to True, drop also everything below `path`.
+		"""
+
+		path = _normalize(path)
+
+		with self.__lock:
+			ancestor = path
+
+			while True:
+				self.__entries.pop(ancestor, None)
+
+				parent = posixpath.dirname(ancestor)
+				if parent == ancestor:
+					break
+				ancestor = parent
+
+			if recursive:
+				prefix = path.rstrip('/') + '/'
+
+				for key in [key for key in self.__entries if key.startswith(prefix)]:
+					del self.__entries[key]
+
+	def clear(self):
+		"""
+		Drop all the entries; the counters are kept.
+		"""
+		with self.__lock:
+			self.__entries.clear()
+
+	def stats(self):
+		"""
+		Returns a dict with the counters of the cache.
+		"""
+		with self.__lock:
+			lookups = self.hits + self.misses
+
+			return {
+				'hits' : self.hits
+				, 'misses' : self.misses
+				, 'hit_rate' : self.hits / lookups if lookups else 0.0
+				, 'entries' : len(self.__entries)
+			}
+
+def _normalize(path):
+	return posixpath.normpath('/' + str(path).lstrip('/'))
@@ -0,0 +1,152 @@
+"""Concurrent execution of the chunks of a transfer.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.exceptions import ChunkedEncodingError
+from urllib3.exceptions import HTTPError as Urllib3Error
+import time
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Number of chunks transferred at the same time.
+DEFAULT_MAX_CONCURRENCY = 8
+# Number of times a failed chunk is retried before giving up.
+DEFAULT_CHUNK_RETRIES = 3
+# Seconds waited before the first retry of a chunk, doubled at each retry.
+CHUNK_RETRY_BACKOFF = 0.5
+# Size of the byte ranges downloaded with each read call.
+DEFAULT_RANGE_SIZE = 8 * 1024 * 1024
+
+# ---------------------------------------------------------------------
+
+def upload_chunks_parallel(append_chunk
+	, chunks
+	, max_concurrency = DEFAULT_MAX_CONCURRENCY
+	):
+	"""
+	Calls `append_chunk(chunk, position)` for each chunk yielded by `chunks`,
+	with up to `max_concurrency` calls running at the same time.
+	The position of each chunk is the sum of the lengths of the previous ones.
+
+	`chunks` is consumed lazily: at most `max_concurrency` chunks are held in
+	memory at any time. Failed requests are retried by the REST wrapper; if a
+	chunk still fails, the chunks not yet started are cancelled and the error
+	is raised.
+
+	Returns the total number of bytes appended.
+	"""
+
+	if max_concurrency < 1:
+		raise ValueError('The param [max_concurrency] must be a positive integer. Value passed:\n{}'.format(max_concurrency))
+
+	position = 0
+	pending = set()
+
+	executor = ThreadPoolExecutor(max_workers = max_concurrency)
+
+	try:
+		for chunk in chunks:
+			# Wait for a free slot, so that memory stays bounded
+			while len(pending) >= max_concurrency:
+				done, pending = wait(pending, return_when = FIRST_COMPLETED)
+				for future in done:
+					future.result()
+
+			pending.add(executor.submit(append_chunk, chunk, position))
+
+			position += len(chunk)
+
+		done, pending = wait(pending)
+		for future in done:
+			future.result()
+
+	finally:
+		executor.shutdown(wait = True, cancel_futures = True)
+
+	return position
+
+def download_ranges_parallel(read_range
+	, buffer
+	, range_size = DEFAULT_RANGE_SIZE
+	, max_concurrency = DEFAULT_MAX_CONCURRENCY
+	, chunk_retries = DEFAULT_CHUNK_RETRIES
+	):
+	"""
+	Fills `buffer` by splitting it in ranges of `range_size` bytes and calling
+	`read_range(view, offset)` for each of them, with up to `max_concurrency`
+	calls running at the same time. `view` is a memoryview on the slice of
+	`buffer` starting at `offset`, so every range is written in place.
+
+	`read_range` must return the number of bytes written into `view`; a range
+	that is not filled completely raises an IOError. The requests themselves
+	are retried by the REST wrapper: `chunk_retries` only applies to the errors
+	raised while reading the body of a response (e.g. a connection broken in
+	the middle of a range), after which the whole range is requested again.
+
+	Returns the number of bytes read.
+	"""
+
+	if max_concurrency < 1:
+		raise ValueError('The param [max_concurrency] must be a positive integer. Value passed:\n{}'.format(max_concurrency))
+	if range_size < 1:
+		raise ValueError('The param [range_size] must be a positive integer. Value passed:\n{}'.format(range_size))
+
+	view = memoryview(buffer).cast('B')
+
+	def read_full_range(range_view, offset):
+		count = read_range(range_view, offset)
+
+		if count != len(range_view):
+			raise IOError('Read {} bytes instead of {} at offset {}.'.format(count, len(range_view), offset))
+
+		return count
+
+	executor = ThreadPoolExecutor(max_workers = max_concurrency)
+
+	try:
+		futures = [
+			executor.submit(
+				_call_with_retries
+				, read_full_range
+				, view[offset:offset + range_size]
+				, offset
+				, chunk_retries
+			)
+			for offset in range(0, len(view), range_size)
+		]
+
+		return sum(future.result() for future in futures)
+
+	finally:
+		executor.shutdown(wait = True, cancel_futures = True)
+
+def _is_retryable(error):
+
+	# The requests themselves are already retried by the REST wrapper:
+	# only the errors raised while reading a streamed body, which come
+	# straight from urllib3, are left to be retried here.
+	return isinstance(error, (ChunkedEncodingError, Urllib3Error))
+
+def _call_with_retries(function, chunk, position, retries):
+
+	attempt = 0
+
+	while True:
+		try:
+			return function(chunk, position)
+
+		except Exception as e:
+			if attempt >= retries or not _is_retryable(e):
+				raise
+
+		time.sleep(CHUNK_RETRY_BACKOFF * (2 ** attempt))
+		attempt += 1
@@ -0,0 +1,224 @@
+"""Compact representation of the status of a path in the datalake.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+from array import array
+from email.utils import mktime_tz, parsedate_tz, parsedate_to_datetime
+from requests.structures import CaseInsensitiveDict
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+
+class PathStatus():
+	"""
+	System properties of a file or directory.
+
+	Attributes
+	----------
+	path : str
+		Absolute path, in the form /{filesystem}/{path}.
+	is_directory : bool
+		True if the path is a directory (or a filesystem), False if it is a file.
+	size : int
+		Size of the file in bytes (0 for directories).
+	etag : str
+		ETag of the path, None if not returned by the service.
+	last_modified : datetime.datetime
+		Last modification time (timezone aware), None if not returned by the service.
+	owner : str
+		Owner of the path, None if not returned by the service.
+	group : str
+		Owning group of the path, None if not returned by the service.
+	permissions : str
+		POSIX permissions of the path (e.g. 'rwxr-x---'), None if not returned by the service.
+	content_encoding : str
+		Content-Encoding of the file (e.g. 'gzip'), None if not set
+		or not returned by the service (listings do not return it).
+	"""
+
+	__slots__ = (
+		'path'
+		, 'is_directory'
+		, 'size'
+		, 'etag'
+		, 'last_modified'
+		, 'owner'
+		, 'group'
+		, 'permissions'
+		, 'content_encoding'
+	)
+
+	def __init__(self
+		, path
+		, is_directory
+		, size = 0
+		, etag = None
+		, last_modified = None
+		, owner = None
+		, group = None
+		, permissions = None
+		, content_encoding = None
+		):
+
+		self.path = path
+		self.is_directory = is_directory
+		self.size = size
+		self.etag = etag
+		self.last_modified = last_modified
+		self.owner = owner
+		self.group = group
+		self.permissions = permissions
+		self.content_encoding = content_encoding
+
+	@property
+	def is_file(self):
+		return not self.is_directory
+
+	@property
+	def type(self):
+		return 'directory' if self.is_directory else 'file'
+
+	@classmethod
+	def from_headers(cls, path, headers):
+		"""
+		Build a PathStatus from the headers returned by a
+		Get Properties (Get Status) or a Get Filesystem Properties call.
+		A missing `x-ms-resource-type` means the path is a filesystem.
+		"""
+
+		headers = CaseInsensitiveDict(headers)
+		last_modified = headers.get('Last-Modified')
+
+		return cls(
+			path = str(path)
+			, is_directory = headers.get('x-ms-resource-type', 'directory') == 'directory'
+			, size = int(headers.get('Content-Length') or 0)
+			, etag = headers.get('ETag')
+			, last_modified = parsedate_to_datetime(last_modified) if last_modified else None
+			, owner = headers.get('x-ms-owner')
+			, group = headers.get('x-ms-group')
+			, permissions = headers.get('x-ms-permissions')
+			, content_encoding = headers.get('Content-Encoding')
+		)
+
+	@classmethod
+	def from_list_entry(cls, filesystem, entry):
+		"""
+		Build a PathStatus from an entry of a List Paths response.
+		`entry['name']` is relative to `filesystem`.
+		"""
+
+		last_modified = entry.get('lastModified')
+
+		return cls(
+			path = '/{}/{}'.format(filesystem, entry['name'])
+			, is_directory = str(entry.get('isDirectory', 'false')).lower() == 'true'
+			, size = int(entry.get('contentLength') or 0)
+			, etag = entry.get('etag')
+			, last_modified = parsedate_to_datetime(last_modified) if last_modified else None
+			, owner = entry.get('owner')
+			, group = entry.get('group')
+			, permissions = entry.get('permissions')
+		)
+
+	@classmethod
+	def from_filesystem_entry(cls, entry):
+		"""
+		Build a PathStatus from an entry of a List Filesystems response.
+		"""
+
+		last_modified = entry.get('lastModified')
+
+		return cls(
+			path = '/{}'.format(entry['name'])
+			, is_directory = True
+			, etag = entry.get('etag')
+			, last_modified = parsedate_to_datetime(last_modified) if last_modified else None
+		)
+
+	def __eq__(self, other):
+		if not isinstance(other, PathStatus):
+			return NotImplemented
+		return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+	def __repr__(self):
+		return '{}({})'.format(
+			type(self).__name__
+			, ', '.join('{}={!r}'.format(name, getattr(self, name)) for name in self.__slots__)
+		)
+
+class PathColumns():
+	"""
+	Columnar representation of a listing, for inventories of very large
+	numbers of paths: each attribute is stored in a single compact array
+	instead of one object per path.
+
+	Attributes
+	----------
+	paths : list of str
+		Absolute paths, in the form /{filesystem}/{path}.
+	sizes : array.array of int64
+		Sizes in bytes.
+	last_modified : array.array of int64
+		Last modification times, as seconds since the epoch (UTC).
+		-1 if not returned by the service.
+	is_directory : array.array of int8
+		1 for directories, 0 for files.
+	"""
+
+	__slots__ = (
+		'paths'
+		, 'sizes'
+		, 'last_modified'
+		, 'is_directory'
+	)
+
+	def __init__(self):
+
+		self.paths = []
+		self.sizes = array('q')
+		self.last_modified = array('q')
+		self.is_directory = array('b')
+
+	def __len__(self):
+		return len(self.paths)
+
+	def append_list_entry(self, filesystem, entry):
+		"""
+		Append an entry of a List Paths response.
+		`entry['name']` is relative to `filesystem`.
+		"""
+
+		last_modified = entry.get('lastModified')
+
+		self.paths.append('/{}/{}'.format(filesystem, entry['name']))
+		self.sizes.append(int(entry.get('contentLength') or 0))
+		self.last_modified.append(mktime_tz(parsedate_tz(last_modified)) if last_modified else -1)
+		self.is_directory.append(1 if str(entry.get('isDirectory', 'false')).lower() == 'true' else 0)
+
+	def to_numpy(self):
+		"""
+		Returns the columns as a dict of NumPy arrays, sharing the memory
+		of the underlying arrays where possible: `paths` (object),
+		`sizes` (int64), `last_modified` (datetime64[s]) and `is_directory` (bool).
+		Requires NumPy to be installed. The listing cannot be extended
+		while the returned arrays are alive.
+		"""
+
+		try:
+			import numpy
+		except ImportError as e:
+			raise ImportError('NumPy is required to convert a listing to NumPy arrays.') from e
+
+		return {
+			'paths' : numpy.array(self.paths, dtype = object)
+			, 'sizes' : numpy.frombuffer(self.sizes, dtype = numpy.int64)
+			, 'last_modified' : numpy.frombuffer(self.last_modified, dtype = numpy.int64).view('datetime64[s]')
+			, 'is_directory' : numpy.frombuffer(self.is_directory, dtype = numpy.int8).view(numpy.bool_)
+		}
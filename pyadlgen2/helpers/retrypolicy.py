@@ -0,0 +1,194 @@
+"""Retry policy and adaptive concurrency control for the REST calls.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import datetime
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Number of times a failed call is retried.
+DEFAULT_MAX_RETRIES = 5
+# Seconds of the first backoff, doubled at each retry.
+DEFAULT_BACKOFF_BASE = 0.5
+# Maximum seconds waited before a retry.
+DEFAULT_BACKOFF_MAX = 30.0
+# Status codes of the responses worth retrying.
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+# Status codes with which the service says that the request was throttled,
+# and so was not processed.
+THROTTLING_STATUS_CODES = (429, 503)
+
+# Seconds after a decrease of the concurrency limit during which
+# other throttled calls do not decrease it again.
+DEFAULT_DECREASE_COOLDOWN = 1.0
+
+# ---------------------------------------------------------------------
+
+class RetryPolicy():
+	"""
+	Exponential backoff with full jitter, honouring the `Retry-After` header.
+
+	Whether a failed call can be retried depends on the operation:
+	* throttled calls (429, 503) were not processed by the service,
+	  so they are always retried;
+	* other retryable failures (408, 500, 502, 504, connection errors,
+	  timeouts) may have been processed, so they are retried only if
+	  the operation is idempotent.
+	"""
+
+	def __init__(self
+		, max_retries = DEFAULT_MAX_RETRIES
+		, backoff_base = DEFAULT_BACKOFF_BASE
+		, backoff_max = DEFAULT_BACKOFF_MAX
+		, retryable_status_codes = RETRYABLE_STATUS_CODES
+		):
+
+		self.max_retries = max_retries
+		self.backoff_base = backoff_base
+		self.backoff_max = backoff_max
+		self.retryable_status_codes = tuple(retryable_status_codes)
+
+	def should_retry(self, attempt, status_code, idempotent):
+		"""
+		Returns True if a call that failed at the `attempt`-th retry (0 for the first
+		call) can be retried. `status_code` is None if no response was received.
+		"""
+
+		if attempt >= self.max_retries:
+			return False
+
+		if status_code in THROTTLING_STATUS_CODES:
+			return True
+
+		if not idempotent:
+			return False
+
+		return status_code is None or status_code in self.retryable_status_codes
+
+	def get_backoff(self, attempt, retry_after = None):
+		"""
+		Returns the seconds to wait before the retry following the `attempt`-th one.
+		`retry_after` is the value of the `Retry-After` header of the response, if any:
+		the service asked to wait at least that long.
+		"""
+
+		backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+		retry_after = _parse_retry_after(retry_after)
+		if retry_after is not None:
+			backoff = max(backoff, min(retry_after, self.backoff_max))
+
+		return backoff
+
+def _parse_retry_after(retry_after):
+
+	if not retry_after:
+		return None
+
+	try:
+		return max(0.0, float(retry_after))
+	except ValueError:
+		pass
+
+	try:
+		date = parsedate_to_datetime(retry_after)
+	except (TypeError, ValueError):
+		return None
+
+	return max(0.0, (date - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+# ---------------------------------------------------------------------
+
+class AdaptiveConcurrencyLimiter():
+	"""
+	AIMD (additive increase, multiplicative decrease) limit on the number of
+	requests in flight, shared by all the threads using a client.
+
+	Every request takes a slot before being sent, waiting if the limit is reached.
+	When a request is throttled the limit is multiplied by `decrease_factor` (at
+	most once per `decrease_cooldown` seconds, so a burst of throttled responses
+	counts once); after a limit's worth of successful requests it grows by
+	`increase`. The throughput thus converges to what the account can sustain.
+	"""
+
+	def __init__(self
+		, initial_limit
+		, min_limit = 1
+		, max_limit = None
+		, increase = 1
+		, decrease_factor = 0.5
+		, decrease_cooldown = DEFAULT_DECREASE_COOLDOWN
+		):
+
+		max_limit = initial_limit if max_limit is None else max_limit
+
+		if not 1 <= min_limit <= initial_limit <= max_limit:
+			raise ValueError('The limits must satisfy 1 <= min_limit <= initial_limit <= max_limit.')
+
+		self.__min_limit = min_limit
+		self.__max_limit = max_limit
+		self.__increase = increase
+		self.__decrease_factor = decrease_factor
+		self.__decrease_cooldown = decrease_cooldown
+
+		self.__condition = threading.Condition()
+		self.__limit = float(initial_limit)
+		self.__in_flight = 0
+		self.__successes = 0
+		self.__last_decrease = float('-inf')
+
+	@property
+	def limit(self):
+		"""The current number of requests allowed in flight."""
+		return int(self.__limit)
+
+	@property
+	def in_flight(self):
+		"""The number of requests currently in flight."""
+		return self.__in_flight
+
+	def acquire(self):
+		"""
+		Take a slot, waiting until the number of requests in flight is below the limit.
+		"""
+		with self.__condition:
+			while self.__in_flight >= int(self.__limit):
+				self.__condition.wait()
+
+			self.__in_flight += 1
+
+	def release(self, throttled = False):
+		"""
+		Give back a slot, telling whether the request was throttled by the service.
+		"""
+		with self.__condition:
+			self.__in_flight -= 1
+
+			if throttled:
+				now = time.monotonic()
+
+				if now - self.__last_decrease >= self.__decrease_cooldown:
+					self.__limit = max(float(self.__min_limit), self.__limit * self.__decrease_factor)
+					self.__last_decrease = now
+					self.__successes = 0
+
+			else:
+				self.__successes += 1
+
+				if self.__successes >= int(self.__limit):
+					self.__limit = min(float(self.__max_limit), self.__limit + self.__increase)
+					self.__successes = 0
+
+			self.__condition.notify_all()
@@ -0,0 +1,134 @@
+"""Thread-safe cache of account SAS tokens.
+
+Signing a SAS token costs an HMAC computation and the parsing of the
+resulting query string. The cache signs a token once per combination of
+services, resource types and permissions, keeps it already parsed into
+query params, and renews it in the background when it gets close to its
+expiry.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+from azure.storage.common.models import Protocol
+
+import datetime
+import threading
+from urllib.parse import parse_qs
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# How long a signed token is valid.
+DEFAULT_TOKEN_LIFETIME = datetime.timedelta(minutes=15)
+# How long before the expiry a token gets renewed.
+DEFAULT_REFRESH_MARGIN = datetime.timedelta(minutes=2)
+
+# ---------------------------------------------------------------------
+
+class SasTokenCache():
+	"""
+	Cache of account SAS tokens, keyed by (services, resource_types, permission).
+
+	A cached token is handed out as long as it is valid for at least `refresh_margin`.
+	The first request that finds a token inside the margin still receives it (it is
+	still valid for the whole margin) and triggers its renewal in a background thread,
+	so callers never wait for a signature unless the token is missing or expired.
+	"""
+
+	def __init__(self
+		, account_sas_generator
+		, token_lifetime = DEFAULT_TOKEN_LIFETIME
+		, refresh_margin = DEFAULT_REFRESH_MARGIN
+		):
+
+		if refresh_margin >= token_lifetime:
+			raise ValueError('The param [refresh_margin] must be smaller than [token_lifetime].')
+
+		self.__account_sas_generator = account_sas_generator
+		self.__token_lifetime = token_lifetime
+		self.__refresh_margin = refresh_margin
+
+		self.__lock = threading.Lock()
+		# key -> (params, expiry)
+		self.__tokens = {}
+		# keys whose renewal is running in the background
+		self.__refreshing = set()
+
+	def get_params(self, services, resource_types, permission):
+		"""
+		Returns the query params of a valid SAS token for the given
+		services, resource types and permission.
+		The returned dict is a copy, so it can be extended with the
+		params of the operation.
+		"""
+
+		key = (str(services), str(resource_types), str(permission))
+		now = datetime.datetime.now(datetime.timezone.utc)
+
+		with self.__lock:
+			entry = self.__tokens.get(key)
+
+			if entry is not None:
+				params, expiry = entry
+
+				if now < expiry - self.__refresh_margin:
+					return dict(params)
+
+				if now < expiry:
+					if key not in self.__refreshing:
+						self.__refreshing.add(key)
+						threading.Thread(
+							target = self.__refresh
+							, args = (key, services, resource_types, permission)
+							, daemon = True
+						).start()
+
+					return dict(params)
+
+		# The token is missing or expired: sign it synchronously
+		params, expiry = self.__sign(services, resource_types, permission)
+
+		with self.__lock:
+			self.__tokens[key] = (params, expiry)
+
+		return dict(params)
+
+	def clear(self):
+		"""
+		Drop all the cached tokens.
+		"""
+		with self.__lock:
+			self.__tokens.clear()
+
+	def __refresh(self, key, services, resource_types, permission):
+
+		try:
+			params, expiry = self.__sign(services, resource_types, permission)
+
+			with self.__lock:
+				self.__tokens[key] = (params, expiry)
+		finally:
+			with self.__lock:
+				self.__refreshing.discard(key)
+
+	def __sign(self, services, resource_types, permission):
+
+		expiry = datetime.datetime.now(datetime.timezone.utc) + self.__token_lifetime
+
+		sas_token = self.__account_sas_generator.generate_account(
+			services = services
+			, resource_types = resource_types
+			, permission = permission
+			, expiry = expiry
+			, start = None
+			, ip = None
+			, protocol = Protocol.HTTPS
+		)
+
+		return parse_qs(sas_token), expiry
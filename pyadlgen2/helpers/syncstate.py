@@ -0,0 +1,90 @@
+"""Local record of the files mirrored from the datalake.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import json
+import os
+import tempfile
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Name of the state file written in the root of a mirrored directory.
+DEFAULT_STATE_FILENAME = '.adlgen2-sync.json'
+
+# ---------------------------------------------------------------------
+
+def _read_umask():
+
+	# The umask can only be read by replacing it: done once, at import,
+	# rather than from threads that may be creating files meanwhile
+	umask = os.umask(0)
+	os.umask(umask)
+
+	return umask
+
+_UMASK = _read_umask()
+
+def set_default_mode(path):
+	"""
+	Gives `path` the permissions of a file created by `open` (0o666 minus
+	the umask), e.g. before renaming a file made by `tempfile.mkstemp`,
+	which is readable by its owner only, over its destination.
+	"""
+
+	os.chmod(path, 0o666 & ~_UMASK)
+
+def is_state_file(relative_path):
+	"""
+	Returns True if `relative_path`, in a mirrored tree, is a state file
+	with the default name, never transferred as user data.
+	"""
+
+	return relative_path.split('/')[-1] == DEFAULT_STATE_FILENAME
+
+def load_sync_state(state_file, remote_path):
+	"""
+	Returns the dict {relative path : {'etag' : ..., 'last_modified' : ...}}
+	of the files downloaded from `remote_path` by the previous runs.
+	A missing or unreadable state file, or one written for another
+	remote path, gives an empty state: every file is downloaded again.
+	"""
+
+	try:
+		with open(state_file, 'r', encoding = 'utf-8') as file_object:
+			state = json.load(file_object)
+
+	except (OSError, ValueError):
+		return {}
+
+	if not isinstance(state, dict) or state.get('remote_path') != str(remote_path):
+		return {}
+
+	return dict(state.get('files') or {})
+
+def save_sync_state(state_file, remote_path, files):
+	"""
+	Atomically replaces `state_file` with the state of `files`, so that an
+	interrupted run leaves the previous state intact.
+	"""
+
+	directory = os.path.dirname(os.path.abspath(state_file))
+	descriptor, temp_path = tempfile.mkstemp(dir = directory, prefix = '.', suffix = '.tmp')
+
+	try:
+		with os.fdopen(descriptor, 'w', encoding = 'utf-8') as file_object:
+			json.dump({'remote_path' : str(remote_path), 'files' : files}, file_object, sort_keys = True)
+
+		set_default_mode(temp_path)
+		os.replace(temp_path, state_file)
+
+	except BaseException:
+		os.unlink(temp_path)
+		raise
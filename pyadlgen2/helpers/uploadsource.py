@@ -0,0 +1,147 @@
+"""Split the data to upload into bounded-size chunks.
+
+The data can come from different kinds of sources (str, bytes-like objects,
+file objects, local paths, iterators), and is always consumed lazily, so
+that at most one chunk at a time has to be held in memory.
+
+"""
+
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import io
+import mmap
+import os
+
+# Internal Libraries
+
+# ---------------------------------------------------------------------
+# PARAMETERS
+
+# Size of the chunks sent with each append call.
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# ---------------------------------------------------------------------
+
+def iter_chunks(source, chunk_size = DEFAULT_CHUNK_SIZE, encoding = 'utf-8', reuse_buffer = False):
+	"""
+	Yields the content of `source` as bytes-like chunks of `chunk_size` bytes
+	(the last one can be smaller).
+
+	`source` can be:
+	* a str, encoded with `encoding`
+	* an object supporting the buffer protocol (bytes, bytearray, memoryview,
+	  mmap, array, ...), sliced without copies
+	* a local path (pathlib.Path or any os.PathLike), read from disk
+	* a file object opened in binary or text mode, read from its current position
+	* an iterable of str or bytes-like objects, re-chunked to `chunk_size`
+
+	Binary files are read with `readinto`, straight into the memory of the chunk.
+	With `reuse_buffer` the same memory is reused for all the chunks of a file,
+	so each chunk is valid only until the next one is requested: the consumer
+	must be done with it by then (e.g. a sequential upload).
+	"""
+
+	if chunk_size <= 0:
+		raise ValueError('The param [chunk_size] must be a positive integer. Value passed:\n{}'.format(chunk_size))
+
+	if isinstance(source, str):
+		source = source.encode(encoding)
+
+	view = _as_buffer(source)
+
+	if view is not None:
+		with view:
+			for start in range(0, len(view), chunk_size):
+				yield view[start:start + chunk_size]
+
+	elif isinstance(source, os.PathLike):
+		# Unbuffered, so that readinto goes straight from the OS to the chunk
+		with open(source, 'rb', buffering = 0) as file_object:
+			yield from _iter_file_chunks(file_object, chunk_size, encoding, reuse_buffer)
+
+	elif hasattr(source, 'read'):
+		yield from _iter_file_chunks(source, chunk_size, encoding, reuse_buffer)
+
+	elif hasattr(source, '__iter__'):
+		yield from _iter_iterable_chunks(source, chunk_size, encoding)
+
+	else:
+		raise TypeError('The source of the data has an unsupported type: [{}]'.format(type(source).__name__))
+
+def _as_buffer(source):
+	"""Returns a flat memoryview of `source` if it supports the buffer protocol, None otherwise."""
+
+	if isinstance(source, (bytes, bytearray, memoryview)) or not hasattr(source, 'read'):
+		try:
+			return memoryview(source).cast('B')
+		except TypeError:
+			return None
+
+	# mmap objects have `read` too, but are better sliced in place
+	if isinstance(source, mmap.mmap):
+		return memoryview(source).cast('B')
+
+	return None
+
+def _iter_file_chunks(file_object, chunk_size, encoding, reuse_buffer = False):
+
+	if hasattr(file_object, 'readinto') and not isinstance(file_object, io.TextIOBase):
+		yield from _iter_binary_file_chunks(file_object, chunk_size, reuse_buffer)
+		return
+
+	# Text files count characters, not bytes, and other file objects can
+	# return short reads (pipes, sockets): the data read is re-chunked
+	yield from _iter_iterable_chunks(_iter_reads(file_object, chunk_size), chunk_size, encoding)
+
+def _iter_reads(file_object, size):
+
+	while True:
+		data = file_object.read(size)
+
+		if not data:
+			return
+
+		yield data
+
+def _iter_binary_file_chunks(file_object, chunk_size, reuse_buffer):
+
+	buffer = bytearray(chunk_size) if reuse_buffer else None
+
+	while True:
+		if not reuse_buffer:
+			buffer = bytearray(chunk_size)
+
+		view = memoryview(buffer)
+		length = 0
+
+		# Short reads (pipes, sockets) are completed up to chunk_size
+		while length < chunk_size:
+			count = file_object.readinto(view[length:])
+
+			if not count:
+				break
+
+			length += count
+
+		if length:
+			yield view[:length]
+
+		if length < chunk_size:
+			return
+
+def _iter_iterable_chunks(iterable, chunk_size, encoding):
+
+	buffer = bytearray()
+
+	for data in iterable:
+		buffer += data.encode(encoding) if isinstance(data, str) else data
+
+		while len(buffer) >= chunk_size:
+			yield bytes(buffer[:chunk_size])
+			del buffer[:chunk_size]
+
+	if buffer:
+		yield bytes(buffer)
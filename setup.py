@@ -18,5 +18,15 @@ setup(
     author_email='',
     url='https://github.com/stawo/python-azure-datalake-gen2-api',
     license=license,
-    packages=find_packages(exclude=('tests', 'docs'))
+    packages=find_packages(exclude=('tests', 'docs')),
+    extras_require={
+        'fsspec': ['fsspec'],
+        'async': ['aiohttp'],
+        'zstd': ['zstandard'],
+    },
+    entry_points={
+        'fsspec.specs': [
+            'adlgen2 = pyadlgen2.adlgen2filesystem:ADLGen2FileSystem',
+        ],
+    }
 )
\ No newline at end of file
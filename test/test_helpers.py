@@ -0,0 +1,2435 @@
+# ---------------------------------------------------------------------
+
+# LIBRARIES
+
+# External Libraries
+import asyncio
+import datetime
+import errno
+import gc
+import gzip
+import io
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import urllib.parse
+import requests
+from requests.structures import CaseInsensitiveDict
+import urllib3
+
+# Internal Libraries
+from pyadlgen2 import azuredatalakegen2
+from pyadlgen2.azuredatalakegen2 import AzureDataLakeGen2
+from pyadlgen2.helpers import adlgen2restapiwrapper, contentcache, paralleltransfer, sastokencache
+from pyadlgen2.helpers.adlgen2restapiwrapper import ADLGen2RestApiWrapper
+from pyadlgen2.helpers.blockcache import BlockCache
+from pyadlgen2.helpers.bulkoperations import run_bulk, PathResult
+from pyadlgen2.helpers.compression import compress_chunks, decompress_chunks
+from pyadlgen2.helpers.contentcache import ContentCache
+from pyadlgen2.helpers.filereader import DataLakeFileReader, DataLakeStreamReader
+from pyadlgen2.helpers.filewriter import DataLakeFileWriter
+from pyadlgen2.helpers.metadatacache import MetadataCache
+from pyadlgen2.helpers.pathstatus import PathStatus, PathColumns
+from pyadlgen2.helpers.retrypolicy import RetryPolicy, AdaptiveConcurrencyLimiter
+from pyadlgen2.helpers.syncstate import (
+	load_sync_state
+	, save_sync_state
+	, is_state_file
+	, DEFAULT_STATE_FILENAME
+)
+from pyadlgen2.helpers.uploadsource import iter_chunks
+
+try:
+	from pyadlgen2.adlgen2filesystem import ADLGen2FileSystem
+except ImportError:
+	ADLGen2FileSystem = None
+
+try:
+	import aiohttp
+	from pyadlgen2.azuredatalakegen2async import AzureDataLakeGen2Async
+	from pyadlgen2.helpers.adlgen2restapiwrapperasync import ADLGen2RestApiWrapperAsync
+except ImportError:
+	AzureDataLakeGen2Async = None
+
+# ---------------------------------------------------------------------
+
+# Last-Modified of the paths of the fake service.
+FAKE_LAST_MODIFIED = 'Thu, 01 Jan 2026 00:00:00 GMT'
+
+class FakeDataLake():
+	'''
+	In-memory stand-in for the REST API of a storage account, plugged in place
+	of `requests.Session.request` (see `patch`), to drive the clients without
+	an account. Files are stored as bytes by absolute path (/{filesystem}/...),
+	directories as a set of paths; every request is recorded in `calls`.
+	`errors` maps (method, path) to a list of status codes returned (and
+	consumed) before the request is served; the path of a listing is the
+	directory listed. With `rename_batch` (`delete_batch`), a rename (a
+	recursive delete) moves (deletes) at most that many paths per call, and
+	returns a continuation token until the whole tree is done.
+	'''
+
+	def __init__(self, page_size = 1000):
+
+		self.filesystems = {'fs'}
+		self.files = {}
+		self.directories = set()
+		self.properties = {}
+		self.versions = {}
+		self.pending = {}
+		self.calls = []
+		self.errors = {}
+		self.page_size = page_size
+		self.rename_batch = None
+		self.delete_batch = None
+		self.lock = threading.RLock()
+
+	def patch(self):
+		"""Returns a context manager routing the requests of all the sessions to the fake."""
+
+		return mock.patch.object(
+			requests.Session
+			, 'request'
+			, lambda session, method, url, **kwargs: self.request(method, url, **kwargs)
+		)
+
+	def add_file(self, path, data = b'', **properties):
+		"""Stores a file, creating its parent directories."""
+
+		with self.lock:
+			self.__add_parents(path)
+			self.files[path] = bytes(data)
+			self.properties[path] = dict(properties)
+			self.versions[path] = self.versions.get(path, 0) + 1
+
+	def add_directory(self, path):
+
+		with self.lock:
+			self.__add_parents(path)
+			self.directories.add(path)
+
+	def etag(self, path):
+		return '0x{:X}'.format(self.versions.get(path, 0) * 1000 + len(self.files.get(path, b'')))
+
+	def count(self, method, path = None, **params):
+		"""Number of calls recorded with the given method, path and params."""
+
+		return sum(
+			1 for call in self.calls
+			if call[0] == method
+			and (path is None or call[1] == path)
+			and all(call[2].get(name) == value for name, value in params.items())
+		)
+
+	def __add_parents(self, path):
+
+		parent = path.rsplit('/', 1)[0]
+
+		while parent.count('/') > 1:
+			self.directories.add(parent)
+			parent = parent.rsplit('/', 1)[0]
+
+	def __is_directory(self, path):
+		return path in self.directories or (path.count('/') == 1 and path[1:] in self.filesystems)
+
+	def __children(self, path):
+		return [
+			child for child in sorted(set(self.files) | self.directories)
+			if child.startswith(path + '/')
+		]
+
+	@staticmethod
+	def response(status_code, body = b'', headers = None, url = None):
+
+		response = requests.Response()
+		response.status_code = status_code
+		response.reason = 'Fake'
+		response.url = url
+		response.headers = CaseInsensitiveDict(headers or {})
+		response.raw = urllib3.HTTPResponse(body = io.BytesIO(body), preload_content = False, status = status_code)
+
+		return response
+
+	def request(self, method, url, params = None, headers = None, data = None, stream = False, **kwargs):
+
+		parsed = urllib.parse.urlparse(url)
+		path = urllib.parse.unquote(parsed.path).rstrip('/')
+		params = {name : str(value) for name, value in (params or {}).items() if name not in ('sig', 'se', 'sp', 'sv', 'ss', 'srt', 'st', 'spr')}
+		headers = CaseInsensitiveDict(headers or {})
+
+		with self.lock:
+			self.calls.append((method, path, params, headers))
+
+			# The errors of a listing are keyed by the directory listed
+			target = path + '/' + params['directory'] if params.get('resource') == 'filesystem' and params.get('directory') else path
+			errors = self.errors.get((method, target))
+			if errors:
+				status_code = errors.pop(0)
+				return self.response(status_code, headers = {'x-ms-error-code' : 'FakeError'}, url = url)
+
+			response = self.__serve(method, path, params, headers, data)
+
+		response.url = url
+
+		if not stream:
+			response._content = response.raw.read()
+
+		return response
+
+	def __serve(self, method, path, params, headers, data):
+
+		if method == 'HEAD':
+			return self.__get_status(path)
+		elif method == 'GET' and params.get('resource') == 'account':
+			return self.__list_filesystems(params)
+		elif method == 'GET' and params.get('resource') == 'filesystem':
+			return self.__list(path, params)
+		elif method == 'GET':
+			return self.__read(path, headers)
+		elif method == 'PUT' and 'x-ms-rename-source' in headers:
+			return self.__rename(path, params, headers)
+		elif method == 'PUT':
+			return self.__create(path, params, headers)
+		elif method == 'PATCH':
+			return self.__update(path, params, headers, data)
+		elif method == 'DELETE':
+			return self.__delete(path, params)
+
+		raise AssertionError('Unexpected request: {} {}'.format(method, path))
+
+	def __get_status(self, path):
+
+		if path in self.files:
+			headers = {
+				'Content-Length' : str(len(self.files[path]))
+				, 'ETag' : '"{}"'.format(self.etag(path))
+				, 'Last-Modified' : FAKE_LAST_MODIFIED
+				, 'x-ms-resource-type' : 'file'
+			}
+			headers.update(self.properties.get(path, {}))
+			return self.response(200, headers = headers)
+
+		if path.count('/') == 1 and path[1:] in self.filesystems:
+			return self.response(200, headers = {'ETag' : '"0x1"', 'Last-Modified' : FAKE_LAST_MODIFIED})
+
+		if path in self.directories:
+			return self.response(200, headers = {
+				'Content-Length' : '0'
+				, 'ETag' : '"0x1"'
+				, 'Last-Modified' : FAKE_LAST_MODIFIED
+				, 'x-ms-resource-type' : 'directory'
+			})
+
+		return self.response(404)
+
+	def __list_filesystems(self, params):
+
+		names = [name for name in sorted(self.filesystems) if name.startswith(params.get('prefix', ''))]
+		start = int(params.get('continuation') or 0)
+		headers = {}
+
+		if start + self.page_size < len(names):
+			headers['x-ms-continuation'] = str(start + self.page_size)
+
+		body = {'filesystems' : [
+			{'name' : name, 'etag' : '0x1', 'lastModified' : FAKE_LAST_MODIFIED}
+			for name in names[start:start + self.page_size]
+		]}
+
+		return self.response(200, json.dumps(body).encode('utf-8'), headers)
+
+	def __list(self, path, params):
+
+		base = path + ('/' + params['directory'] if params.get('directory') else '')
+
+		if not self.__is_directory(base):
+			return self.response(404, headers = {'x-ms-error-code' : 'PathNotFound'})
+
+		entries = []
+
+		for child in self.__children(base):
+			if params.get('recursive') != 'true' and '/' in child[len(base) + 1:]:
+				continue
+
+			entry = {
+				'name' : child[len(path) + 1:]
+				, 'etag' : self.etag(child) if child in self.files else '0x1'
+				, 'lastModified' : FAKE_LAST_MODIFIED
+				, 'contentLength' : str(len(self.files[child])) if child in self.files else '0'
+			}
+			if child in self.directories:
+				entry['isDirectory'] = 'true'
+
+			entries.append(entry)
+
+		page_size = min(self.page_size, int(params.get('maxResults') or self.page_size))
+		start = int(params.get('continuation') or 0)
+		headers = {}
+
+		if start + page_size < len(entries):
+			headers['x-ms-continuation'] = str(start + page_size)
+
+		body = json.dumps({'paths' : entries[start:start + page_size]}).encode('utf-8')
+
+		return self.response(200, body, headers)
+
+	def __read(self, path, headers):
+
+		if path not in self.files:
+			return self.response(404, headers = {'x-ms-error-code' : 'PathNotFound'})
+
+		etag = '"{}"'.format(self.etag(path))
+
+		if headers.get('If-Match') not in (None, etag):
+			return self.response(412, headers = {'x-ms-error-code' : 'ConditionNotMet'})
+		if headers.get('If-None-Match') == etag:
+			return self.response(304, headers = {'ETag' : etag})
+
+		data = self.files[path]
+		response_headers = {'ETag' : etag, 'Content-Type' : 'application/octet-stream'}
+		response_headers.update(self.properties.get(path, {}))
+		status_code = 200
+
+		if 'Range' in headers:
+			first, last = (int(value) for value in headers['Range'][len('bytes='):].split('-'))
+
+			if first >= len(data):
+				return self.response(416, headers = {'x-ms-error-code' : 'InvalidRange'})
+
+			data = data[first:last + 1]
+			status_code = 206
+
+		return self.response(status_code, data, response_headers)
+
+	def __create(self, path, params, headers):
+
+		exists = path in self.files or path in self.directories
+
+		if headers.get('If-None-Match') == '*' and exists:
+			return self.response(409, headers = {'x-ms-error-code' : 'PathAlreadyExists'})
+
+		if params.get('resource') == 'directory':
+			self.add_directory(path)
+		else:
+			properties = {}
+			if headers.get('x-ms-content-encoding'):
+				properties['Content-Encoding'] = headers['x-ms-content-encoding']
+
+			self.add_file(path, b'', **properties)
+			self.pending[path] = bytearray()
+
+		return self.response(201, headers = {'ETag' : '"{}"'.format(self.etag(path))})
+
+	def __rename(self, path, params, headers):
+
+		source = urllib.parse.unquote(headers['x-ms-rename-source'])
+		continuation = params.get('continuation')
+
+		if not continuation and source not in self.files and source not in self.directories:
+			return self.response(404, headers = {'x-ms-error-code' : 'SourcePathNotFound'})
+
+		if headers.get('If-None-Match') == '*' and (path in self.files or path in self.directories):
+			return self.response(409, headers = {'x-ms-error-code' : 'PathAlreadyExists'})
+
+		# The source itself is moved last, so that the next calls still find the tree
+		old_paths = self.__children(source) + [source]
+		batch_size = self.rename_batch or len(old_paths)
+
+		for old_path in old_paths[:batch_size]:
+			new_path = path + old_path[len(source):]
+
+			if old_path in self.files:
+				self.add_file(new_path, self.files.pop(old_path), **self.properties.pop(old_path, {}))
+			else:
+				self.directories.discard(old_path)
+				self.add_directory(new_path)
+
+		response_headers = {}
+		if len(old_paths) > batch_size:
+			response_headers['x-ms-continuation'] = 'rename{}'.format(len(old_paths) - batch_size)
+
+		return self.response(201, headers = response_headers)
+
+	def __update(self, path, params, headers, data):
+
+		if path not in self.files:
+			return self.response(404, headers = {'x-ms-error-code' : 'PathNotFound'})
+
+		position = int(params['position'])
+		pending = self.pending.setdefault(path, bytearray(self.files[path]))
+
+		if params['action'] == 'append':
+			data = bytes(data)
+
+			# Parallel appends can arrive in any order
+			if len(pending) < position:
+				pending.extend(bytes(position - len(pending)))
+
+			pending[position:position + len(data)] = data
+
+		elif params['action'] == 'flush':
+			properties = dict(self.properties.get(path, {}))
+
+			for header, name in (('x-ms-content-encoding', 'Content-Encoding'), ('x-ms-content-md5', 'Content-MD5')):
+				if headers.get(header):
+					properties[name] = headers[header]
+
+			self.add_file(path, bytes(pending[:position]), **properties)
+
+			if params.get('retainUncommittedData') != 'true':
+				self.pending[path] = bytearray(self.files[path])
+
+		return self.response(200, headers = {'ETag' : '"{}"'.format(self.etag(path))})
+
+	def __delete(self, path, params):
+
+		if path not in self.files and path not in self.directories:
+			return self.response(404, headers = {'x-ms-error-code' : 'PathNotFound'})
+
+		children = self.__children(path)
+
+		if children and params.get('recursive') != 'true':
+			return self.response(409, headers = {'x-ms-error-code' : 'DirectoryNotEmpty'})
+
+		# The path itself is deleted last, so that the next calls still find the tree
+		old_paths = children + [path]
+		batch_size = self.delete_batch or len(old_paths)
+
+		for old_path in old_paths[:batch_size]:
+			self.files.pop(old_path, None)
+			self.properties.pop(old_path, None)
+			self.directories.discard(old_path)
+
+		response_headers = {}
+		if len(old_paths) > batch_size:
+			response_headers['x-ms-continuation'] = 'delete{}'.format(len(old_paths) - batch_size)
+
+		return self.response(200, headers = response_headers)
+
+# ---------------------------------------------------------------------
+
+class TestMetadataCache(unittest.TestCase):
+	'''
+	This test class checks the LRU/TTL behaviour of the metadata cache,
+	without calling the datalake.
+	'''
+
+	def test_hit_and_miss(self):
+		"""
+		Test that cached entries, missing paths included, are hits
+		"""
+		cache = MetadataCache()
+
+		self.assertEqual(cache.get('/fs/a'), (False, None))
+
+		cache.put('/fs/a', {'ETag' : '1'})
+		cache.put('/fs/missing', None)
+
+		self.assertEqual(cache.get('/fs/a'), (True, {'ETag' : '1'}))
+		self.assertEqual(cache.get('/fs/missing'), (True, None))
+		self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+	def test_ttl(self):
+		"""
+		Test that expired entries are misses
+		"""
+		cache = MetadataCache(ttl = 0.01)
+		cache.put('/fs/a', {})
+
+		time.sleep(0.02)
+
+		self.assertEqual(cache.get('/fs/a'), (False, None))
+
+	def test_lru_eviction(self):
+		"""
+		Test that the least recently used entry is evicted first
+		"""
+		cache = MetadataCache(max_entries = 2)
+		cache.put('/fs/a', {})
+		cache.put('/fs/b', {})
+		cache.get('/fs/a')
+		cache.put('/fs/c', {})
+
+		self.assertTrue(cache.get('/fs/a')[0])
+		self.assertFalse(cache.get('/fs/b')[0])
+		self.assertTrue(cache.get('/fs/c')[0])
+
+	def test_invalidate(self):
+		"""
+		Test that invalidation drops the ancestors, and the descendants if recursive
+		"""
+		cache = MetadataCache()
+		for path in ['/fs', '/fs/dir', '/fs/dir/file', '/fs/other']:
+			cache.put(path, {})
+
+		cache.invalidate('/fs/dir/file')
+
+		self.assertFalse(cache.get('/fs')[0])
+		self.assertFalse(cache.get('/fs/dir')[0])
+		self.assertTrue(cache.get('/fs/other')[0])
+
+		cache.put('/fs/dir/file', {})
+		cache.invalidate('/fs/dir', recursive = True)
+
+		self.assertFalse(cache.get('/fs/dir/file')[0])
+
+class TestRetryPolicy(unittest.TestCase):
+	'''
+	This test class checks the retry decisions and the AIMD limiter.
+	'''
+
+	def test_should_retry(self):
+		"""
+		Test that throttling is always retried, other failures only if idempotent
+		"""
+		policy = RetryPolicy(max_retries = 2)
+
+		self.assertTrue(policy.should_retry(0, 503, idempotent = False))
+		self.assertFalse(policy.should_retry(0, 500, idempotent = False))
+		self.assertTrue(policy.should_retry(0, 500, idempotent = True))
+		self.assertTrue(policy.should_retry(0, None, idempotent = True))
+		self.assertFalse(policy.should_retry(0, 404, idempotent = True))
+		self.assertFalse(policy.should_retry(2, 503, idempotent = True))
+
+	def test_retry_after(self):
+		"""
+		Test that the backoff honours Retry-After, capped to backoff_max
+		"""
+		policy = RetryPolicy(backoff_base = 0.001, backoff_max = 5)
+
+		self.assertGreaterEqual(policy.get_backoff(0, '3'), 3)
+		self.assertLessEqual(policy.get_backoff(0, '60'), 5)
+		self.assertLessEqual(policy.get_backoff(0, None), 0.001)
+
+	def test_aimd(self):
+		"""
+		Test that the limit halves on throttling and grows back additively
+		"""
+		limiter = AdaptiveConcurrencyLimiter(initial_limit = 8, max_limit = 9, decrease_cooldown = 0)
+
+		limiter.acquire()
+		limiter.release(throttled = True)
+		self.assertEqual(limiter.limit, 4)
+
+		for _ in range(4):
+			limiter.acquire()
+			limiter.release()
+		self.assertEqual(limiter.limit, 5)
+
+		for _ in range(100):
+			limiter.acquire()
+			limiter.release()
+		self.assertEqual(limiter.limit, 9)
+		self.assertEqual(limiter.in_flight, 0)
+
+class FakeClock():
+	"""
+	Stands in for the datetime module of the SAS token cache, with a
+	time that only moves when told to.
+	"""
+
+	timedelta = datetime.timedelta
+	timezone = datetime.timezone
+
+	def __init__(self):
+		clock = self
+		self.now = datetime.datetime(2026, 1, 1, tzinfo = datetime.timezone.utc)
+
+		class FakeDatetime():
+			@staticmethod
+			def now(tz = None):
+				return clock.now
+
+		self.datetime = FakeDatetime
+
+	def advance(self, **kwargs):
+		self.now += datetime.timedelta(**kwargs)
+
+class FakeSasGenerator():
+	"""
+	Returns a new signature at every call, optionally waiting for `release`.
+	"""
+
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.calls = 0
+		self.release = threading.Event()
+		self.release.set()
+		self.signed = threading.Event()
+
+	def generate_account(self, **kwargs):
+		self.release.wait(5)
+
+		with self.lock:
+			self.calls += 1
+			calls = self.calls
+
+		self.signed.set()
+		return 'sv=2018-03-28&se={}&sig=abc{}'.format(kwargs['expiry'].strftime('%Y-%m-%dT%H:%M:%SZ'), calls)
+
+class TestSasTokenCache(unittest.TestCase):
+	'''
+	This test class checks the parsing and the renewal of the SAS tokens,
+	with a fake clock.
+	'''
+
+	def setUp(self):
+		self.clock = FakeClock()
+		patcher = mock.patch.object(sastokencache, 'datetime', self.clock)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+		self.generator = FakeSasGenerator()
+		self.cache = sastokencache.SasTokenCache(
+			self.generator
+			, token_lifetime = datetime.timedelta(minutes = 15)
+			, refresh_margin = datetime.timedelta(minutes = 2)
+		)
+
+	def get_params(self):
+		return self.cache.get_params('b', 'sco', 'r')
+
+	def test_parsing(self):
+		"""
+		Test that the token is parsed into query params, and a copy is returned
+		"""
+		params = self.get_params()
+
+		self.assertEqual(params['sig'], ['abc1'])
+		self.assertEqual(params['se'], ['2026-01-01T00:15:00Z'])
+
+		params['resource'] = 'file'
+		self.assertNotIn('resource', self.get_params())
+		self.assertEqual(self.generator.calls, 1)
+
+		self.assertEqual(self.cache.get_params('b', 'sco', 'rw')['sig'], ['abc2'])
+
+		with self.assertRaises(ValueError):
+			sastokencache.SasTokenCache(self.generator, refresh_margin = datetime.timedelta(minutes = 15))
+
+	def test_renewal(self):
+		"""
+		Test that a token is renewed in the background inside the margin, and synchronously once expired
+		"""
+		self.get_params()
+
+		self.clock.advance(minutes = 12)
+		self.assertEqual(self.get_params()['sig'], ['abc1'])
+		self.assertEqual(self.generator.calls, 1)
+
+		# Inside the margin: the old token is still handed out while it is renewed
+		self.generator.signed.clear()
+		self.generator.release.clear()
+		self.clock.advance(minutes = 2)
+		self.assertEqual(self.get_params()['sig'], ['abc1'])
+		self.assertEqual(self.get_params()['sig'], ['abc1'])
+
+		self.generator.release.set()
+		self.assertTrue(self.generator.signed.wait(5))
+
+		for _ in range(500):
+			if self.get_params()['sig'] == ['abc2']:
+				break
+			time.sleep(0.01)
+
+		self.assertEqual(self.get_params()['sig'], ['abc2'])
+		self.assertEqual(self.generator.calls, 2)
+
+		# Expired: signed again before returning
+		self.clock.advance(minutes = 16)
+		self.assertEqual(self.get_params()['sig'], ['abc3'])
+
+		self.cache.clear()
+		self.assertEqual(self.get_params()['sig'], ['abc4'])
+
+	def test_threads(self):
+		"""
+		Test that concurrent callers share the cached token
+		"""
+		self.get_params()
+		results = []
+
+		def worker():
+			for _ in range(100):
+				results.append(self.get_params()['sig'][0])
+
+		threads = [threading.Thread(target = worker) for _ in range(8)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+
+		self.assertEqual(set(results), {'abc1'})
+		self.assertEqual(len(results), 800)
+		self.assertEqual(self.generator.calls, 1)
+
+class TestSyncState(unittest.TestCase):
+	'''
+	This test class checks the state file of the directory mirror.
+	'''
+
+	def test_round_trip(self):
+		"""
+		Test that the state is read back only for the same remote path
+		"""
+		with tempfile.TemporaryDirectory() as directory:
+			state_file = os.path.join(directory, 'state.json')
+			files = {'a/b.txt' : {'etag' : '0x1', 'last_modified' : None}}
+
+			self.assertEqual(load_sync_state(state_file, '/fs/dir'), {})
+
+			save_sync_state(state_file, '/fs/dir', files)
+
+			self.assertEqual(load_sync_state(state_file, '/fs/dir'), files)
+			self.assertEqual(load_sync_state(state_file, '/fs/other'), {})
+			self.assertEqual(os.listdir(directory), ['state.json'])
+
+	def test_mode_and_name(self):
+		"""
+		Test that the state file gets the default permissions, and that its name is reserved
+		"""
+		with tempfile.TemporaryDirectory() as directory:
+			state_file = os.path.join(directory, DEFAULT_STATE_FILENAME)
+
+			save_sync_state(state_file, '/fs/dir', {})
+
+			umask = os.umask(0)
+			os.umask(umask)
+
+			self.assertEqual(os.stat(state_file).st_mode & 0o777, 0o666 & ~umask)
+
+		self.assertTrue(is_state_file(DEFAULT_STATE_FILENAME))
+		self.assertTrue(is_state_file('sub/' + DEFAULT_STATE_FILENAME))
+		self.assertFalse(is_state_file('data.json'))
+
+class TestDataLakeFileReader(unittest.TestCase):
+	'''
+	This test class checks the range reads of the seekable file object,
+	over an in-memory file.
+	'''
+
+	def setUp(self):
+
+		self.data = bytes(range(256)) * 64
+		self.ranges = []
+
+		def read_range(buffer, offset):
+			count = len(self.data[offset:offset + len(buffer)])
+			buffer[:count] = self.data[offset:offset + count]
+			self.ranges.append((offset, len(buffer)))
+			return count
+
+		self.read_range = read_range
+
+	def test_readahead(self):
+		"""
+		Test that sequential reads request growing ranges, and a seek resets them
+		"""
+		reader = io.BufferedReader(
+			DataLakeFileReader(self.read_range, len(self.data), min_readahead = 256, max_readahead = 1024)
+			, buffer_size = 16
+		)
+
+		self.assertEqual(b''.join(iter(lambda: reader.read(100), b'')), self.data)
+		self.assertEqual([length for _, length in self.ranges[:4]], [512, 1024, 1024, 1024])
+
+		reader.seek(10)
+		self.assertEqual(reader.read(5), self.data[10:15])
+		self.assertEqual(self.ranges[-1], (10, 256))
+
+	def test_readinto_bypasses_window(self):
+		"""
+		Test that large reads are requested with the buffer of the caller, without readahead
+		"""
+		reader = DataLakeFileReader(self.read_range, len(self.data), min_readahead = 256, max_readahead = 1024)
+		buffer = bytearray(4096)
+
+		reader.seek(100)
+
+		self.assertEqual(reader.readinto(buffer), 4096)
+		self.assertEqual(buffer, self.data[100:4196])
+		self.assertEqual(self.ranges, [(100, 4096)])
+		self.assertEqual(reader.read(), self.data[4196:])
+
+	def test_stream_reader(self):
+		"""
+		Test that a stream of chunks is read in order, and closed with the file object
+		"""
+		closed = []
+
+		def chunks():
+			try:
+				yield b'abc'
+				yield b''
+				yield b'defgh'
+			finally:
+				closed.append(True)
+
+		with io.BufferedReader(DataLakeStreamReader(chunks()), buffer_size = 2) as file_object:
+			self.assertEqual(file_object.read(4), b'abcd')
+			self.assertEqual(file_object.tell(), 4)
+			self.assertFalse(file_object.seekable())
+			self.assertEqual(file_object.read(), b'efgh')
+			self.assertEqual(file_object.read(), b'')
+
+		self.assertEqual(closed, [True])
+
+		with DataLakeStreamReader(chunks()) as raw:
+			raw.read(1)
+
+		self.assertEqual(closed, [True, True])
+
+class TestBlockCache(unittest.TestCase):
+	'''
+	This test class checks the tiers and the keys of the block cache.
+	'''
+
+	def setUp(self):
+
+		self.data = bytes(range(256)) * 4
+		self.fetches = []
+
+		def fetch(buffer, offset):
+			count = len(self.data[offset:offset + len(buffer)])
+			buffer[:count] = self.data[offset:offset + count]
+			self.fetches.append(offset)
+			return count
+
+		self.fetch = fetch
+
+	def test_read_into(self):
+		"""
+		Test that reads across blocks are served from the cache, and keyed by ETag
+		"""
+		cache = BlockCache(block_size = 100)
+		buffer = bytearray(250)
+
+		self.assertEqual(cache.read_into('/fs/f', 'e1', buffer, 50, self.fetch), 250)
+		self.assertEqual(buffer, self.data[50:300])
+		self.assertEqual(self.fetches, [0, 100, 200])
+
+		self.assertEqual(cache.read_into('/fs/f', 'e1', buffer, 1000, self.fetch), 24)
+		self.assertEqual(buffer[:24], self.data[1000:])
+
+		cache.read_into('/fs/f', 'e1', buffer, 120, self.fetch)
+		cache.read_into('/fs/f', 'e2', buffer, 120, self.fetch)
+		self.assertEqual(self.fetches, [0, 100, 200, 1000, 300, 100, 200, 300])
+
+	def test_spill(self):
+		"""
+		Test that blocks evicted from memory are served from the disk tier
+		"""
+		cache = BlockCache(block_size = 100, max_memory_bytes = 200, spill_bytes = 200)
+
+		try:
+			for index in range(4):
+				cache.get_block('/fs/f', 'e', index, self.fetch)
+
+			self.assertEqual(cache.get_block('/fs/f', 'e', 0, self.fetch), self.data[:100])
+
+			stats = cache.stats()
+			self.assertEqual((stats['disk_hits'], stats['misses'], stats['evictions']), (1, 4, 0))
+			self.assertLessEqual(stats['memory_bytes'], 200)
+
+		finally:
+			cache.close()
+
+class TestContentCache(unittest.TestCase):
+	'''
+	This test class checks the versions and the eviction of the content cache.
+	'''
+
+	def test_put_and_read(self):
+		"""
+		Test that the content is read back only for the ETag cached
+		"""
+		with tempfile.TemporaryDirectory() as directory:
+			cache = ContentCache(directory)
+
+			self.assertIsNone(cache.get('acc/fs/a'))
+			self.assertEqual(cache.put('acc/fs/a', '"1"', 'text/plain', [b'ab', b'c']), b'abc')
+
+			self.assertEqual(cache.get('acc/fs/a')['etag'], '"1"')
+			self.assertEqual(cache.read('acc/fs/a', '"1"'), b'abc')
+			self.assertIsNone(cache.read('acc/fs/a', '"2"'))
+
+	def test_eviction(self):
+		"""
+		Test that the least recently used entries are evicted beyond the size limit
+		"""
+		with tempfile.TemporaryDirectory() as directory:
+			cache = ContentCache(directory, max_bytes = 250)
+
+			cache.put('a', '"1"', None, [b'a' * 100])
+
+			# Makes the entry of 'a' the least recently used one
+			for dirpath, _, filenames in os.walk(directory):
+				for filename in filenames:
+					os.utime(os.path.join(dirpath, filename), (0, 0))
+
+			cache.put('b', '"1"', None, [b'b' * 100])
+
+			self.assertIsNone(cache.get('a'))
+			self.assertEqual(cache.read('b', '"1"'), b'b' * 100)
+
+			self.assertEqual(cache.put('c', '"1"', None, [b'c' * 1000]), b'c' * 1000)
+			self.assertIsNone(cache.get('c'))
+
+	def test_running_size(self):
+		"""
+		Test that the directory is scanned only to evict, and the size follows replacements and removals
+		"""
+		with tempfile.TemporaryDirectory() as directory:
+			ContentCache(directory).put('a', '"1"', None, [b'a' * 100])
+
+			cache = ContentCache(directory, max_bytes = 1000)
+
+			with mock.patch.object(contentcache.os, 'walk', wraps = os.walk) as walk:
+				for index in range(5):
+					cache.put('b', '"{}"'.format(index), None, [b'b' * 100, b'b' * 50])
+				cache.invalidate('a')
+				cache.invalidate('missing')
+
+				self.assertEqual(walk.call_count, 0)
+
+				for key in 'cdef':
+					cache.put(key, '"1"', None, [b'x' * 200])
+
+				self.assertEqual(walk.call_count, 1)
+
+			entry_sizes = [
+				os.path.getsize(os.path.join(dirpath, filename))
+				for dirpath, _, filenames in os.walk(directory)
+				for filename in filenames
+			]
+			self.assertLessEqual(sum(entry_sizes), 900)
+			self.assertEqual(cache.read('f', '"1"'), b'x' * 200)
+
+class TestDataLakeFileWriter(unittest.TestCase):
+	'''
+	This test class checks the appends and commits of the append writer.
+	'''
+
+	def setUp(self):
+
+		self.calls = []
+
+		def append(data, position):
+			self.calls.append(('append', position, bytes(data)))
+
+		def commit(position, close):
+			self.calls.append(('flush', position, close))
+
+		self.append = append
+		self.commit = commit
+
+	def test_thresholds(self):
+		"""
+		Test that the data is appended at the tracked position and committed by size and on close
+		"""
+		with DataLakeFileWriter(self.append, self.commit, position = 10, append_size = 4, flush_size = 8) as writer:
+			writer.write(b'ab')
+			writer.write(b'cd')
+			writer.write(b'efghij')
+			writer.write(b'k')
+
+			self.assertEqual(writer.tell(), 21)
+
+		self.assertEqual(self.calls, [
+			('append', 10, b'abcd')
+			, ('append', 14, b'efgh')
+			, ('flush', 18, False)
+			, ('append', 18, b'ijk')
+			, ('flush', 21, True)
+		])
+
+	def test_flush_interval(self):
+		"""
+		Test that the background thread appends and commits the buffered data
+		"""
+		writer = DataLakeFileWriter(self.append, self.commit, append_size = 100, flush_interval = 0.01)
+		writer.write(b'abc')
+
+		deadline = time.monotonic() + 5
+		while len(self.calls) < 2 and time.monotonic() < deadline:
+			time.sleep(0.01)
+
+		writer.close()
+
+		self.assertEqual(self.calls[:2], [('append', 0, b'abc'), ('flush', 3, False)])
+		self.assertEqual(self.calls[-1], ('flush', 3, True))
+
+	def test_large_writes(self):
+		"""
+		Test that no append is larger than append_size, whatever the size of the writes
+		"""
+		with DataLakeFileWriter(self.append, self.commit, append_size = 10, flush_size = None) as writer:
+			writer.write(b'x' * 35)
+			writer.write(b'abc')
+			writer.write(b'y' * 12)
+
+		self.assertEqual([call[1:] for call in self.calls if call[0] == 'append'], [
+			(0, b'x' * 10)
+			, (10, b'x' * 10)
+			, (20, b'x' * 10)
+			, (30, b'x' * 5 + b'abc' + b'yy')
+			, (40, b'y' * 10)
+		])
+		self.assertEqual(self.calls[-1], ('flush', 50, True))
+
+class TestIterChunks(unittest.TestCase):
+	'''
+	This test class checks that the sources of uploads are chunked without copies.
+	'''
+
+	def test_mmap(self):
+		"""
+		Test that a mmap is sliced in place
+		"""
+		with tempfile.TemporaryFile() as file_object:
+			file_object.write(b'0123456789')
+			file_object.flush()
+
+			with mmap.mmap(file_object.fileno(), 0) as mapped:
+				chunks = list(iter_chunks(mapped, 4))
+
+				self.assertEqual([bytes(chunk) for chunk in chunks], [b'0123', b'4567', b'89'])
+
+				mapped[0:1] = b'X'
+				self.assertEqual(bytes(chunks[0]), b'X123')
+
+				del chunks
+
+	def test_reuse_buffer(self):
+		"""
+		Test that binary files are read into a single reused chunk
+		"""
+		chunks = []
+
+		for chunk in iter_chunks(io.BytesIO(b'0123456789'), 4, reuse_buffer = True):
+			chunks.append((bytes(chunk), chunk.obj))
+
+		self.assertEqual([data for data, _ in chunks], [b'0123', b'4567', b'89'])
+		self.assertEqual(len(set(id(buffer) for _, buffer in chunks)), 1)
+
+	def test_text_files(self):
+		"""
+		Test that text files and short reads are chunked by encoded bytes
+		"""
+		chunks = list(iter_chunks(io.StringIO('é' * 5), 3))
+
+		self.assertEqual(chunks, [b'\xc3\xa9\xc3', b'\xa9\xc3\xa9', b'\xc3\xa9\xc3', b'\xa9'])
+		self.assertEqual(b''.join(chunks).decode('utf-8'), 'é' * 5)
+
+		chunks = list(iter_chunks(io.StringIO('aé€'), 2, encoding = 'utf-16-le'))
+		self.assertEqual(chunks, [b'a\x00', b'\xe9\x00', b'\xac\x20'])
+
+		class ShortReads():
+			def __init__(self, data):
+				self.data = data
+			def read(self, size = -1):
+				data, self.data = self.data[:2], self.data[2:]
+				return data
+
+		self.assertEqual(list(iter_chunks(ShortReads(b'0123456789'), 4)), [b'0123', b'4567', b'89'])
+
+class TestCompression(unittest.TestCase):
+	'''
+	This test class checks the streaming compression of the content of files.
+	'''
+
+	def test_gzip_round_trip(self):
+		"""
+		Test that chunks are compressed in chunks of the given size and decompressed back
+		"""
+		data = b''.join(b'%d,value,%d\n' % (i, i * i) for i in range(10000))
+
+		compressed = list(compress_chunks(iter_chunks(data, 1000), 'gzip', 500))
+
+		self.assertTrue(all(len(chunk) == 500 for chunk in compressed[:-1]))
+		self.assertEqual(gzip.decompress(b''.join(compressed)), data)
+		self.assertEqual(b''.join(decompress_chunks(compressed, 'gzip')), data)
+
+	def test_gzip_members_and_truncation(self):
+		"""
+		Test that concatenated gzip members are decompressed, and a truncated stream detected
+		"""
+		stream = gzip.compress(b'first ') + gzip.compress(b'second')
+
+		self.assertEqual(b''.join(decompress_chunks([stream[:5], stream[5:]], 'GZIP')), b'first second')
+
+		with self.assertRaises(EOFError):
+			b''.join(decompress_chunks([stream[:-4]], 'gzip'))
+
+		# Plain data after the end of a member
+		with self.assertRaises(ValueError):
+			b''.join(decompress_chunks([stream, b'plain data'], 'gzip'))
+
+		with self.assertRaises(ValueError):
+			compress_chunks([b'data'], 'br', 500)
+
+class TestParallelDownload(unittest.TestCase):
+	'''
+	This test class checks the ranged downloads into preallocated buffers.
+	'''
+
+	def setUp(self):
+
+		self.data = bytes(range(256)) * 4
+		self.ranges = []
+		self.failures = {}
+
+		def read_range(view, offset):
+			self.ranges.append((offset, len(view)))
+
+			if self.failures.get(offset):
+				self.failures[offset] -= 1
+				raise urllib3.exceptions.ProtocolError('Connection broken')
+
+			count = min(len(view), len(self.data) - offset)
+			view[:count] = self.data[offset:offset + count]
+			return count
+
+		self.read_range = read_range
+
+	def test_ranges(self):
+		"""
+		Test that a buffer is split in ranges, the last one shorter, each written in place
+		"""
+		buffer = bytearray(1000)
+
+		count = paralleltransfer.download_ranges_parallel(self.read_range, buffer, range_size = 300, max_concurrency = 2)
+
+		self.assertEqual(count, 1000)
+		self.assertEqual(buffer, self.data[:1000])
+		self.assertEqual(sorted(self.ranges), [(0, 300), (300, 300), (600, 300), (900, 100)])
+
+	def test_retries_and_short_reads(self):
+		"""
+		Test that an interrupted range is retried, and a short range raises an error
+		"""
+		self.failures[300] = 2
+		buffer = bytearray(1024)
+
+		with mock.patch.object(paralleltransfer, 'CHUNK_RETRY_BACKOFF', 0):
+			paralleltransfer.download_ranges_parallel(self.read_range, buffer, range_size = 300, chunk_retries = 2)
+
+			self.assertEqual(buffer, self.data)
+			self.assertEqual(self.ranges.count((300, 300)), 3)
+
+			self.failures[0] = 3
+
+			with self.assertRaises(urllib3.exceptions.ProtocolError):
+				paralleltransfer.download_ranges_parallel(self.read_range, bytearray(600), range_size = 300, chunk_retries = 2)
+
+			with self.assertRaises(IOError):
+				paralleltransfer.download_ranges_parallel(self.read_range, bytearray(2000), range_size = 300)
+
+	def test_path_read_into(self):
+		"""
+		Test that a range is requested with a Range header and copied in pieces into the buffer
+		"""
+		datalake = FakeDataLake()
+		datalake.add_file('/fs/data.bin', self.data)
+
+		wrapper = ADLGen2RestApiWrapper('account', 'a2V5')
+		buffer = bytearray(2000)
+
+		with datalake.patch(), mock.patch.object(adlgen2restapiwrapper, 'READ_INTO_PIECE_SIZE', 7):
+			count = wrapper.path_read_into('fs', 'data.bin', memoryview(buffer)[10:], offset = 1000)
+
+		self.assertEqual(count, 24)
+		self.assertEqual(buffer[10:34], self.data[1000:])
+		self.assertEqual(datalake.calls[0][3]['Range'], 'bytes=1000-2989')
+
+class TestParallelUpload(unittest.TestCase):
+	'''
+	This test class checks the parallel appends of an upload and its single flush.
+	'''
+
+	def setUp(self):
+
+		self.data = bytes(range(256)) * 4
+		self.datalake = FakeDataLake()
+		self.client = AzureDataLakeGen2('account', 'a2V5', retry_policy = RetryPolicy(backoff_base = 0))
+
+	def tearDown(self):
+		self.client.close()
+
+	def test_positions(self):
+		"""
+		Test that each chunk is appended at the sum of the lengths of the previous ones
+		"""
+		appended = []
+		lock = threading.Lock()
+
+		def append_chunk(chunk, position):
+			with lock:
+				appended.append((position, bytes(chunk)))
+
+		chunks = [b'a' * 3, b'b' * 5, b'c', b'd' * 4]
+		count = paralleltransfer.upload_chunks_parallel(append_chunk, iter(chunks), max_concurrency = 3)
+
+		self.assertEqual(count, 13)
+		self.assertEqual(sorted(appended), [(0, b'aaa'), (3, b'bbbbb'), (8, b'c'), (9, b'dddd')])
+
+		with self.assertRaises(ValueError):
+			paralleltransfer.upload_chunks_parallel(append_chunk, chunks, max_concurrency = 0)
+
+	def test_single_flush(self):
+		"""
+		Test that the file is committed by one flush, after every append, retried ones included
+		"""
+		self.datalake.errors[('PATCH', '/fs/data.bin')] = [503]
+
+		with self.datalake.patch():
+			self.client.file_create('/fs/data.bin', self.data, chunk_size = 100, max_concurrency = 4)
+
+		appends = [call for call in self.datalake.calls if call[2].get('action') == 'append']
+		flushes = [call for call in self.datalake.calls if call[2].get('action') == 'flush']
+
+		self.assertEqual(self.datalake.files['/fs/data.bin'], self.data)
+		self.assertEqual(len(appends), 12)
+		self.assertEqual(sorted({int(call[2]['position']) for call in appends}), list(range(0, 1024, 100)))
+		self.assertEqual([call[2]['position'] for call in flushes], ['1024'])
+		self.assertIs(self.datalake.calls[-1], flushes[0])
+
+	def test_failed_append(self):
+		"""
+		Test that no flush is issued when an append fails
+		"""
+		self.datalake.errors[('PATCH', '/fs/data.bin')] = [400]
+
+		with self.datalake.patch():
+			with self.assertRaises(requests.HTTPError):
+				self.client.file_create('/fs/data.bin', self.data, chunk_size = 100, max_concurrency = 4)
+
+		self.assertEqual(self.datalake.count('PATCH', action = 'flush'), 0)
+		self.assertEqual(self.datalake.files['/fs/data.bin'], b'')
+
+class TestFileRead(unittest.TestCase):
+	'''
+	This test class checks the streamed reads of a file, in chunks and in lines.
+	'''
+
+	def setUp(self):
+
+		self.text = 'first line\nsecond, with é and €\n\nno terminator ✓'
+		self.datalake = FakeDataLake()
+		self.datalake.add_file('/fs/text.txt', self.text.encode('utf-8'))
+		self.client = AzureDataLakeGen2('account', 'a2V5')
+
+	def tearDown(self):
+		self.client.close()
+
+	def test_chunks(self):
+		"""
+		Test that the content is yielded in chunks of at most chunk_size bytes
+		"""
+		with self.datalake.patch():
+			chunks = list(self.client.file_read('/fs/text.txt', chunk_size = 5))
+
+			with self.assertRaises(FileNotFoundError):
+				self.client.file_read('/fs/missing.txt')
+
+		self.assertEqual(b''.join(chunks), self.text.encode('utf-8'))
+		self.assertTrue(all(0 < len(chunk) <= 5 for chunk in chunks))
+
+	def test_lines(self):
+		"""
+		Test that lines and multi-byte characters split across chunks are rebuilt
+		"""
+		expected = ['first line\n', 'second, with é and €\n', '\n', 'no terminator ✓']
+
+		with self.datalake.patch():
+			# Every multi-byte character is split by some of these sizes
+			for chunk_size in (1, 2, 3, 4, 7, 1024):
+				self.assertEqual(list(self.client.file_read('/fs/text.txt', chunk_size = chunk_size, lines = True)), expected)
+
+			self.datalake.add_file('/fs/text.txt.gz', gzip.compress(self.text.encode('utf-8')), **{'Content-Encoding' : 'gzip'})
+			self.assertEqual(list(self.client.file_read('/fs/text.txt.gz', chunk_size = 3, lines = True)), expected)
+
+			self.datalake.add_file('/fs/latin.txt', 'é\nè'.encode('latin-1'))
+			self.assertEqual(list(self.client.file_read('/fs/latin.txt', chunk_size = 1, lines = True, encoding = 'latin-1')), ['é\n', 'è'])
+
+			self.datalake.add_file('/fs/truncated.txt', 'end é'.encode('utf-8')[:-1])
+			with self.assertRaises(UnicodeDecodeError):
+				list(self.client.file_read('/fs/truncated.txt', lines = True))
+
+	def test_append_to_compressed(self):
+		"""
+		Test that a compressed file cannot be opened for appending, and is left readable
+		"""
+		with self.datalake.patch():
+			self.client.file_create('/fs/log.gz', b'line1\n', content_encoding = 'gzip')
+
+			with self.assertRaises(ValueError):
+				self.client.open('/fs/log.gz', 'ab')
+
+			self.assertEqual(bytes(self.client.file_read_bytes('/fs/log.gz')), b'line1\n')
+
+			with self.client.open('/fs/log.txt', 'ab') as file_object:
+				file_object.write(b'line1\n')
+			with self.client.open('/fs/log.txt', 'ab') as file_object:
+				file_object.write(b'line2\n')
+
+			self.assertEqual(b''.join(self.client.file_read('/fs/log.txt')), b'line1\nline2\n')
+
+class RecordingExecutor(ThreadPoolExecutor):
+	"""
+	ThreadPoolExecutor keeping track of its instances and of their shutdown.
+	"""
+
+	instances = []
+
+	def __init__(self, *args, **kwargs):
+		super().__init__(*args, **kwargs)
+		self.is_shut_down = False
+		RecordingExecutor.instances.append(self)
+
+	def shutdown(self, *args, **kwargs):
+		self.is_shut_down = True
+		super().shutdown(*args, **kwargs)
+
+class TestListPaths(unittest.TestCase):
+	'''
+	This test class checks the paginated listings, their prefetch and their cleanup.
+	'''
+
+	def setUp(self):
+
+		self.datalake = FakeDataLake(page_size = 3)
+
+		for index in range(10):
+			self.datalake.add_file('/fs/dir/file{}.txt'.format(index), b'x' * index)
+
+		self.client = AzureDataLakeGen2('account', 'a2V5')
+		RecordingExecutor.instances = []
+
+	def tearDown(self):
+		self.client.close()
+
+	def listings(self):
+		return [call[2] for call in self.datalake.calls if call[2].get('resource') == 'filesystem']
+
+	def test_continuation(self):
+		"""
+		Test that the pages are followed through their continuation tokens
+		"""
+		expected = ['/fs/dir/file{}.txt'.format(index) for index in range(10)]
+
+		with self.datalake.patch():
+			for prefetch in (True, False):
+				self.datalake.calls = []
+				statuses = list(self.client.list_paths('/fs/dir', prefetch = prefetch))
+
+				self.assertEqual([status.path for status in statuses], expected)
+				self.assertEqual([status.size for status in statuses], list(range(10)))
+				self.assertEqual([params.get('continuation') for params in self.listings()], [None, '3', '6', '9'])
+
+			self.datalake.calls = []
+			self.assertEqual(len(list(self.client.list_paths('/fs/dir', max_results = 4))), 10)
+			self.assertEqual(len(self.listings()), 4)
+
+			with self.assertRaises(FileNotFoundError):
+				self.client.list_paths('/fs/missing')
+
+	def test_prefetch(self):
+		"""
+		Test that the next page is requested while the current one is consumed, and only then
+		"""
+		with self.datalake.patch():
+			statuses = self.client.list_paths('/fs/dir', prefetch = False)
+			next(statuses)
+			self.assertEqual(len(self.listings()), 1)
+			statuses.close()
+
+			self.datalake.calls = []
+			statuses = self.client.list_paths('/fs/dir')
+			next(statuses)
+
+			for _ in range(500):
+				if len(self.listings()) == 2:
+					break
+				time.sleep(0.01)
+
+			self.assertEqual(len(self.listings()), 2)
+			statuses.close()
+
+	def test_abandoned(self):
+		"""
+		Test that the prefetch executor is shut down when the iteration stops early
+		"""
+		with self.datalake.patch(), mock.patch.object(azuredatalakegen2, 'ThreadPoolExecutor', RecordingExecutor):
+			statuses = self.client.list_paths('/fs/dir')
+			next(statuses)
+			statuses.close()
+
+			statuses = self.client.list_paths('/fs/dir')
+			next(statuses)
+			del statuses
+
+			list(self.client.list_paths('/fs/dir'))
+
+		self.assertEqual(len(RecordingExecutor.instances), 3)
+		self.assertTrue(all(executor.is_shut_down for executor in RecordingExecutor.instances))
+
+class TestPathStatus(unittest.TestCase):
+	'''
+	This test class checks the parsing of the listing entries, one by one and in columns.
+	'''
+
+	def setUp(self):
+
+		self.entries = [
+			{
+				'name' : 'dir/file.txt'
+				, 'contentLength' : '42'
+				, 'lastModified' : FAKE_LAST_MODIFIED
+				, 'etag' : '0x8D'
+				, 'owner' : '$superuser'
+				, 'group' : '$superuser'
+				, 'permissions' : 'rw-r-----'
+			}
+			, {'name' : 'dir/sub', 'isDirectory' : 'true', 'contentLength' : '0'}
+			, {'name' : 'dir/bare'}
+		]
+
+	def test_from_list_entry(self):
+		"""
+		Test that the fields are typed, and that missing ones get their defaults
+		"""
+		status, directory, bare = (PathStatus.from_list_entry('fs', entry) for entry in self.entries)
+
+		self.assertEqual(status.path, '/fs/dir/file.txt')
+		self.assertTrue(status.is_file)
+		self.assertEqual(status.size, 42)
+		self.assertEqual(status.last_modified, datetime.datetime(2026, 1, 1, tzinfo = datetime.timezone.utc))
+		self.assertEqual((status.etag, status.owner, status.permissions), ('0x8D', '$superuser', 'rw-r-----'))
+
+		self.assertTrue(directory.is_directory)
+		self.assertEqual(directory.type, 'directory')
+
+		self.assertEqual(bare, PathStatus('/fs/dir/bare', False))
+		self.assertIsNone(bare.last_modified)
+
+		with self.assertRaises(AttributeError):
+			bare.extra = 1
+
+	def test_columns(self):
+		"""
+		Test that the columns hold the same values, -1 standing for a missing time
+		"""
+		columns = PathColumns()
+
+		for entry in self.entries:
+			columns.append_list_entry('fs', entry)
+
+		self.assertEqual(len(columns), 3)
+		self.assertEqual(columns.paths, ['/fs/dir/file.txt', '/fs/dir/sub', '/fs/dir/bare'])
+		self.assertEqual(list(columns.sizes), [42, 0, 0])
+		self.assertEqual(list(columns.last_modified), [1767225600, -1, -1])
+		self.assertEqual(list(columns.is_directory), [0, 1, 0])
+
+		try:
+			import numpy
+		except ImportError:
+			with self.assertRaises(ImportError):
+				columns.to_numpy()
+			return
+
+		arrays = columns.to_numpy()
+		self.assertEqual(list(arrays['sizes'][~arrays['is_directory']]), [42, 0])
+		self.assertEqual(str(arrays['last_modified'][0]), '2026-01-01T00:00:00')
+
+class TestBulkOperations(unittest.TestCase):
+	'''
+	This test class checks the order and the error reporting of the bulk operations.
+	'''
+
+	def test_ordering(self):
+		"""
+		Test that results follow the paths if ordered, the completions otherwise
+		"""
+		release = threading.Event()
+
+		def function(path):
+			if path == 'slow':
+				self.assertTrue(release.wait(5))
+			return path.upper()
+
+		results = run_bulk(function, iter(['slow', 'fast']), max_concurrency = 2, ordered = False)
+		self.assertEqual(next(results), PathResult('fast', 'FAST', None))
+		release.set()
+		self.assertEqual(list(results), [PathResult('slow', 'SLOW', None)])
+
+		paths = ['slow'] + ['path{}'.format(index) for index in range(20)]
+		release.clear()
+		threading.Timer(0.05, release.set).start()
+
+		results = list(run_bulk(function, paths, max_concurrency = 3))
+		self.assertEqual([result.path for result in results], paths)
+		self.assertEqual([result.value for result in results], [path.upper() for path in paths])
+
+		with self.assertRaises(ValueError):
+			list(run_bulk(function, paths, max_concurrency = 0))
+
+	def test_errors(self):
+		"""
+		Test that an error is reported with its path, without stopping the others
+		"""
+		def function(path):
+			if path % 3 == 0:
+				raise KeyError(path)
+			return path
+
+		for ordered in (True, False):
+			results = sorted(run_bulk(function, range(10), max_concurrency = 4, ordered = ordered))
+
+			self.assertEqual(len(results), 10)
+			self.assertEqual([result.path for result in results if result.error is not None], [0, 3, 6, 9])
+			self.assertTrue(all(isinstance(result.error, KeyError) and result.value is None for result in results if result.path % 3 == 0))
+			self.assertEqual([result.value for result in results if result.error is None], [1, 2, 4, 5, 7, 8])
+
+	def test_bulk_stat(self):
+		"""
+		Test that the client reports missing paths as errors, or as False
+		"""
+		datalake = FakeDataLake()
+		datalake.add_file('/fs/dir/file.txt', b'data')
+		paths = ['/fs/dir/file.txt', '/fs/missing', '/fs/dir']
+
+		with datalake.patch(), AzureDataLakeGen2('account', 'a2V5') as client:
+			statuses = list(client.bulk_stat(paths))
+			exists = list(client.bulk_exists(paths, max_concurrency = 2))
+
+		self.assertEqual([result.path for result in statuses], paths)
+		self.assertEqual(statuses[0].value.size, 4)
+		self.assertIsInstance(statuses[1].error, FileNotFoundError)
+		self.assertTrue(statuses[2].value.is_directory)
+		self.assertEqual([result.value for result in exists], [True, False, True])
+
+class TestUploadDirectory(unittest.TestCase):
+	'''
+	This test class checks which files an incremental upload transfers or skips.
+	'''
+
+	# Modification times before and after FAKE_LAST_MODIFIED
+	OLDER = datetime.datetime(2025, 1, 1, tzinfo = datetime.timezone.utc).timestamp()
+	NEWER = datetime.datetime(2026, 1, 2, tzinfo = datetime.timezone.utc).timestamp()
+
+	def setUp(self):
+
+		temp_dir = tempfile.TemporaryDirectory()
+		self.addCleanup(temp_dir.cleanup)
+		self.local_path = temp_dir.name
+
+		self.datalake = FakeDataLake()
+		self.client = AzureDataLakeGen2('account', 'a2V5')
+
+	def tearDown(self):
+		self.client.close()
+
+	def write(self, relative_path, data, mtime):
+		local_file = os.path.join(self.local_path, *relative_path.split('/'))
+		os.makedirs(os.path.dirname(local_file), exist_ok = True)
+
+		with open(local_file, 'wb') as file_object:
+			file_object.write(data)
+
+		os.utime(local_file, (mtime, mtime))
+
+	def test_size_and_mtime(self):
+		"""
+		Test that only missing, resized and newer files are uploaded, with a single listing
+		"""
+		self.write('same.txt', b'same', self.OLDER)
+		self.write('sub/resized.txt', b'longer', self.OLDER)
+		self.write('sub/newer.txt', b'new!', self.NEWER)
+		self.write('sub/added.txt', b'added', self.OLDER)
+		self.write(DEFAULT_STATE_FILENAME, b'{}', self.OLDER)
+		os.makedirs(os.path.join(self.local_path, 'empty'))
+
+		for relative_path in ('same.txt', 'sub/resized.txt', 'sub/newer.txt'):
+			self.datalake.add_file('/fs/backup/' + relative_path, b'data')
+
+		with self.datalake.patch():
+			summary = self.client.upload_directory(self.local_path, '/fs/backup')
+
+		self.assertEqual(sorted(summary.transferred), ['/fs/backup/sub/added.txt', '/fs/backup/sub/newer.txt', '/fs/backup/sub/resized.txt'])
+		self.assertEqual(summary.skipped, ['/fs/backup/same.txt'])
+		self.assertEqual(summary.failed, [])
+
+		self.assertEqual(self.datalake.files['/fs/backup/sub/resized.txt'], b'longer')
+		self.assertEqual(self.datalake.files['/fs/backup/same.txt'], b'data')
+		self.assertIn('/fs/backup/empty', self.datalake.directories)
+		self.assertNotIn('/fs/backup/' + DEFAULT_STATE_FILENAME, self.datalake.files)
+		self.assertEqual(self.datalake.count('GET', resource = 'filesystem'), 1)
+		self.assertEqual(self.datalake.count('HEAD'), 0)
+
+		# The fake does not move Last-Modified forward on uploads
+		self.write('sub/newer.txt', b'new!', self.OLDER)
+		self.write('sub/added.txt', b'added again', self.OLDER)
+		self.datalake.errors[('PUT', '/fs/backup/sub/added.txt')] = [403]
+
+		with self.datalake.patch():
+			summary = self.client.upload_directory(self.local_path, '/fs/backup')
+
+		self.assertEqual(summary.transferred, [])
+		self.assertEqual([result.path for result in summary.failed], ['/fs/backup/sub/added.txt'])
+		self.assertEqual(summary.failed[0].error.response.status_code, 403)
+
+	def test_checksum(self):
+		"""
+		Test that a newer file of the same size is compared by MD5, stored by the uploads
+		"""
+		self.write('unchanged.txt', b'data', self.NEWER)
+		self.write('changed.txt', b'diff', self.NEWER)
+
+		with self.datalake.patch():
+			summary = self.client.upload_directory(self.local_path, '/fs/backup', checksum = True)
+
+			self.assertEqual(len(summary.transferred), 2)
+			self.assertEqual(self.datalake.properties['/fs/backup/unchanged.txt']['Content-MD5'], 'jXd/OF09/siBXSD3SWAm3A==')
+
+			self.datalake.add_file('/fs/backup/changed.txt', b'data', **{'Content-MD5' : 'jXd/OF09/siBXSD3SWAm3A=='})
+			self.datalake.calls = []
+
+			summary = self.client.upload_directory(self.local_path, '/fs/backup', checksum = True)
+
+		self.assertEqual(summary.skipped, ['/fs/backup/unchanged.txt'])
+		self.assertEqual(summary.transferred, ['/fs/backup/changed.txt'])
+		self.assertEqual(self.datalake.files['/fs/backup/changed.txt'], b'diff')
+		self.assertEqual(self.datalake.count('HEAD'), 2)
+
+		with self.assertRaises(NotADirectoryError):
+			self.client.upload_directory(os.path.join(self.local_path, 'changed.txt'), '/fs/backup')
+
+@unittest.skipIf(ADLGen2FileSystem is None, 'fsspec is not installed')
+class TestADLGen2FileSystem(unittest.TestCase):
+	'''
+	This test class checks the listings, the deletions and the moves of the fsspec filesystem.
+	'''
+
+	def setUp(self):
+
+		self.datalake = FakeDataLake()
+		self.datalake.add_file('/fs/dir/a.txt', b'aaa')
+		self.datalake.add_file('/fs/dir/sub/b.txt', b'bb')
+		self.datalake.add_directory('/fs/dir/empty')
+
+		patcher = self.datalake.patch()
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+		self.fs = ADLGen2FileSystem('account', 'a2V5', skip_instance_cache = True)
+		self.addCleanup(self.fs.datalake.close)
+
+	def test_ls_and_info(self):
+		"""
+		Test that listings are cached and serve info, and that a file lists itself
+		"""
+		self.assertEqual(self.fs.ls('adlgen2://fs/dir', detail = False), ['fs/dir/a.txt', 'fs/dir/empty', 'fs/dir/sub'])
+		self.assertEqual(self.fs.ls('fs/dir')[0]['size'], 3)
+
+		self.datalake.calls = []
+		self.assertEqual(self.fs.info('fs/dir/sub')['type'], 'directory')
+		self.assertEqual(self.datalake.calls, [])
+
+		info = self.fs.info('fs/dir/sub/b.txt')
+		self.assertEqual((info['type'], info['size'], info['etag']), ('file', 2, '"{}"'.format(self.datalake.etag('/fs/dir/sub/b.txt'))))
+		self.assertEqual(self.fs.ls('fs/dir/sub/b.txt', detail = False), ['fs/dir/sub/b.txt'])
+
+		self.assertEqual(self.fs.find('fs/dir'), ['fs/dir/a.txt', 'fs/dir/sub/b.txt'])
+		self.assertTrue(self.fs.isdir('fs/dir/empty'))
+
+		with self.assertRaises(FileNotFoundError):
+			self.fs.info('fs/missing')
+		with self.assertRaises(FileNotFoundError):
+			self.fs.ls('fs/missing')
+
+	def test_root(self):
+		"""
+		Test that the root lists the filesystems of the account, through all the pages
+		"""
+		self.datalake.filesystems.update({'logs', 'raw', 'raw-archive'})
+		self.datalake.page_size = 3
+
+		self.assertEqual(self.fs.ls('', detail = False), ['fs', 'logs', 'raw', 'raw-archive'])
+		self.assertEqual(self.fs.ls('adlgen2://')[0]['type'], 'directory')
+		self.assertEqual([params.get('continuation') for _, _, params, _ in self.datalake.calls], [None, '3'])
+
+		self.assertEqual(self.fs.info('')['type'], 'directory')
+		self.assertEqual(self.fs.info('raw')['type'], 'directory')
+		self.assertEqual(self.fs.find(''), ['fs/dir/a.txt', 'fs/dir/sub/b.txt'])
+
+		self.assertEqual([status.path for status in self.fs.datalake.list_filesystems(prefix = 'raw')], ['/raw', '/raw-archive'])
+
+	def test_append_to_compressed(self):
+		"""
+		Test that a compressed file cannot be opened for appending, other files can
+		"""
+		self.fs.datalake.file_create('/fs/dir/log.gz', b'line1\n', content_encoding = 'gzip')
+
+		with self.assertRaises(ValueError):
+			self.fs.open('fs/dir/log.gz', 'ab')
+
+		self.assertEqual(self.fs.cat_file('fs/dir/log.gz'), b'line1\n')
+
+		with self.fs.open('fs/dir/a.txt', 'ab') as file_object:
+			file_object.write(b'bbb')
+
+		self.assertEqual(self.fs.cat_file('fs/dir/a.txt'), b'aaabbb')
+
+	def test_rm(self):
+		"""
+		Test that files and trees are deleted, and their listings invalidated
+		"""
+		self.fs.ls('fs/dir')
+		self.fs.rm('fs/dir/a.txt')
+
+		self.assertEqual(self.fs.ls('fs/dir', detail = False), ['fs/dir/empty', 'fs/dir/sub'])
+
+		self.datalake.calls = []
+		self.fs.rm('fs/dir', recursive = True)
+
+		self.assertEqual([(call[0], call[1], call[2].get('recursive')) for call in self.datalake.calls], [('DELETE', '/fs/dir', 'true')])
+		self.assertFalse(self.fs.exists('fs/dir'))
+		self.assertEqual(self.datalake.files, {})
+
+	def test_mv(self):
+		"""
+		Test that a file or a tree is moved by a single rename, and the listings invalidated
+		"""
+		self.fs.ls('fs/dir/sub')
+		self.fs.mv('fs/dir/sub/b.txt', 'fs/dir/sub/c.txt')
+
+		self.assertEqual(self.fs.ls('fs/dir/sub', detail = False), ['fs/dir/sub/c.txt'])
+		self.assertEqual(self.fs.cat_file('fs/dir/sub/c.txt'), b'bb')
+
+		self.datalake.calls = []
+		self.fs.mv('fs/dir', 'fs/moved', recursive = True)
+
+		self.assertEqual(len([call for call in self.datalake.calls if 'x-ms-rename-source' in call[3]]), 1)
+		self.assertEqual(self.fs.find('fs/moved'), ['fs/moved/a.txt', 'fs/moved/sub/c.txt'])
+		self.assertFalse(self.fs.exists('fs/dir/a.txt'))
+
+	def test_mv_to_directory(self):
+		"""
+		Test that a path moved to an existing directory goes inside it
+		"""
+		self.fs.mv('fs/dir/a.txt', 'fs/dir/sub')
+		self.assertEqual(self.fs.ls('fs/dir/sub', detail = False), ['fs/dir/sub/a.txt', 'fs/dir/sub/b.txt'])
+
+		self.fs.mv('fs/dir/sub/a.txt', 'fs/dir/sub')
+		self.assertEqual(self.fs.cat_file('fs/dir/sub/a.txt'), b'aaa')
+
+		self.fs.mv('fs/dir/sub', 'fs/dir/empty', recursive = True)
+		self.assertEqual(self.fs.find('fs/dir'), ['fs/dir/empty/sub/a.txt', 'fs/dir/empty/sub/b.txt'])
+		self.assertFalse(self.fs.exists('fs/dir/sub'))
+
+	def test_mv_fallback(self):
+		"""
+		Test that a directory is not renamed whole without `recursive`, nor with a `maxdepth`
+		"""
+		with mock.patch('fsspec.spec.AbstractFileSystem.mv') as mv:
+			self.fs.mv('fs/dir', 'fs/moved')
+			self.fs.mv('fs/dir', 'fs/moved', recursive = True, maxdepth = 1)
+
+		self.assertEqual(mv.call_count, 2)
+		self.assertEqual(self.datalake.count('PUT'), 0)
+		self.assertEqual(self.fs.find('fs/dir'), ['fs/dir/a.txt', 'fs/dir/sub/b.txt'])
+
+class StubAiohttpSession():
+	"""
+	Stands in for aiohttp.ClientSession, serving the requests with a FakeDataLake.
+	Every request is recorded in `requests` as (method, url, query, headers);
+	`connection_errors` is the number of requests failing with a connection
+	error before they reach the fake.
+	"""
+
+	def __init__(self, datalake):
+		self.datalake = datalake
+		self.requests = []
+		self.connection_errors = 0
+		self.closed = False
+
+	def request(self, method, url, params = None, headers = None, data = None):
+		self.requests.append((method, url, params, headers))
+
+		if self.connection_errors:
+			self.connection_errors -= 1
+			raise aiohttp.ClientConnectionError('Connection reset')
+
+		return StubAiohttpResponse(self.datalake.request(method, url, params = dict(params), headers = headers, data = data))
+
+	async def close(self):
+		self.closed = True
+
+class StubAiohttpResponse():
+
+	def __init__(self, response):
+		self.status = response.status_code
+		self.headers = response.headers
+		self.content = response.content
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc_value, traceback):
+		pass
+
+	async def read(self):
+		return self.content
+
+	def raise_for_status(self):
+		if self.status >= 400:
+			raise aiohttp.ClientResponseError(None, (), status = self.status, message = 'Fake', headers = self.headers)
+
+@unittest.skipIf(AzureDataLakeGen2Async is None, 'aiohttp is not installed')
+class TestAzureDataLakeGen2Async(unittest.TestCase):
+	'''
+	This test class checks the requests built by the async client, the mapping of
+	their errors and their retries, with a stub aiohttp session.
+	'''
+
+	def setUp(self):
+
+		self.datalake = FakeDataLake(page_size = 2)
+		self.datalake.add_file('/fs/dir/file.txt', b'data')
+		self.session = StubAiohttpSession(self.datalake)
+
+		for name, stub in (('ClientSession', lambda **kwargs: self.session), ('TCPConnector', lambda **kwargs: None)):
+			patcher = mock.patch.object(aiohttp, name, stub)
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def run_with_client(self, scenario):
+		"""Runs the coroutine function `scenario(client)` in a new event loop."""
+
+		async def main():
+			async with AzureDataLakeGen2Async('account', 'a2V5', retry_policy = RetryPolicy(backoff_base = 0)) as client:
+				return await scenario(client)
+
+		result = asyncio.run(main())
+		self.assertTrue(self.session.closed)
+
+		return result
+
+	def test_requests(self):
+		"""
+		Test the method, URL, query and headers of the calls of a status and an upload
+		"""
+		async def scenario(client):
+			status = await client.stat('/fs/dir/file.txt')
+			await client.file_create('/fs/dir/new.bin', bytes(range(10)), chunk_size = 4, max_concurrency = 3)
+			return status, await client.file_read('/fs/dir/new.bin')
+
+		status, content = self.run_with_client(scenario)
+
+		self.assertEqual((status.path, status.size, status.is_file), ('/fs/dir/file.txt', 4, True))
+		self.assertEqual(content, bytes(range(10)))
+
+		method, url, query, _ = self.session.requests[0]
+		self.assertEqual((method, url), ('HEAD', 'https://account.dfs.core.windows.net/fs/dir/file.txt'))
+		self.assertTrue(all(isinstance(name, str) and isinstance(value, str) for name, value in query))
+		self.assertIn(('action', 'getStatus'), query)
+		self.assertIn(('upn', 'true'), query)
+		self.assertIn('sig', dict(query))
+
+		appends = [(dict(query)['position'], headers['Content-Length']) for method, _, query, headers in self.session.requests if dict(query).get('action') == 'append']
+		self.assertEqual(sorted(appends), [('0', '4'), ('4', '4'), ('8', '2')])
+		self.assertEqual(self.datalake.count('PATCH', '/fs/dir/new.bin', action = 'flush', position = '10'), 1)
+
+	def test_listing(self):
+		"""
+		Test that the listing follows the continuation tokens
+		"""
+		for index in range(4):
+			self.datalake.add_file('/fs/dir/more{}.txt'.format(index))
+
+		async def scenario(client):
+			return [status.path async for status in client.list_paths('/fs/dir')]
+
+		paths = self.run_with_client(scenario)
+
+		self.assertEqual(paths, ['/fs/dir/file.txt'] + ['/fs/dir/more{}.txt'.format(index) for index in range(4)])
+		self.assertEqual([dict(query).get('continuation') for _, _, query, _ in self.session.requests], [None, '2', '4'])
+
+	def test_errors(self):
+		"""
+		Test that missing paths raise FileNotFoundError, other errors ClientResponseError
+		"""
+		self.datalake.errors[('HEAD', '/fs/forbidden')] = [403]
+
+		async def scenario(client):
+			with self.assertRaises(FileNotFoundError):
+				await client.stat('/fs/missing')
+			with self.assertRaises(FileNotFoundError):
+				await client.file_read('/fs/missing')
+			with self.assertRaises(FileNotFoundError):
+				[status async for status in client.list_paths('/fs/missing')]
+			with self.assertRaises(FileExistsError):
+				await client.file_create('/fs/dir/file.txt', b'data')
+
+			self.assertFalse(await client.path_exists('/fs/missing'))
+			self.assertTrue(await client.path_is_directory('/fs/dir'))
+
+			with self.assertRaises(aiohttp.ClientResponseError) as context:
+				await client.stat('/fs/forbidden')
+			self.assertEqual(context.exception.status, 403)
+
+		self.run_with_client(scenario)
+
+	def test_retries(self):
+		"""
+		Test that throttling and connection errors are retried, other failures only if idempotent
+		"""
+		self.datalake.errors[('HEAD', '/fs/dir/file.txt')] = [503, 500]
+		self.datalake.errors[('PUT', '/fs/dir/new.txt')] = [500]
+		self.datalake.errors[('PUT', '/other')] = [500]
+
+		async def scenario(client):
+			self.assertEqual((await client.stat('/fs/dir/file.txt')).size, 4)
+
+			self.session.connection_errors = 1
+			self.assertTrue(await client.path_exists('/fs/dir'))
+
+			await client.file_create('/fs/dir/new.txt', b'data')
+
+		self.run_with_client(scenario)
+
+		self.assertEqual(self.datalake.count('HEAD', '/fs/dir/file.txt'), 3)
+		self.assertEqual(len([request for request in self.session.requests if request[1].endswith('/fs/dir')]), 2)
+		self.assertEqual(self.datalake.count('PUT', '/fs/dir/new.txt'), 2)
+		self.assertEqual(self.datalake.files['/fs/dir/new.txt'], b'data')
+
+		async def create_filesystem():
+			async with ADLGen2RestApiWrapperAsync('account', 'a2V5', retry_policy = RetryPolicy(backoff_base = 0)) as wrapper:
+				await wrapper.filesystem_create('other')
+
+		# A creation may have been processed, so it is not repeated
+		with self.assertRaises(aiohttp.ClientResponseError) as context:
+			asyncio.run(create_filesystem())
+
+		self.assertEqual(context.exception.status, 500)
+		self.assertEqual(self.datalake.count('PUT', '/other'), 1)
+
+class TestStreamedSlots(unittest.TestCase):
+	'''
+	This test class checks that streamed responses hold their slot of the
+	concurrency limiter until they are closed.
+	'''
+
+	def setUp(self):
+
+		self.datalake = FakeDataLake()
+		self.datalake.add_file('/fs/data.bin', bytes(range(256)) * 4)
+		self.limiter = AdaptiveConcurrencyLimiter(initial_limit = 1)
+		self.client = AzureDataLakeGen2('account', 'a2V5', concurrency_limiter = self.limiter)
+
+	def tearDown(self):
+		self.client.close()
+
+	def test_held_until_closed(self):
+		"""
+		Test that a call waits while a body is being read, and that every path gives the slot back
+		"""
+		with self.datalake.patch():
+			chunks = self.client.file_read('/fs/data.bin', chunk_size = 100)
+			next(chunks)
+			self.assertEqual(self.limiter.in_flight, 1)
+
+			stat = threading.Thread(target = self.client.stat, args = ('/fs/data.bin',))
+			stat.start()
+			stat.join(0.1)
+			self.assertTrue(stat.is_alive())
+
+			chunks.close()
+			stat.join(5)
+			self.assertFalse(stat.is_alive())
+
+			# Consumed, abandoned before the first chunk, failed, and in parallel
+			self.assertEqual(len(b''.join(self.client.file_read('/fs/data.bin'))), 1024)
+
+			chunks = self.client.file_read('/fs/data.bin')
+			del chunks
+			gc.collect()
+
+			with self.assertRaises(FileNotFoundError):
+				self.client.file_read('/fs/missing.bin')
+
+			self.assertEqual(self.limiter.in_flight, 0)
+
+			self.limiter = AdaptiveConcurrencyLimiter(initial_limit = 3)
+			client = AzureDataLakeGen2('account', 'a2V5', concurrency_limiter = self.limiter)
+			self.assertEqual(len(client.file_read_bytes('/fs/data.bin', range_size = 100, max_concurrency = 3)), 1024)
+
+			with client.open('/fs/data.bin', buffering = 0, min_readahead = 10) as file_object:
+				file_object.read(10)
+			client.close()
+
+		self.assertEqual(self.limiter.in_flight, 0)
+
+class TestDownloadDirectory(unittest.TestCase):
+	'''
+	This test class checks which files an incremental download transfers or skips,
+	and the state it records.
+	'''
+
+	def setUp(self):
+
+		temp_dir = tempfile.TemporaryDirectory()
+		self.addCleanup(temp_dir.cleanup)
+		self.local_path = temp_dir.name
+
+		self.datalake = FakeDataLake()
+		self.datalake.add_file('/fs/src/a.txt', b'aaa')
+		self.datalake.add_file('/fs/src/sub/b.txt', b'bb')
+		self.datalake.add_directory('/fs/src/empty')
+
+		self.client = AzureDataLakeGen2('account', 'a2V5')
+
+	def tearDown(self):
+		self.client.close()
+
+	def local(self, *parts):
+		return os.path.join(self.local_path, *parts)
+
+	def download(self):
+		self.datalake.calls = []
+
+		with self.datalake.patch():
+			summary = self.client.download_directory('/fs/src', self.local_path)
+
+		reads = [call[1] for call in self.datalake.calls if call[0] == 'GET' and 'resource' not in call[2]]
+
+		return summary, sorted(reads)
+
+	def part_files(self):
+		return [filename for _, _, filenames in os.walk(self.local_path) for filename in filenames if filename.endswith('.part')]
+
+	def test_incremental(self):
+		"""
+		Test that only new, changed and locally altered files are downloaded again
+		"""
+		summary, reads = self.download()
+
+		self.assertEqual(sorted(summary.transferred), [self.local('a.txt'), self.local('sub', 'b.txt')])
+		self.assertEqual(reads, ['/fs/src/a.txt', '/fs/src/sub/b.txt'])
+		self.assertTrue(os.path.isdir(self.local('empty')))
+
+		with open(self.local('sub', 'b.txt'), 'rb') as file_object:
+			self.assertEqual(file_object.read(), b'bb')
+
+		modified = datetime.datetime(2026, 1, 1, tzinfo = datetime.timezone.utc).timestamp()
+		self.assertEqual(os.path.getmtime(self.local('a.txt')), modified)
+
+		# Unchanged
+		summary, reads = self.download()
+		self.assertEqual(summary.transferred, [])
+		self.assertEqual(len(summary.skipped), 2)
+		self.assertEqual(reads, [])
+
+		# A new ETag, and a local copy of a different size
+		self.datalake.add_file('/fs/src/a.txt', b'AAA')
+		with open(self.local('sub', 'b.txt'), 'ab') as file_object:
+			file_object.write(b'local')
+
+		summary, reads = self.download()
+		self.assertEqual(reads, ['/fs/src/a.txt', '/fs/src/sub/b.txt'])
+
+		with open(self.local('a.txt'), 'rb') as file_object:
+			self.assertEqual(file_object.read(), b'AAA')
+
+		state = load_sync_state(self.local(DEFAULT_STATE_FILENAME), '/fs/src')
+		self.assertEqual(state['a.txt']['etag'], self.datalake.etag('/fs/src/a.txt'))
+		self.assertEqual(self.part_files(), [])
+
+	def test_failures(self):
+		"""
+		Test that a failed file is left out of the state, without a temporary file, and retried
+		"""
+		self.datalake.errors[('GET', '/fs/src/sub/b.txt')] = [403]
+
+		summary, _ = self.download()
+
+		self.assertEqual(summary.transferred, [self.local('a.txt')])
+		self.assertEqual([result.path for result in summary.failed], [self.local('sub', 'b.txt')])
+		self.assertEqual(summary.failed[0].error.response.status_code, 403)
+		self.assertFalse(os.path.exists(self.local('sub', 'b.txt')))
+		self.assertEqual(self.part_files(), [])
+		self.assertEqual(sorted(load_sync_state(self.local(DEFAULT_STATE_FILENAME), '/fs/src')), ['a.txt'])
+
+		summary, reads = self.download()
+
+		self.assertEqual(summary.transferred, [self.local('sub', 'b.txt')])
+		self.assertEqual(reads, ['/fs/src/sub/b.txt'])
+		self.assertEqual(sorted(load_sync_state(self.local(DEFAULT_STATE_FILENAME), '/fs/src')), ['a.txt', 'sub/b.txt'])
+
+		with self.datalake.patch():
+			with self.assertRaises(FileNotFoundError):
+				self.client.download_directory('/fs/missing', self.local_path)
+
+class TestFileReadCached(unittest.TestCase):
+	'''
+	This test class checks the revalidation of the content cache by the client.
+	'''
+
+	def setUp(self):
+
+		temp_dir = tempfile.TemporaryDirectory()
+		self.addCleanup(temp_dir.cleanup)
+
+		self.datalake = FakeDataLake()
+		self.datalake.add_file('/fs/a.txt', b'first')
+		self.cache = ContentCache(temp_dir.name)
+		self.client = AzureDataLakeGen2('account', 'a2V5', content_cache = self.cache)
+
+	def tearDown(self):
+		self.client.close()
+
+	def read(self):
+		self.datalake.calls = []
+
+		with self.datalake.patch():
+			content = self.client.file_read_cached('/fs/a.txt')
+
+		return content, [call[3].get('If-None-Match') for call in self.datalake.calls]
+
+	def test_revalidation(self):
+		"""
+		Test that the cached body is served on 304, and replaced when the file changed
+		"""
+		etag = '"{}"'.format(self.datalake.etag('/fs/a.txt'))
+
+		self.assertEqual(self.read(), (b'first', [None]))
+		self.assertEqual(self.cache.get('account/fs/a.txt')['etag'], etag)
+
+		# Not modified: one conditional request, without body
+		self.assertEqual(self.read(), (b'first', [etag]))
+
+		self.datalake.add_file('/fs/a.txt', b'second')
+		self.assertEqual(self.read(), (b'second', [etag]))
+		self.assertEqual(self.read(), (b'second', ['"{}"'.format(self.datalake.etag('/fs/a.txt'))]))
+
+	def test_evicted_and_deleted(self):
+		"""
+		Test that an entry evicted after the 304 is fetched again, and a deleted file dropped
+		"""
+		self.read()
+		etag = '"{}"'.format(self.datalake.etag('/fs/a.txt'))
+
+		with mock.patch.object(self.cache, 'read', return_value = None):
+			self.assertEqual(self.read(), (b'first', [etag, None]))
+
+		del self.datalake.files['/fs/a.txt']
+
+		with self.assertRaises(FileNotFoundError):
+			self.read()
+
+		self.assertIsNone(self.cache.get('account/fs/a.txt'))
+
+		with AzureDataLakeGen2('account', 'a2V5') as client:
+			with self.assertRaises(ValueError):
+				client.file_read_cached('/fs/a.txt')
+
+class TestRename(unittest.TestCase):
+	'''
+	This test class checks the continuation and the conflicts of renames.
+	'''
+
+	def setUp(self):
+		self.datalake = FakeDataLake()
+		self.client = AzureDataLakeGen2('account', 'a2V5')
+
+	def tearDown(self):
+		self.client.close()
+
+	def rename_calls(self):
+		return [call for call in self.datalake.calls if call[0] == 'PUT']
+
+	def test_continuation(self):
+		"""
+		Test that a large rename is chained, without the condition after the first call
+		"""
+		for name in ('a', 'b', 'sub/c', 'sub/d'):
+			self.datalake.add_file('/fs/src/' + name, name.encode())
+		self.datalake.rename_batch = 2
+
+		with self.datalake.patch():
+			self.client.rename('/fs/src', '/fs/dst')
+
+		calls = self.rename_calls()
+		self.assertEqual(len(calls), 3)
+		self.assertTrue(all(call[1] == '/fs/dst' for call in calls))
+		self.assertTrue(all(call[3]['x-ms-rename-source'] == '/fs/src' for call in calls))
+		self.assertEqual([call[3].get('If-None-Match') for call in calls], ['*', None, None])
+		self.assertEqual([call[2].get('continuation') for call in calls], [None, 'rename4', 'rename2'])
+
+		self.assertEqual(self.datalake.files, {
+			'/fs/dst/a' : b'a'
+			, '/fs/dst/b' : b'b'
+			, '/fs/dst/sub/c' : b'sub/c'
+			, '/fs/dst/sub/d' : b'sub/d'
+		})
+		self.assertNotIn('/fs/src', self.datalake.directories)
+
+	def test_conflicts(self):
+		"""
+		Test the errors raised for an existing destination, a missing source and a filesystem
+		"""
+		self.datalake.add_file('/fs/a.txt', b'a')
+		self.datalake.add_file('/fs/b.txt', b'b')
+
+		with self.datalake.patch():
+			with self.assertRaises(FileExistsError):
+				self.client.rename('/fs/a.txt', '/fs/b.txt')
+			self.assertEqual(self.datalake.files['/fs/b.txt'], b'b')
+
+			self.client.rename('/fs/a.txt', '/fs/b.txt', overwrite = True)
+			self.assertEqual(self.datalake.files, {'/fs/b.txt' : b'a'})
+			self.assertNotIn('If-None-Match', self.rename_calls()[-1][3])
+
+			with self.assertRaises(FileNotFoundError):
+				self.client.rename('/fs/a.txt', '/fs/c.txt')
+
+			for source, destination in (('/fs', '/fs/c'), ('/fs/b.txt', '/other')):
+				with self.assertRaises(ValueError):
+					self.client.rename(source, destination)
+
+# ---------------------------------------------------------------------
+
+class TestDelete(unittest.TestCase):
+	'''
+	This test class checks the continuation and the errors of deletes.
+	'''
+
+	def setUp(self):
+		self.datalake = FakeDataLake()
+		for name in ('a', 'b', 'sub/c', 'sub/d'):
+			self.datalake.add_file('/fs/dir/' + name, name.encode())
+		self.datalake.add_directory('/fs/empty')
+		self.client = AzureDataLakeGen2('account', 'a2V5')
+
+	def tearDown(self):
+		self.client.close()
+
+	def test_continuation(self):
+		"""
+		Test that a large recursive delete is chained until no token is returned
+		"""
+		self.datalake.delete_batch = 2
+
+		with self.datalake.patch():
+			self.client.path_delete('/fs/dir', recursive = True)
+
+		calls = [call for call in self.datalake.calls if call[0] == 'DELETE']
+		self.assertEqual([call[2].get('continuation') for call in calls], [None, 'delete4', 'delete2'])
+		self.assertTrue(all(call[2]['recursive'] == 'true' for call in calls))
+		self.assertEqual(self.datalake.files, {})
+		self.assertEqual(self.datalake.directories, {'/fs/empty'})
+
+	def test_errors(self):
+		"""
+		Test the errors raised for a directory not empty, a missing path and a filesystem
+		"""
+		with self.datalake.patch():
+			with self.assertRaises(OSError) as context:
+				self.client.path_delete('/fs/dir')
+			self.assertEqual(context.exception.errno, errno.ENOTEMPTY)
+			self.assertNotIsInstance(context.exception, requests.HTTPError)
+			self.assertIn('/fs/dir/a', self.datalake.files)
+
+			self.client.path_delete('/fs/empty')
+			self.assertNotIn('/fs/empty', self.datalake.directories)
+
+			with self.assertRaises(FileNotFoundError):
+				self.client.path_delete('/fs/empty')
+
+			with self.assertRaises(ValueError):
+				self.client.path_delete('/fs', recursive = True)
+
+			# Other errors are not mapped
+			self.datalake.errors[('DELETE', '/fs/dir/a')] = [403]
+			with self.assertRaises(requests.HTTPError):
+				self.client.path_delete('/fs/dir/a')
+
+		self.assertEqual(self.datalake.count('DELETE', '/fs'), 0)
+
+	def test_bulk_delete(self):
+		"""
+		Test that an error on a path is captured, without stopping the others
+		"""
+		self.datalake.errors[('DELETE', '/fs/dir/b')] = [403]
+		paths = ['/fs/dir/a', '/fs/dir/b', '/fs/missing', '/fs/dir/sub', '/fs/empty']
+
+		with self.datalake.patch():
+			results = list(self.client.bulk_delete(paths, ordered = True))
+
+		self.assertEqual([result.path for result in results], paths)
+		errors = [type(result.error) for result in results]
+		self.assertEqual(errors, [type(None), requests.HTTPError, FileNotFoundError, OSError, type(None)])
+		self.assertEqual(results[3].error.errno, errno.ENOTEMPTY)
+		self.assertEqual(sorted(self.datalake.files), ['/fs/dir/b', '/fs/dir/sub/c', '/fs/dir/sub/d'])
+
+# ---------------------------------------------------------------------
+
+class TestMetadataInvalidation(unittest.TestCase):
+	'''
+	This test class checks that the changes made through the client invalidate its metadata cache.
+	'''
+
+	def setUp(self):
+		self.datalake = FakeDataLake()
+		self.datalake.add_file('/fs/src/a.txt', b'a')
+		self.datalake.add_file('/fs/src/sub/b.txt', b'b')
+		self.client = AzureDataLakeGen2('account', 'a2V5', metadata_cache = MetadataCache())
+
+	def tearDown(self):
+		self.client.close()
+
+	def exists(self, *paths):
+		"""Returns the existence of `paths`, and the number of calls made for them."""
+
+		self.datalake.calls = []
+		exists = [self.client.path_exists(path) for path in paths]
+
+		return exists, len(self.datalake.calls)
+
+	def test_file_create(self):
+		"""
+		Test that a cached missing path exists once it is created
+		"""
+		with self.datalake.patch():
+			self.assertEqual(self.exists('/fs/new.txt'), ([False], 1))
+			self.assertEqual(self.exists('/fs/new.txt'), ([False], 0))
+
+			self.client.file_create('/fs/new.txt', b'new')
+
+			self.assertEqual(self.exists('/fs/new.txt'), ([True], 1))
+			self.assertEqual(self.exists('/fs/new.txt'), ([True], 0))
+
+	def test_rename_and_delete(self):
+		"""
+		Test that a rename evicts both trees, and a recursive delete its tree
+		"""
+		source = ['/fs/src', '/fs/src/a.txt', '/fs/src/sub/b.txt']
+		destination = ['/fs/dst', '/fs/dst/a.txt', '/fs/dst/sub/b.txt']
+
+		with self.datalake.patch():
+			self.assertEqual(self.exists(*source, *destination), ([True] * 3 + [False] * 3, 6))
+			self.assertEqual(self.exists(*source, *destination), ([True] * 3 + [False] * 3, 0))
+
+			self.client.rename('/fs/src', '/fs/dst')
+
+			self.assertEqual(self.exists(*source, *destination), ([False] * 3 + [True] * 3, 6))
+			self.assertEqual(self.exists(*source, *destination), ([False] * 3 + [True] * 3, 0))
+
+			self.client.path_delete('/fs/dst', recursive = True)
+
+			self.assertEqual(self.exists(*source, *destination), ([False] * 6, 3))
+
+# ---------------------------------------------------------------------
+
+class TestWalk(unittest.TestCase):
+	'''
+	This test class checks the concurrent walk of a directory tree.
+	'''
+
+	def setUp(self):
+
+		self.datalake = FakeDataLake()
+
+		for directory in ('a', 'b'):
+			for subdirectory in ('x', 'y', 'z'):
+				self.datalake.add_file('/fs/root/{}/{}/file.txt'.format(directory, subdirectory), b'data')
+
+		self.datalake.add_file('/fs/root/top.txt', b'data')
+
+		self.client = AzureDataLakeGen2('account', 'a2V5')
+
+	def tearDown(self):
+		self.client.close()
+
+	def test_tree_and_order(self):
+		"""
+		Test that every directory is yielded once, after its parent, whatever the concurrency
+		"""
+		for max_concurrency in (1, 4):
+			with self.datalake.patch():
+				walked = list(self.client.walk('/fs/root', max_concurrency = max_concurrency))
+
+			dirpaths = [dirpath for dirpath, _, _ in walked]
+
+			self.assertEqual(len(dirpaths), 9)
+			self.assertEqual(dirpaths[0], '/fs/root')
+			self.assertEqual(walked[0][1:], (['a', 'b'], ['top.txt']))
+
+			for index, dirpath in enumerate(dirpaths[1:], 1):
+				self.assertLess(dirpaths.index(dirpath.rsplit('/', 1)[0]), index)
+
+	def test_max_concurrency(self):
+		"""
+		Test that at most max_concurrency directories are listed at the same time
+		"""
+		lock = threading.Lock()
+		in_flight = [0, 0]
+		request = self.datalake.request
+
+		def slow_request(method, url, **kwargs):
+			with lock:
+				in_flight[0] += 1
+				in_flight[1] = max(in_flight)
+			try:
+				time.sleep(0.01)
+				return request(method, url, **kwargs)
+			finally:
+				with lock:
+					in_flight[0] -= 1
+
+		with mock.patch.object(requests.Session, 'request', lambda session, method, url, **kwargs: slow_request(method, url, **kwargs)):
+			self.assertEqual(len(list(self.client.walk('/fs/root', max_concurrency = 2))), 9)
+
+		self.assertEqual(in_flight[1], 2)
+
+	def test_pruning_and_errors(self):
+		"""
+		Test that pruned and deleted directories are skipped, and other errors reported
+		"""
+		with self.datalake.patch():
+			walk = self.client.walk('/fs/root', max_concurrency = 1)
+			dirpath, dirnames, _ = next(walk)
+			dirnames.remove('b')
+
+			dirpath, dirnames, _ = next(walk)
+			self.assertEqual(dirpath, '/fs/root/a')
+
+			# Deleted after its parent was listed
+			self.client.path_delete('/fs/root/a/y', recursive = True)
+
+			self.assertEqual([dirpath for dirpath, _, _ in walk], ['/fs/root/a/x', '/fs/root/a/z'])
+
+			errors = []
+			self.datalake.errors[('GET', '/fs/root/b')] = [403]
+
+			walk = self.client.walk('/fs/root', onerror = errors.append)
+			self.assertEqual(len(list(walk)), 4)
+			self.assertEqual([error.response.status_code for error in errors], [403])
+
+			self.datalake.errors[('GET', '/fs/root/b')] = [403]
+
+			with self.assertRaises(requests.HTTPError):
+				list(self.client.walk('/fs/root'))
+
+			with self.assertRaises(FileNotFoundError):
+				self.client.walk('/fs/missing')
+
+if __name__ == '__main__':
+	unittest.main()
@@ -44,5 +44,90 @@ class TestFile(unittest.TestCase):
 
 		self.assertEqual(self.datalake.read_file(file_name), file_data)
 
+class TestPathStatus(unittest.TestCase):
+	'''
+	This test class checks the single-call status of paths.
+	'''
+
+	def setUp(self):
+		
+		with open(TEST_CONFIGURATION_FILE, 'r') as ymlfile:
+			configuration = yaml.load(ymlfile)
+		
+		self.datalake = AzureDataLakeGen2(
+			storage_account_name = configuration['storage_account_name']
+			, storage_account_key = configuration['storage_account_key']
+		)
+		self.filesystem = configuration['filesystem']
+
+	def tearDown(self):
+		self.datalake.close()
+
+	def test_stat_filesystem(self):
+		"""
+		Test that a filesystem is reported as an existing directory
+		"""
+		path = '/{}'.format(self.filesystem)
+
+		self.assertTrue(self.datalake.stat(path).is_directory)
+		self.assertTrue(self.datalake.path_is_directory(path))
+		self.assertFalse(self.datalake.path_is_file(path))
+
+	def test_stat_missing_path(self):
+		"""
+		Test that a missing path raises FileNotFoundError
+		"""
+		path = '/{}/this/path/does/not/exist.txt'.format(self.filesystem)
+
+		with self.assertRaises(FileNotFoundError):
+			self.datalake.stat(path)
+
+		self.assertFalse(self.datalake.path_exists(path))
+
+class TestPathLifecycle(unittest.TestCase):
+	'''
+	This test class checks the rename and delete of paths.
+	'''
+
+	def setUp(self):
+		
+		with open(TEST_CONFIGURATION_FILE, 'r') as ymlfile:
+			configuration = yaml.load(ymlfile)
+		
+		self.datalake = AzureDataLakeGen2(
+			storage_account_name = configuration['storage_account_name']
+			, storage_account_key = configuration['storage_account_key']
+		)
+		self.directory = '/{}/pyadlgen2-test-lifecycle'.format(configuration['filesystem'])
+
+	def tearDown(self):
+		try:
+			self.datalake.path_delete(self.directory, recursive = True)
+		except FileNotFoundError:
+			pass
+
+		self.datalake.close()
+
+	def test_rename_and_delete(self):
+		"""
+		Test that a renamed file moves, and that a deleted tree is gone
+		"""
+		source = self.directory + '/staging/data.txt'
+		destination = self.directory + '/data.txt'
+
+		self.datalake.file_create(source, 'test')
+		self.datalake.rename(source, destination)
+
+		self.assertFalse(self.datalake.path_exists(source))
+		self.assertTrue(self.datalake.path_is_file(destination))
+
+		with self.assertRaises(FileExistsError):
+			self.datalake.file_create(source, 'test')
+			self.datalake.rename(source, destination)
+
+		self.datalake.path_delete(self.directory, recursive = True)
+
+		self.assertFalse(self.datalake.path_exists(self.directory))
+
 if __name__ == '__main__':
 	unittest.main()
\ No newline at end of file